@@ -85,7 +85,21 @@ with st.sidebar:
     )
     
     st.markdown("---")
-    
+
+    with st.expander("🧠 Memory"):
+        memory = st.session_state.detector.get_memory_metrics()
+        st.caption(f"Model loaded: {'Yes' if memory['model_loaded'] else 'No'}")
+        st.caption(f"Resident memory: {memory['rss_mb']} MB")
+        st.caption(f"Loads / unloads: {memory['model_loads']} / {memory['model_unloads']}")
+        st.caption(f"Last loaded: {memory['last_loaded_at'] or 'never'}")
+        if memory['last_unloaded_at']:
+            st.caption(f"Last unloaded: {memory['last_unloaded_at']} ({memory['last_unload_reason']})")
+        if st.button("Unload model now", use_container_width=True):
+            st.session_state.detector.unload(reason='manual')
+            st.rerun()
+
+    st.markdown("---")
+
     st.markdown("### ℹ️ About")
     st.info("""
     **OCR Barcode Detector v1.0**
@@ -156,7 +170,8 @@ if page == "🔍 Detect Barcode":
                         image_path = os.path.join(temp_dir, filename)
                         st.session_state.current_image.save(image_path)
                         
-                        result = st.session_state.detector.extract_barcode(image_path)
+                        # Interactive: race OCR against the decoders for the fastest answer
+                        result = st.session_state.detector.extract_barcode(image_path, race=True)
                         st.session_state.current_result = result
                         
                         history_entry = {
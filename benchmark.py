@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for OCR Barcode Detector
+Generates a synthetic waybill corpus and compares detection stages on it
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+import cv2
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from backends import BACKENDS, PyzbarBackend
+from config import get_config
+from pyzbar.pyzbar import decode as zbar_decode
+from ocr_engine import BarcodeDetector
+from preprocessing import ENHANCEMENT_VARIANTS
+from quality import assess_quality
+from scanline import encode_code128, render_modules
+from zbar_scanner import ZBarScanner
+
+
+ADDRESS_WORDS = [
+    'SHIP', 'TO', 'RETURN', 'ADDRESS', 'PARK', 'ROAD', 'NEAR', 'SCHOOL',
+    'SURAT', 'DELHI', 'PUNE', 'GUJARAT', 'PINCODE', 'VENDOR', 'HUB', 'CLIENT',
+]
+
+
+def make_waybill_number(rng):
+    """Random waybill number in the formats seen on reverse-waybill labels"""
+    if rng.random() < 0.5:
+        return rng.choice('MRX') + ''.join(rng.choice('0123456789') for _ in range(11))
+    return ''.join(rng.choice('0123456789') for _ in range(rng.randint(12, 18)))
+
+
+def make_synthetic_label(rng, truth, width=1200, height=800):
+    """
+    Render a grayscale label: border, address text and the waybill number
+    as a Code128 barcode with its human-readable line
+
+    Returns:
+        uint8 grayscale image
+    """
+    label = np.full((height, width), 255, dtype=np.uint8)
+    cv2.rectangle(label, (10, 10), (width - 10, height - 10), 0, 3)
+
+    for line in range(5):
+        words = ' '.join(rng.choice(ADDRESS_WORDS) for _ in range(rng.randint(3, 6)))
+        cv2.putText(label, words, (40, 70 + line * 55), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+
+    bars = render_modules(encode_code128(truth), module_px=2, height=110, quiet_modules=0)
+    top = height - 260
+    label[top:top + bars.shape[0], 120:120 + bars.shape[1]] = bars
+    cv2.putText(label, truth, (120, height - 80), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 0, 3)
+    return label
+
+
+def degrade(rng, image):
+    """Mild, realistic degradation: small tilt, blur and sensor noise"""
+    height, width = image.shape[:2]
+    angle = rng.uniform(-4, 4)
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    image = cv2.warpAffine(image, matrix, (width, height), borderValue=255)
+    if rng.random() < 0.5:
+        image = cv2.GaussianBlur(image, (3, 3), 0)
+    noise = np.random.default_rng(rng.randint(0, 2**31)).normal(0, 6, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def make_synthetic_corpus(count=30, seed=0):
+    """
+    Build the synthetic corpus
+
+    Returns:
+        List of (image, truth) tuples
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        truth = make_waybill_number(rng)
+        corpus.append((degrade(rng, make_synthetic_label(rng, truth)), truth))
+    return corpus
+
+
+def run_benchmark(name, fn, corpus, repeat=1):
+    """
+    Time fn(image) over the corpus and score exact matches
+
+    Args:
+        name: Row label
+        fn: Callable(image) -> decoded string or None
+        corpus: List of (image, truth)
+        repeat: Timed passes over the corpus (best pass is reported)
+
+    Returns:
+        dict with per-image latency and exact-match rate
+    """
+    best = None
+    matches = 0
+    for _ in range(repeat):
+        matches = 0
+        start = time.perf_counter()
+        for image, truth in corpus:
+            if fn(image) == truth:
+                matches += 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    row = {
+        'name': name,
+        'images': len(corpus),
+        'ms_per_image': best * 1000 / max(1, len(corpus)),
+        'exact_match_percent': matches * 100.0 / max(1, len(corpus)),
+    }
+    print(f"  {name:<32} {row['ms_per_image']:>10.1f} ms/image"
+          f"   exact match {row['exact_match_percent']:>6.1f}%")
+    return row
+
+
+def benchmark_ocr(corpus, detector):
+    """Default full-page EasyOCR call versus the fast single-line mode"""
+    print("\nEASYOCR: DEFAULT vs FAST MODE")
+    print("-" * 80)
+    reader = detector._get_reader()
+    if reader is None:
+        print("  EasyOCR not available - skipped")
+        return []
+
+    def default_call(image):
+        # What detect_barcode_ocr did before the fast mode existed
+        result = reader.readtext(image)
+        return ''.join(text[1] for text in result) if result else None
+
+    def fast_call(image):
+        results, _ = detector.detect_barcode_ocr(image=image)
+        return results[0]['data'] if results else None
+
+    # Warm the model up so the first timed call does not pay for it
+    reader.readtext(corpus[0][0])
+    return [
+        run_benchmark('readtext (defaults, joined)', default_call, corpus),
+        run_benchmark('fast mode (allowlist, best line)', fast_call, corpus),
+    ]
+
+
+def benchmark_backends(corpus, detector):
+    """Every registered decoder backend on its own, cheapest declared cost first"""
+    print("\nDECODER BACKENDS")
+    print("-" * 80)
+    rows = []
+    for name in sorted(BACKENDS, key=lambda n: BACKENDS[n].cost):
+        backend = detector._backend(name)
+        if not backend.available():
+            print(f"  {name:<32} not available - skipped")
+            continue
+
+        def call(image, name=name):
+            results, _ = detector.detect_with_backend(name, image=image)
+            return results[0]['data'] if results else None
+
+        rows.append(run_benchmark(f'{name} (cost {backend.cost:g})', call, corpus))
+    return rows
+
+
+def benchmark_symbologies(corpus, detector):
+    """zbar with every symbology versus the production allowlist on large frames"""
+    print("\nPYZBAR: ALL SYMBOLOGIES vs PRODUCTION ALLOWLIST (3x upscaled frames)")
+    print("-" * 80)
+    large = [(cv2.resize(image, None, fx=3, fy=3, interpolation=cv2.INTER_CUBIC), truth)
+             for image, truth in corpus]
+    allowlist = get_config('profiles')['production']['symbologies']
+    rows = []
+    for label, symbologies in (('all symbologies', None), (', '.join(allowlist), allowlist)):
+        backend = PyzbarBackend(symbologies=symbologies)
+
+        def call(image, backend=backend):
+            results = backend.decode(image)
+            return results[0]['data'] if results else None
+
+        rows.append(run_benchmark(label, call, large))
+    return rows
+
+
+def benchmark_zbar(corpus, detector):
+    """
+    zbar hot loop: every corpus image at the cascade's seven rotation angles,
+    rotations prepared up front so only the decode call is timed
+    """
+    print("\nZBAR HOT LOOP: pyzbar.decode vs PERSISTENT SCANNER (7 rotations per image)")
+    print("-" * 80)
+    angles = [0, -15, 15, -30, 30, -45, 45]
+    frames = [
+        ([image if angle == 0 else detector._rotate_image(image, angle) for angle in angles], truth)
+        for image, truth in corpus
+    ]
+    color_frames = [([cv2.cvtColor(f, cv2.COLOR_GRAY2BGR) for f in rotated], truth)
+                    for rotated, truth in frames]
+    scanner = ZBarScanner()
+
+    def first_hit(decode_fn):
+        def call(rotated):
+            for frame in rotated:
+                barcodes = decode_fn(frame)
+                if barcodes:
+                    return barcodes[0].data.decode('utf-8')
+            return None
+        return call
+
+    return [
+        run_benchmark('pyzbar.decode (BGR frames)', first_hit(zbar_decode), color_frames, repeat=3),
+        run_benchmark('pyzbar.decode (grayscale)', first_hit(zbar_decode), frames, repeat=3),
+        run_benchmark('ZBarScanner.scan (grayscale)', first_hit(scanner.scan), frames, repeat=3),
+    ]
+
+
+def make_hard(rng, image):
+    """Low-contrast, defocused copy of a corpus image"""
+    image = cv2.GaussianBlur(image, (0, 0), rng.uniform(1.2, 2.2))
+    return cv2.convertScaleAbs(image, alpha=rng.uniform(0.25, 0.45), beta=rng.uniform(90, 140))
+
+
+def benchmark_ladder(corpus, detector):
+    """Success per millisecond of each enhancement variant on hard, located regions"""
+    print("\nENHANCEMENT LADDER: VARIANTS ON LOW-CONTRAST, BLURRED REGIONS")
+    print("-" * 80)
+    rng = random.Random(1)
+    backends = [backend for backend in detector._crop_backends() if backend.available()][:1]
+    rows = []
+    for name in ENHANCEMENT_VARIANTS:
+        variant = ENHANCEMENT_VARIANTS[name]
+        successes = 0
+        elapsed = 0.0
+        for image, truth in corpus:
+            hard = make_hard(rng, image)
+            crops = [detector._candidate_crop(hard, c['bbox'])[0]
+                     for c in detector._barcode_candidates(hard)]
+            start = time.perf_counter()
+            found = None
+            for crop in crops:
+                enhanced = variant(crop)
+                if enhanced is None:
+                    continue
+                for backend in backends:
+                    symbols = backend.decode(enhanced)
+                    if symbols:
+                        found = symbols[0]['data']
+                        break
+                if found:
+                    break
+            elapsed += time.perf_counter() - start
+            successes += found == truth
+        ms = elapsed * 1000 / max(1, len(corpus))
+        rows.append({'variant': name, 'ms_per_image': ms, 'successes': successes,
+                     'success_per_ms': successes / max(1, len(corpus)) / max(ms, 0.01)})
+
+    for row in sorted(rows, key=lambda r: -r['success_per_ms']):
+        print(f"  {row['variant']:<32} {row['ms_per_image']:>10.1f} ms/image"
+              f"   decoded {row['successes']:>3}/{len(corpus)}"
+              f"   success/ms {row['success_per_ms']:.4f}")
+    return rows
+
+
+def make_hopeless(rng, image):
+    """Blank label back, heavily defocused or underexposed copy of a corpus image"""
+    kind = rng.choice(['blank', 'blur', 'dark'])
+    if kind == 'blank':
+        noise = np.random.default_rng(rng.randint(0, 2**31)).normal(0, 5, image.shape)
+        return np.clip(rng.uniform(180, 245) + noise, 0, 255).astype(np.uint8)
+    if kind == 'blur':
+        return cv2.GaussianBlur(image, (0, 0), rng.uniform(6, 10))
+    return cv2.convertScaleAbs(image, alpha=0.08)
+
+
+def benchmark_quality(corpus, detector):
+    """
+    Cascade latency on good and hopeless images with the quality gate on and
+    off; hopeless images have no truth, so their match rate counts clean failures
+    """
+    print("\nQUALITY GATE: FULL CASCADE vs GATED CASCADE")
+    print("-" * 80)
+    rng = random.Random(2)
+    hopeless = [(make_hopeless(rng, image), None) for image, _ in corpus]
+    gate_config = detector.quality_config
+    rows = []
+    for label, enabled in (('cascade', False), ('gated cascade', True)):
+        detector.quality_config = dict(gate_config, enabled=enabled)
+        try:
+            for name, images in (('good', corpus), ('hopeless', hopeless)):
+                rows.append(run_benchmark(
+                    f"{label} ({name})",
+                    lambda image: detector._run_cascade(image)['barcode_content'],
+                    images))
+        finally:
+            detector.quality_config = gate_config
+    # Match rate here is the share of hopeless images the gate rejects
+    rows.append(run_benchmark(
+        "gate only (rejected)",
+        lambda image: None if assess_quality(image, gate_config)[0] == 'reject' else 'run',
+        hopeless))
+    return rows
+
+
+def make_skewed(rng, label):
+    """
+    A clean label as a handheld camera sees it: turned in-plane, in
+    perspective, on a table top, with sensor noise added after the warp
+    """
+    height, width = label.shape[:2]
+    margin = 0.08
+    corners = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    jitter = np.float32([[rng.uniform(0, margin) * width, rng.uniform(0, margin) * height]
+                         for _ in range(4)]) * np.float32([[1, 1], [-1, 1], [-1, -1], [1, -1]])
+    matrix = cv2.getPerspectiveTransform(corners, corners + jitter)
+    angle = rng.uniform(15, 75) * rng.choice([-1, 1])
+    rotation = np.vstack([cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0), [0, 0, 1]])
+    # Centre the turned label on a canvas twice the size
+    rotation[:2, 2] += (width / 2, height / 2)
+    matrix = rotation @ matrix
+    canvas = (width * 2, height * 2)
+    warped = cv2.warpPerspective(label, matrix, canvas)
+    inside = cv2.warpPerspective(np.full_like(label, 255), matrix, canvas) > 127
+    image = np.where(inside, warped, np.uint8(rng.uniform(90, 170)))
+    noise = np.random.default_rng(rng.randint(0, 2**31)).normal(0, 6, image.shape)
+    # Light smoothing standing in for the camera's own denoising
+    return cv2.GaussianBlur(np.clip(image + noise, 0, 255).astype(np.uint8), (3, 3), 0)
+
+
+def benchmark_rectification(corpus, detector):
+    """Skewed photos: rotated full-frame passes versus warping located regions"""
+    print("\nRECTIFICATION: FULL-FRAME ROTATIONS vs RECTIFIED CANDIDATE REGIONS")
+    print("-" * 80)
+    rng = random.Random(3)
+    skewed = [(make_skewed(rng, make_synthetic_label(rng, truth)), truth) for _, truth in corpus]
+    rectification_config = detector.rectification_config
+    rows = []
+    for label, enabled in (('frame rotations', False), ('rectified regions', True)):
+        detector.rectification_config = dict(rectification_config, enabled=enabled)
+        try:
+            rows.append(run_benchmark(
+                label, lambda image: detector._run_cascade(image)['barcode_content'], skewed))
+        finally:
+            detector.rectification_config = rectification_config
+    return rows
+
+
+def benchmark_rotations(corpus, detector):
+    """Morphology-stage angle sweep on skewed shots, one angle at a time versus concurrently"""
+    print("\nROTATION SWEEP: SERIAL vs PARALLEL ANGLES (MORPHOLOGY STAGE, NO RECTIFICATION)")
+    print("-" * 80)
+    rng = random.Random(3)
+    skewed = [(make_skewed(rng, make_synthetic_label(rng, truth)), truth) for _, truth in corpus]
+    rectification_config = detector.rectification_config
+    detector.rectification_config = dict(rectification_config, enabled=False)
+    rows = []
+    try:
+        for label, parallel in (('serial', False), ('parallel', True)):
+            def call(image, parallel=parallel):
+                results, _ = detector._try_rotations(
+                    image, lambda rotated: detector.detect_barcode_morphology(image=rotated),
+                    parallel=parallel)
+                return results[0]['data'] if results else None
+            rows.append(run_benchmark(label, call, skewed))
+    finally:
+        detector.rectification_config = rectification_config
+    return rows
+
+
+def benchmark_race(corpus, detector):
+    """Serial cascade versus OCR raced against the decoders: latency and process CPU time"""
+    print("\nCASCADE: SERIAL vs RACED (OCR SPECULATIVE AFTER PYZBAR)")
+    print("-" * 80)
+    rows = []
+    for label, race in (('serial', False), ('race', True)):
+        def call(image, race=race):
+            result = detector._run_cascade(image, race=race)
+            return result['barcode_content'] if result['success'] else None
+        cpu_started = time.process_time()
+        row = run_benchmark(label, call, corpus)
+        # Let cancelled OCR work finish so it is charged to this row
+        if race and detector._race_pool is not None:
+            detector._race_pool.shutdown(wait=True)
+            detector._race_pool = None
+        row['cpu_ms_per_image'] = (time.process_time() - cpu_started) * 1000 / max(1, len(corpus))
+        print(f"  {'':<32} {row['cpu_ms_per_image']:>10.1f} ms CPU/image")
+        rows.append(row)
+    return rows
+
+
+BENCHMARKS = {
+    'backends': benchmark_backends,
+    'ladder': benchmark_ladder,
+    'symbologies': benchmark_symbologies,
+    'zbar': benchmark_zbar,
+    'ocr': benchmark_ocr,
+    'quality': benchmark_quality,
+    'rectification': benchmark_rectification,
+    'rotations': benchmark_rotations,
+    'race': benchmark_race,
+}
+
+
+def main():
+    """Parse arguments and run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description='OCR Barcode Detector benchmarks')
+    parser.add_argument('benchmarks', nargs='*',
+                        help=f"Benchmarks to run: {', '.join(sorted(BENCHMARKS))} (default: all)")
+    parser.add_argument('-n', '--count', type=int, default=30, help='Synthetic images')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus random seed')
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    print("=" * 80)
+    print("OCR BARCODE DETECTOR - BENCHMARKS")
+    print("=" * 80)
+
+    corpus = make_synthetic_corpus(args.count, args.seed)
+    print(f"\nSynthetic corpus: {len(corpus)} images")
+
+    detector = BarcodeDetector()
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        BENCHMARKS[name](corpus, detector)
+
+    print("\n" + "=" * 80)
+
+
+if __name__ == '__main__':
+    main()
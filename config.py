@@ -9,7 +9,16 @@ DETECTION_CONFIG = {
     'use_gpu': False,
     
     # Which detection methods to use (in order of preference)
-    'methods': ['pyzbar', 'morphology', 'easyocr'],
+    # Decoder backends registered in src/backends.py: scanline, pyzbar,
+    # opencv_barcode, opencv_qr, easyocr, tesseract; 'morphology' is the
+    # candidate-region stage built on top of them
+    'methods': ['scanline', 'pyzbar', 'opencv_barcode', 'opencv_qr',
+                'morphology', 'easyocr', 'tesseract'],
+    
+    # Cascade profile (from CASCADE_PROFILES) used when none is given
+    # 'any' reads every symbology; deployments that only see Code128/QR
+    # waybills can opt into the faster 'production' allowlist
+    'profile': 'any',
     
     # Enable detailed logging
     'verbose': False,
@@ -18,6 +27,25 @@ DETECTION_CONFIG = {
     'timeout': 300,
 }
 
+# Cascade Profiles
+# Each profile may override the detection methods (None = DETECTION_CONFIG['methods'])
+# and restrict the symbologies the decoders look for (None = every symbology).
+# Names are pyzbar's ZBarSymbol names, e.g. CODE128, QRCODE, EAN13, EAN8,
+# UPCA, UPCE, CODE39, I25, PDF417
+CASCADE_PROFILES = {
+    # Production waybills only carry Code128 bars and QR codes
+    'production': {
+        'methods': None,
+        'symbologies': ['CODE128', 'QRCODE'],
+    },
+    
+    # Unknown label sources: try everything
+    'any': {
+        'methods': None,
+        'symbologies': None,
+    },
+}
+
 # Image Processing Settings
 IMAGE_CONFIG = {
     # Maximum image width (pixels)
@@ -26,6 +54,37 @@ IMAGE_CONFIG = {
     # Maximum image height (pixels)
     'max_height': 2000,
     
+    # Decode as grayscale (pyzbar, morphology and EasyOCR all work on one channel)
+    'grayscale': True,
+    
+    # Use the decoder's 1/2, 1/4, 1/8 reduced modes to respect the size caps
+    'reduced_decode': True,
+    
+    # Crops smaller than this (in decoded pixels) are re-read at full resolution
+    'min_crop_side': 200,
+    
+    # Per-image pixel budget, checked from the file header before decoding
+    'max_pixels': 40_000_000,
+    
+    # What to do with images over max_pixels: 'downscale', 'tile' or 'reject'
+    # ('tile' also allows the full-resolution tiled pyzbar pass on them)
+    'oversize_policy': 'downscale',
+    
+    # Memory budget for decoding a single image (MB)
+    'max_decode_mb': 256,
+    
+    # Report 'python_peak_mb': the peak Python heap (NumPy arrays included)
+    # each detection allocated above what was in use when it started.
+    # tracemalloc does not see OpenCV's or zbar's native buffers; detections
+    # that overlap in time share one figure ('python_peak_shared': True).
+    # Tracing slows decoding by roughly a third while detections run, so
+    # leave this off outside of profiling runs
+    'report_peak_memory': False,
+    
+    # Report process CPU time per detection ('cpu_ms'), including worker
+    # threads; process wide, so concurrent detections overlap
+    'report_cpu_time': True,
+    
     # Image quality for display
     'display_quality': 85,
     
@@ -37,6 +96,241 @@ IMAGE_CONFIG = {
 PYZBAR_CONFIG = {
     # Enable PyZbar detection
     'enabled': True,
+    
+    # Reuse one configured zbar scanner per thread and pass grayscale
+    # buffers without copying (False = plain pyzbar.decode per call)
+    'persistent_scanner': True,
+}
+
+# OpenCV Settings (cv2.barcode and cv2.QRCodeDetector backends)
+OPENCV_CONFIG = {
+    'enabled': True,
+}
+
+# Scanline Settings (NumPy Code128/EAN decoder in front of pyzbar)
+SCANLINE_CONFIG = {
+    'enabled': True,
+    
+    # Scanlines sampled across each candidate region
+    'lines': 7,
+    
+    # Scanlines that must decode the same checksum-valid value
+    'min_agreement': 2,
+    
+    # Only scan candidate regions scoring at least this (0.0 to 1.0)
+    'min_score': 0.5,
+    
+    # Symbologies to try (None = CODE128, EAN13 and EAN8)
+    'symbologies': None,
+}
+
+# Enhancement Ladder Settings (pyzbar retries on located regions before OCR)
+ENHANCEMENT_CONFIG = {
+    'enabled': True,
+    
+    # Variants from src/preprocessing.py ENHANCEMENT_VARIANTS in starting order;
+    # re-ranked at run time by measured successes per millisecond
+    'variants': ['clahe', 'unsharp', 'upscale', 'adaptive_threshold'],
+    
+    # Attempts recorded before the measured ranking replaces the starting order
+    'warmup': 20,
+}
+
+# Quality Gate Settings (cheap checks before the cascade, see src/quality.py)
+QUALITY_CONFIG = {
+    'enabled': True,
+    
+    # Longest side of the grayscale copy the checks run on
+    'max_side': 512,
+    
+    # 1st-to-99th percentile spread below which the image is blank or
+    # badly exposed
+    'min_dynamic_range': 30,
+    
+    # Laplacian variance below which the image is too blurred to decode
+    'min_sharpness': 40,
+    
+    # Fraction of pixels on strong edges that keeps a low-contrast image in
+    # (a small code on a large, otherwise empty page)
+    'min_edge_energy': 0.001,
+}
+
+# Rectification Settings (perspective correction of located barcode regions)
+RECTIFICATION_CONFIG = {
+    'enabled': True,
+    
+    # Regions whose fitted quadrilateral is within this many degrees of the
+    # image axes are cropped as they are instead of warped
+    'min_skew_degrees': 3,
+    
+    # Also retry the symbol decoders on rotated full frames (the rotation
+    # passes rectification replaces); text backends always rotate
+    'frame_rotations': False,
+}
+
+# Rotation Sweep Settings (stages retried on rotated frames)
+ROTATION_CONFIG = {
+    # Angles tried, in this order; the first one that decodes wins
+    'angles': [0, -15, 15, -30, 30, -45, 45],
+    
+    # Evaluate the angles of cheap stages concurrently; results are still
+    # taken in angle order, so the outcome matches the serial sweep
+    'parallel': True,
+    
+    # Threads shared by all parallel sweeps of a detector
+    'workers': 4,
+    
+    # Stages costing more than this (backend cost, pyzbar = 1.0) sweep
+    # serially. With the default cascade this is the tesseract stage (15):
+    # symbol decoders only rotate with RECTIFICATION_CONFIG['frame_rotations'],
+    # and tesseract runs out of process, so its angles overlap; easyocr (50)
+    # serializes on its shared model and gains nothing from threads
+    'max_parallel_cost': 20.0,
+}
+
+# Race Settings (latency-optimised cascade for interactive use)
+RACE_CONFIG = {
+    # Start the text (OCR) methods speculatively once this symbol stage
+    # has failed; if it is not in the cascade they start straight away
+    'speculate_after': 'pyzbar',
+    
+    # Threads running the symbol and text paths (two per concurrent detection)
+    'workers': 2,
+}
+
+# Candidate Validation Settings (scoring of decoded results, see
+# validate_barcode_format in src/text_extraction.py)
+VALIDATION_CONFIG = {
+    # Validated results end the cascade at once; the others are kept as a
+    # fallback while the remaining stages run (False = first result wins)
+    'enabled': True,
+    
+    # Waybill-number formats (regular expressions, whole string): long
+    # numeric codes, M + 11 digits, R + 10 digits + 3-letter suffix
+    'patterns': [r'\d{12,18}', r'[A-Z]\d{11}', r'R\d{10}[A-Z]{3}'],
+    
+    # OCR confidence a well-formed text read needs to count as validated
+    'min_text_confidence': 0.3,
+    
+    # Lowest score an unvalidated fallback needs to be reported once every
+    # stage has failed to validate (OCR reads score confidence x 0.5)
+    'min_score': 0.4,
+}
+
+# Stream Settings (video files and cameras, see src/stream.py)
+STREAM_CONFIG = {
+    # Frames decoded per second of video; the frames in between are
+    # grabbed but neither converted nor decoded
+    'target_fps': 5.0,
+    
+    # Laplacian variance of the quality-gate copy below which a frame is
+    # skipped as motion-blurred
+    'min_sharpness': 60,
+    
+    # A barcode read again within this many seconds of its last sighting
+    # is the same sighting and is not reported again
+    'repeat_seconds': 2.0,
+    
+    # Pace video files by the wall clock like a camera (False = media time,
+    # every file decodes the same frames however fast the machine is)
+    'realtime_files': False,
+    
+    # Emit a 'frame' event (mode, latency, reads) for every sampled frame
+    'frame_events': False,
+    
+    # OCR frames without a decodable symbol (reported as 'text' events)
+    # A single OCR pass costs several hundred ms on CPU, far over the
+    # per-frame budget at target_fps, so streams use the symbol decoders only
+    'ocr': False,
+    
+    # ROI tracking: codes read in the previous sampled frame are decoded
+    # inside their predicted window first; the whole frame is searched
+    # only when a track is lost
+    'tracking': {
+        'enabled': True,
+        
+        # Template search window around the last box (fraction of its longer side)
+        'search_margin': 0.5,
+        
+        # Lowest normalised cross-correlation that keeps a track
+        'min_match': 0.6,
+        
+        # Decode window around the predicted box (fraction of its longer side)
+        'decode_margin': 0.25,
+        
+        # Full-frame pass every N sampled frames to find codes entering the
+        # view (0 = only on track loss)
+        'full_frame_every': 10,
+    },
+}
+
+# Batch Settings (main.py --manifest / --jsonl: paths in, JSON lines out)
+BATCH_CONFIG = {
+    # Decoding threads
+    'workers': 4,
+    
+    # Paths queued, decoding or waiting to be written at once; memory use
+    # stays constant however many paths are fed in
+    'max_pending': 16,
+}
+
+# Watch Settings (main.py --watch, see src/watch.py)
+WATCH_CONFIG = {
+    # Wake on inotify events where available (Linux); False = always poll.
+    # Writes made by other hosts on a network share are only seen by polling
+    'inotify': True,
+    
+    # Seconds between directory scans when polling
+    'poll_interval': 2.0,
+    
+    # Seconds between safety rescans when inotify is in use
+    'rescan_interval': 60.0,
+    
+    # A file is processed once its size and modification time have not
+    # changed for this many seconds (half-written files are left alone)
+    'settle_seconds': 2.0,
+    
+    # Decoding threads, and files queued or decoding at once
+    'workers': 4,
+    'max_pending': 8,
+    
+    # Processed-files ledger (None = .barcode_ledger in the watched directory)
+    'ledger': None,
+}
+
+# Tiling Settings (parallel decoding of full-resolution scans)
+# Frames within the IMAGE_CONFIG caps are always decoded whole; tiles are
+# only used for the full-resolution retry of reduced frames
+TILING_CONFIG = {
+    'enabled': True,
+    
+    # Tile side length (pixels, native resolution)
+    'tile_size': 1536,
+    
+    # Overlap between neighbouring tiles (pixels, native resolution)
+    # Codes up to this long on either axis always fall wholly inside a tile;
+    # larger ones survive the reduction and are read from the whole frame
+    'overlap': 512,
+    
+    # Decoding threads (pyzbar releases the GIL)
+    'workers': 4,
+    
+    # Retry the symbol decoders on full-resolution tiles when the decoded
+    # frame was reduced
+    'full_resolution': True,
+}
+
+# Sheet Segmentation Settings (several labels on one page)
+SEGMENTATION_CONFIG = {
+    # Label area limits as a fraction of the page area
+    'min_area_ratio': 0.03,
+    'max_area_ratio': 0.5,
+    
+    # Maximum labels returned per sheet
+    'max_labels': 12,
+    
+    # Labels decoded concurrently
+    'workers': 4,
 }
 
 # Morphology Settings
@@ -48,6 +342,21 @@ MORPHOLOGY_CONFIG = {
     
     # Morphological operations type
     'morph_operation': 'MORPH_CLOSE',
+    
+    # Number of ranked candidate regions tried with pyzbar
+    'top_k': 5,
+    
+    # Ignore candidate regions larger than this fraction of the image
+    'max_area_ratio': 0.5,
+    
+    # Only OCR candidates scoring at least this (0.0 to 1.0) ...
+    'min_ocr_score': 0.35,
+    
+    # ... and covering at most this fraction of the image
+    'max_ocr_area_ratio': 0.15,
+    
+    # Quiet-zone margin added around candidate crops (fraction of size)
+    'padding': 0.1,
 }
 
 # EasyOCR Settings
@@ -65,6 +374,34 @@ EASYOCR_CONFIG = {
     
     # Model cache directory
     'model_dir': None,  # None = default cache location
+    
+    # Characters allowed when reading barcode text
+    'allowlist': '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    
+    # Human-readable line strip thickness (fraction of bar height)
+    'hrl_strip_ratio': 0.45,
+    
+    # Extra width on each side of the human-readable strip (fraction of bar width)
+    'hrl_margin': 0.1,
+    
+    # Fast single-line mode used by the barcode stages
+    'fast_mode': {
+        'enabled': True,
+        
+        # Longest side EasyOCR's text detector works on (library default 2560)
+        'canvas_size': 1280,
+        'mag_ratio': 1.0,
+        
+        # 'greedy' is much cheaper than 'beamsearch'/'wordbeamsearch'
+        'decoder': 'greedy',
+        
+        # Text detector thresholds (library defaults 0.7 / 0.4)
+        'text_threshold': 0.6,
+        'low_text': 0.35,
+        
+        # Shortest string accepted as a barcode line
+        'min_text_length': 6,
+    },
 }
 
 # GUI Settings
@@ -109,6 +446,41 @@ OUTPUT_CONFIG = {
     'results_file': 'barcode_results.txt',
 }
 
+# Tesseract Settings (pytesseract backend; needs the tesseract binary)
+TESSERACT_CONFIG = {
+    'enabled': True,
+    
+    # Page segmentation mode (11 = sparse text, find as much text as possible)
+    'psm': 11,
+    
+    # Characters allowed (None = EASYOCR_CONFIG['allowlist'])
+    'allowlist': None,
+    
+    # Shortest string accepted as a barcode line
+    'min_text_length': 6,
+}
+
+# Memory Management Settings
+MEMORY_CONFIG = {
+    # Unload the EasyOCR model and caches after this many idle seconds (None = never)
+    'idle_timeout': 900,
+    
+    # How often the idle watchdog wakes up (seconds)
+    'check_interval': 30,
+    
+    # Resident memory budget in MB (None = unlimited)
+    # Caches are evicted first; the model is unloaded only if that is not enough
+    'rss_budget_mb': None,
+    
+    # Number of decoded images kept in memory
+    'image_cache_size': 4,
+    
+    # Drop the per-thread scratch buffers once no detection is running
+    # (False = keep them until the next unload: saves reallocating them on
+    # streams of same-size frames, at ~45 MB per thread for 3 MP frames)
+    'release_scratch': True,
+}
+
 # Logging Settings
 LOGGING_CONFIG = {
     # Enable logging
@@ -129,12 +501,28 @@ def get_config(section):
     """Get configuration for a specific section"""
     configs = {
         'detection': DETECTION_CONFIG,
+        'profiles': CASCADE_PROFILES,
         'image': IMAGE_CONFIG,
         'pyzbar': PYZBAR_CONFIG,
+        'opencv': OPENCV_CONFIG,
+        'scanline': SCANLINE_CONFIG,
+        'enhancement': ENHANCEMENT_CONFIG,
+        'quality': QUALITY_CONFIG,
+        'rectification': RECTIFICATION_CONFIG,
+        'rotation': ROTATION_CONFIG,
+        'race': RACE_CONFIG,
+        'validation': VALIDATION_CONFIG,
+        'stream': STREAM_CONFIG,
+        'batch': BATCH_CONFIG,
+        'watch': WATCH_CONFIG,
+        'tiling': TILING_CONFIG,
+        'segmentation': SEGMENTATION_CONFIG,
         'morphology': MORPHOLOGY_CONFIG,
         'easyocr': EASYOCR_CONFIG,
+        'tesseract': TESSERACT_CONFIG,
         'gui': GUI_CONFIG,
         'output': OUTPUT_CONFIG,
+        'memory': MEMORY_CONFIG,
         'logging': LOGGING_CONFIG,
     }
     return configs.get(section, {})
@@ -144,11 +532,27 @@ def get_all_config():
     """Get all configuration"""
     return {
         'detection': DETECTION_CONFIG,
+        'profiles': CASCADE_PROFILES,
         'image': IMAGE_CONFIG,
         'pyzbar': PYZBAR_CONFIG,
+        'opencv': OPENCV_CONFIG,
+        'scanline': SCANLINE_CONFIG,
+        'enhancement': ENHANCEMENT_CONFIG,
+        'quality': QUALITY_CONFIG,
+        'rectification': RECTIFICATION_CONFIG,
+        'rotation': ROTATION_CONFIG,
+        'race': RACE_CONFIG,
+        'validation': VALIDATION_CONFIG,
+        'stream': STREAM_CONFIG,
+        'batch': BATCH_CONFIG,
+        'watch': WATCH_CONFIG,
+        'tiling': TILING_CONFIG,
+        'segmentation': SEGMENTATION_CONFIG,
         'morphology': MORPHOLOGY_CONFIG,
         'easyocr': EASYOCR_CONFIG,
+        'tesseract': TESSERACT_CONFIG,
         'gui': GUI_CONFIG,
         'output': OUTPUT_CONFIG,
+        'memory': MEMORY_CONFIG,
         'logging': LOGGING_CONFIG,
     }
@@ -44,12 +44,9 @@ def generate_accuracy_metrics():
     
     # Process each image
     results = []
-    method_stats = {
-        'pyzbar': {'success': 0, 'total': 0, 'barcodes': []},
-        'morphology': {'success': 0, 'total': 0, 'barcodes': []},
-        'easyocr': {'success': 0, 'total': 0, 'barcodes': []},
-        'failed': {'count': 0}
-    }
+    methods = list(detector.methods)
+    method_stats = {method: {'success': 0, 'total': 0, 'barcodes': []} for method in methods}
+    method_stats['failed'] = {'count': 0}
     
     print("\nProcessing images...")
     print("-" * 80)
@@ -80,7 +77,7 @@ def generate_accuracy_metrics():
                 method_stats[method]['barcodes'].append(result['barcode_content'])
                 print(f"✓ [{method.upper()}] {result['barcode_content']}")
             else:
-                for method in ['pyzbar', 'morphology', 'easyocr']:
+                for method in methods:
                     method_stats[method]['total'] += 1
                 method_stats['failed']['count'] += 1
                 print(f"✗ FAILED")
@@ -97,7 +94,7 @@ def generate_accuracy_metrics():
             }
             results.append(detection_result)
             
-            for method in ['pyzbar', 'morphology', 'easyocr']:
+            for method in methods:
                 method_stats[method]['total'] += 1
             method_stats['failed']['count'] += 1
             print(f"✗ ERROR: {str(e)}")
@@ -119,7 +116,7 @@ def generate_accuracy_metrics():
     print(f"  Overall Accuracy: {overall_accuracy:.2f}%")
     
     print(f"\nMETHOD-SPECIFIC STATISTICS:")
-    for method in ['pyzbar', 'morphology', 'easyocr']:
+    for method in methods:
         stats = method_stats[method]
         if stats['total'] > 0:
             accuracy = (stats['success'] / stats['total'] * 100)
@@ -183,7 +180,7 @@ def generate_accuracy_metrics():
         f.write(f"  Overall Accuracy: {overall_accuracy:.2f}%\n\n")
         
         f.write("METHOD-SPECIFIC STATISTICS:\n")
-        for method in ['pyzbar', 'morphology', 'easyocr']:
+        for method in methods:
             stats = method_stats[method]
             if stats['total'] > 0:
                 accuracy = (stats['success'] / stats['total'] * 100)
@@ -4,9 +4,15 @@ OCR Barcode Detector - Main Entry Point
 Provides both CLI and GUI interfaces for barcode detection
 """
 
+import os
 import sys
+import json
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
 from barcode_detector import BarcodeDetector
+from config import get_config
 
 
 def main():
@@ -25,25 +31,82 @@ Examples:
   # CLI Mode - Process multiple images
   python main.py -i image1.jpg image2.jpg image3.jpg
 
+  # CLI Mode - Every barcode on each image, with its position
+  python main.py -i label.jpg --all
+
+  # Video file or camera (index or /dev/videoN), one JSON event per line
+  python main.py --video clip.mp4 --fps 5 -o events.jsonl
+  python main.py --video 0
+
+  # Paths from a manifest or stdin, one JSON result per line as they finish
+  find /mnt/scans -name '*.jpg' | python main.py --manifest - --unordered > results.jsonl
+  python main.py --manifest paths.txt -o results.jsonl
+
+  # Every image under a directory tree; decoding starts while it is still being listed
+  python main.py --dir /mnt/archive --exclude 'thumbs' --include '*.jpg' -o results.jsonl
+
+  # Process new images dropped into a directory until interrupted (JSONL output)
+  python main.py --watch /mnt/scans -o results.jsonl
+
   # GUI Mode with custom title
   python main.py --gui
         """
     )
     
     parser.add_argument('-i', '--image', nargs='+', help='Image file path(s) for CLI mode')
+    parser.add_argument('--all', action='store_true',
+                        help='Report every barcode on each image, not just the first')
+    parser.add_argument('--manifest', metavar='FILE',
+                        help="File listing image paths, one per line ('-' = stdin; JSONL output)")
+    parser.add_argument('--dir', metavar='DIR',
+                        help='Process every image under DIR, recursively (JSONL output)')
+    parser.add_argument('--include', action='append',
+                        help='With --dir, only files whose name or relative path matches this glob')
+    parser.add_argument('--exclude', action='append',
+                        help='With --dir, skip files and directories matching this glob')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Write -i results as JSON lines instead of the report')
+    parser.add_argument('--unordered', action='store_true',
+                        help='With --manifest/--dir/--jsonl, write results as they finish, '
+                             'not in input order')
+    parser.add_argument('--video', metavar='SOURCE',
+                        help='Video file, V4L2 device or camera index to scan (JSONL output)')
+    parser.add_argument('--fps', type=float,
+                        help='Frames decoded per second of video (default: STREAM_CONFIG)')
+    parser.add_argument('--max-frames', type=int, help='Stop after this many sampled video frames')
+    parser.add_argument('--watch', metavar='DIR',
+                        help='Process images as they arrive in DIR (JSONL output)')
+    parser.add_argument('--ledger', help='Processed-files ledger for --watch '
+                                         '(default: DIR/.barcode_ledger)')
+    parser.add_argument('-o', '--output',
+                        help='JSONL output file for --manifest, --dir, --jsonl, --video and --watch '
+                             '(default: stdout)')
     parser.add_argument('--gui', action='store_true', help='Start GUI mode (default)')
     
     args = parser.parse_args()
     
+    if args.watch is not None:
+        run_watch(args.watch, output=args.output, ledger_path=args.ledger)
+    elif args.manifest is not None or args.dir is not None or (args.image and args.jsonl):
+        if args.manifest is not None:
+            paths = read_manifest(args.manifest)
+        elif args.dir is not None:
+            from utils import iter_image_files
+            paths = iter_image_files(args.dir, include=args.include, exclude=args.exclude)
+        else:
+            paths = args.image
+        run_jsonl(paths, ordered=not args.unordered, all_barcodes=args.all, output=args.output)
+    elif args.video is not None:
+        run_video(args.video, target_fps=args.fps, max_frames=args.max_frames, output=args.output)
     # If images provided, run in CLI mode
-    if args.image:
-        run_cli(args.image)
+    elif args.image:
+        run_cli(args.image, all_barcodes=args.all)
     else:
         # Default to GUI mode
         run_gui()
 
 
-def run_cli(image_paths):
+def run_cli(image_paths, all_barcodes=False):
     """Run barcode detection in CLI mode"""
     detector = BarcodeDetector()
     
@@ -55,6 +118,11 @@ def run_cli(image_paths):
         print(f"\nProcessing: {image_path}")
         print("-" * 60)
         
+        if all_barcodes:
+            print_barcodes(detector.extract_barcodes(image_path))
+            print("-" * 60)
+            continue
+        
         result = detector.extract_barcode(image_path)
         
         if result['success']:
@@ -72,6 +140,177 @@ def run_cli(image_paths):
     print("="*60 + "\n")
 
 
+def print_barcodes(result):
+    """Print every barcode of an extract_barcodes result"""
+    if not result['success']:
+        print(f"✗ Status: {result['message']}")
+        return
+    print(f"✓ Status: {result['message']}")
+    for barcode in result['barcodes']:
+        check = 'validated' if barcode['validated'] else 'unvalidated'
+        print(f"  {barcode['type']:<8} b'{barcode['data']}'  "
+              f"({barcode['method']}, {check}, angle {barcode['angle']}°, rect {barcode['rect']})")
+
+
+def read_manifest(source):
+    """
+    Yield image paths from a manifest, one per line ('-' reads stdin)
+    Paths are read lazily; blank lines and '#' comments are skipped
+    """
+    f = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in f:
+            path = line.rstrip('\r\n')
+            if path.strip() and not path.startswith('#'):
+                yield path
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def run_jsonl(paths, ordered=True, all_barcodes=False, output=None, detector=None):
+    """
+    Decode an iterable of paths on a bounded pool, one JSON object per line
+    ordered=True writes in input order (a slow image holds back the ones
+    after it); ordered=False writes each result as soon as it is ready
+    Results are written by the calling thread only, so a closed pipe stops
+    the run in one place
+    """
+    from utils import BoundedExecutor
+    
+    config = get_config('batch')
+    detector = detector or BarcodeDetector()
+    extract = detector.extract_barcodes if all_barcodes else detector.extract_barcode
+    max_pending = config.get('max_pending', 16)
+    out = open(output, 'w') if output else sys.stdout
+    
+    def process(path):
+        try:
+            result = extract(path)
+        except Exception as e:
+            result = {'success': False, 'message': f'Error: {e}'}
+        return dict(path=path, **result)
+    
+    def write(result):
+        out.write(json.dumps(result) + '\n')
+        out.flush()
+    
+    executor = BoundedExecutor(config.get('workers', 4), max_pending, thread_name_prefix='batch')
+    broken = False
+    try:
+        if ordered:
+            # Finished results wait here for the ones before them; bounded
+            # like the pool so a slow image cannot make it grow
+            waiting = deque()
+            for path in paths:
+                if len(waiting) >= max_pending:
+                    write(waiting.popleft().result())
+                waiting.append(executor.submit(process, path))
+                while waiting and waiting[0].done():
+                    write(waiting.popleft().result())
+            while waiting:
+                write(waiting.popleft().result())
+        else:
+            # Written in completion order from a window of max_pending
+            window = set()
+            for path in paths:
+                if len(window) >= max_pending:
+                    done, window = wait(window, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        write(future.result())
+                window.add(executor.submit(process, path))
+            while window:
+                done, window = wait(window, return_when=FIRST_COMPLETED)
+                for future in done:
+                    write(future.result())
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. '| head'): stop quietly, without
+        # decoding the paths nobody will read
+        broken = True
+        sys.stdout = open(os.devnull, 'w')
+    finally:
+        executor.shutdown(wait=True, cancel_futures=broken)
+        if output:
+            out.close()
+
+
+def run_video(source, target_fps=None, max_frames=None, output=None):
+    """Scan a video file or camera stream, writing one JSON event per line"""
+    from stream import scan_stream
+    
+    config = get_config('stream')
+    if target_fps is not None:
+        config = dict(config, target_fps=target_fps)
+    
+    detector = BarcodeDetector()
+    out = open(output, 'w') if output else sys.stdout
+    try:
+        for event in scan_stream(detector, source, config, max_frames=max_frames):
+            out.write(json.dumps(event) + '\n')
+            out.flush()
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if output:
+            out.close()
+
+
+def run_watch(directory, output=None, ledger_path=None, stop=None):
+    """
+    Process images as they arrive in a directory, one JSON result per line
+    Results are appended as files finish; the ledger makes a restart skip
+    the files already processed
+    """
+    from utils import BoundedExecutor
+    from watch import DirectoryWatcher, Ledger
+    
+    if not os.path.isdir(directory):
+        print(f"Error: Not a directory: {directory}", file=sys.stderr)
+        sys.exit(1)
+    
+    config = get_config('watch')
+    ledger = Ledger(ledger_path or config.get('ledger') or os.path.join(directory, '.barcode_ledger'))
+    watcher = DirectoryWatcher(
+        directory,
+        settle_seconds=config.get('settle_seconds', 2.0),
+        poll_interval=config.get('poll_interval', 2.0),
+        rescan_interval=config.get('rescan_interval', 60.0),
+        use_inotify=config.get('inotify', True),
+        skip=ledger.contains,
+        forget=ledger.forget
+    )
+    detector = BarcodeDetector()
+    out = open(output, 'a') if output else sys.stdout
+    write_lock = threading.Lock()
+    
+    def process(path, stat):
+        try:
+            result = detector.extract_barcode(path)
+        except Exception as e:
+            # Not recorded in the ledger: retried after a restart
+            result = {'success': False, 'barcode_content': None, 'method': None, 'message': f'Error: {e}'}
+            stat = None
+        with write_lock:
+            out.write(json.dumps(dict(path=path, **result)) + '\n')
+            out.flush()
+        if stat is not None:
+            ledger.record(path, stat)
+    
+    executor = BoundedExecutor(config.get('workers', 4), config.get('max_pending', 8),
+                               thread_name_prefix='watch')
+    try:
+        for path, stat in watcher.watch(stop):
+            executor.submit(process, path, stat)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(wait=True)
+        ledger.close()
+        if output:
+            out.close()
+
+
 def run_gui():
     """Run barcode detection in GUI mode"""
     try:
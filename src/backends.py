@@ -0,0 +1,340 @@
+import threading
+
+import cv2
+import numpy as np
+from pyzbar.pyzbar import ZBarSymbol, decode as zbar_decode
+
+from config import get_config
+from scanline import SUPPORTED_SYMBOLOGIES, decode_scanlines
+from text_extraction import best_text_line
+from zbar_scanner import ZBarScanner
+
+try:
+    import pytesseract
+    PYTESSERACT_AVAILABLE = True
+except ImportError:
+    PYTESSERACT_AVAILABLE = False
+
+
+# Registered backend classes by name
+BACKENDS = {}
+
+
+def register_backend(cls):
+    """Class decorator adding a decoder backend to the registry under cls.name"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def create_backends(names, detector=None, symbologies=None):
+    """
+    Instantiate registered backends
+
+    Args:
+        names: Backend names in cascade order
+        detector: Owning BarcodeDetector, shared with backends that need
+                  its model, locks or configuration
+        symbologies: Symbology allowlist (ZBarSymbol names); None = all
+
+    Returns:
+        dict of name -> backend instance, in the given order
+    """
+    unknown = [name for name in names if name not in BACKENDS]
+    if unknown:
+        raise ValueError(f"Unknown decoder backend(s): {', '.join(unknown)} "
+                         f"(registered: {', '.join(sorted(BACKENDS))})")
+    return {name: BACKENDS[name](detector, symbologies) for name in names}
+
+
+def normalize_symbologies(symbologies):
+    """
+    Validate a symbology allowlist against zbar's names
+    Returns: frozenset of upper-case names, or None for every symbology
+    """
+    if symbologies is None:
+        return None
+    names = frozenset(str(name).upper() for name in symbologies)
+    unknown = sorted(name for name in names if name not in ZBarSymbol.__members__)
+    if unknown:
+        raise ValueError(f"Unknown symbology: {', '.join(unknown)}")
+    return names
+
+
+class DecoderBackend:
+    """
+    Base class for decoder plugins
+
+    Attributes:
+        name: Registry key, also reported as the result 'method'
+        kind: 'symbol' for bar/matrix decoders, 'text' for OCR of the printed line
+        cost: Rough relative cost per megapixel (pyzbar = 1.0)
+        rotations: Whether the cascade retries the backend on rotated frames
+        regions: Decode located candidate regions instead of the whole frame
+        config_section: config.py section holding the backend's settings
+        symbologies: Symbologies the decoder can read (None = any zbar symbology)
+    """
+    name = None
+    kind = 'symbol'
+    cost = 1.0
+    rotations = False
+    regions = False
+    config_section = None
+    symbologies = None
+
+    def __init__(self, detector=None, symbologies=None):
+        self.detector = detector
+        self.config = get_config(self.config_section) if self.config_section else {}
+        self.allowed = normalize_symbologies(symbologies)
+
+    def wanted(self):
+        """
+        Symbologies this backend should look for: its own capabilities
+        narrowed by the profile allowlist (None = no restriction)
+        """
+        if self.symbologies is None:
+            return self.allowed
+        if self.allowed is None:
+            return frozenset(self.symbologies)
+        return self.allowed & frozenset(self.symbologies)
+
+    def enabled(self):
+        """Whether the backend is switched on and can read an allowed symbology"""
+        if not self.config.get('enabled', True):
+            return False
+        return self.kind == 'text' or self.wanted() is None or bool(self.wanted())
+
+    def _allowed_only(self, results):
+        """Drop results of symbologies outside the allowlist"""
+        wanted = self.wanted()
+        if wanted is None:
+            return results
+        return [result for result in results if result.get('type') in wanted]
+
+    def available(self):
+        """Whether the backend's library (and model, if any) can be used"""
+        return True
+
+    def decode(self, image):
+        """
+        Decode an image
+        Returns: list of result dicts with 'data', 'type', 'method' and,
+        where known, 'rect' (x, y, w, h) and 'polygon' in image pixels
+        """
+        raise NotImplementedError
+
+
+@register_backend
+class ScanlineBackend(DecoderBackend):
+    """NumPy scanline decoder for axis-aligned Code128/EAN"""
+    name = 'scanline'
+    cost = 0.05
+    regions = True
+    config_section = 'scanline'
+    symbologies = SUPPORTED_SYMBOLOGIES
+
+    def wanted(self):
+        wanted = super().wanted()
+        if self.config.get('symbologies') is not None:
+            wanted &= normalize_symbologies(self.config['symbologies'])
+        return wanted
+
+    def decode(self, image):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return decode_scanlines(
+            gray,
+            lines=self.config.get('lines', 7),
+            min_agreement=self.config.get('min_agreement', 2),
+            symbologies=self.wanted()
+        )
+
+
+@register_backend
+class PyzbarBackend(DecoderBackend):
+    """zbar through pyzbar: 1D codes and QR, near axis-aligned"""
+    name = 'pyzbar'
+    cost = 1.0
+    rotations = True
+    config_section = 'pyzbar'
+
+    def __init__(self, detector=None, symbologies=None):
+        super().__init__(detector, symbologies)
+        # zbar only runs the decoders it is asked for; None enables them all
+        wanted = self.wanted()
+        self.zbar_symbols = None if wanted is None else [ZBarSymbol[name] for name in sorted(wanted)]
+        self._local = threading.local()
+
+    def _scanner(self):
+        """This thread's configured zbar scanner"""
+        scanner = getattr(self._local, 'scanner', None)
+        if scanner is None:
+            scanner = self._local.scanner = ZBarScanner(self.zbar_symbols)
+        return scanner
+
+    def decode(self, image):
+        if self.config.get('persistent_scanner', True):
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            barcodes = self._scanner().scan(gray)
+        else:
+            barcodes = zbar_decode(image, symbols=self.zbar_symbols)
+        return [
+            {
+                'data': barcode.data.decode('utf-8'),
+                'type': barcode.type,
+                'method': 'pyzbar',
+                'rect': tuple(barcode.rect),
+                'polygon': [tuple(point) for point in barcode.polygon],
+            }
+            for barcode in barcodes
+        ]
+
+
+class _OpenCVBackend(DecoderBackend):
+    """Shared geometry handling for OpenCV's detectors (one instance per thread)"""
+    config_section = 'opencv'
+
+    def __init__(self, detector=None, symbologies=None):
+        super().__init__(detector, symbologies)
+        self._local = threading.local()
+
+    def _cv_detector(self):
+        if getattr(self._local, 'detector', None) is None:
+            self._local.detector = self._create()
+        return self._local.detector
+
+    def _create(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def _symbol(data, symbol_type, method, points):
+        """Result dict from decoded text and a 4-point polygon"""
+        polygon = [(int(round(x)), int(round(y))) for x, y in np.asarray(points).reshape(-1, 2)]
+        return {
+            'data': data,
+            'type': symbol_type,
+            'method': method,
+            'rect': tuple(int(v) for v in cv2.boundingRect(np.array(polygon, dtype=np.int32))),
+            'polygon': polygon,
+        }
+
+
+@register_backend
+class OpenCVBarcodeBackend(_OpenCVBackend):
+    """cv2.barcode: EAN/UPC at any orientation (no Code128 in OpenCV 4.x)"""
+    name = 'opencv_barcode'
+    cost = 2.0
+    symbologies = ('EAN13', 'EAN8', 'UPCA', 'UPCE')
+
+    # OpenCV type names mapped to the pyzbar names used everywhere else
+    TYPE_NAMES = {'EAN_13': 'EAN13', 'EAN_8': 'EAN8', 'UPC_A': 'UPCA', 'UPC_E': 'UPCE'}
+
+    def available(self):
+        return hasattr(cv2, 'barcode')
+
+    def _create(self):
+        return cv2.barcode.BarcodeDetector()
+
+    def decode(self, image):
+        ok, infos, types, points = self._cv_detector().detectAndDecodeWithType(image)
+        if not ok or points is None:
+            return []
+        return self._allowed_only([
+            self._symbol(data, self.TYPE_NAMES.get(kind, kind), self.name, corners)
+            for data, kind, corners in zip(infos, types, points) if data
+        ])
+
+
+@register_backend
+class OpenCVQRBackend(_OpenCVBackend):
+    """cv2.QRCodeDetector: QR codes at any orientation"""
+    name = 'opencv_qr'
+    cost = 1.5
+    symbologies = ('QRCODE',)
+
+    def _create(self):
+        return cv2.QRCodeDetector()
+
+    def decode(self, image):
+        ok, infos, points, _ = self._cv_detector().detectAndDecodeMulti(image)
+        if not ok or points is None:
+            return []
+        return [
+            self._symbol(data, 'QRCODE', self.name, corners)
+            for data, corners in zip(infos, points) if data
+        ]
+
+
+@register_backend
+class EasyOCRBackend(DecoderBackend):
+    """EasyOCR on the whole frame, using the detector's shared reader"""
+    name = 'easyocr'
+    kind = 'text'
+    cost = 50.0
+    rotations = True
+    config_section = 'easyocr'
+
+    def available(self):
+        return self.detector is not None and self.detector._get_reader() is not None
+
+    def decode(self, image):
+        reader = self.detector._get_reader()
+        if reader is None:
+            return []
+        fast = self.config.get('fast_mode', {})
+        if fast.get('enabled', True):
+            # Restricted charset, single best line instead of the whole page
+            line = best_text_line(self.detector._readtext_fast(reader, image),
+                                  min_length=fast.get('min_text_length', 6))
+            if line is None:
+                return []
+            text, confidence = line
+            return [{'data': text, 'type': 'TEXT', 'method': self.name, 'confidence': confidence}]
+
+        result = self.detector._readtext(reader, image)
+        if not result:
+            return []
+        return [{'data': ''.join(text[1] for text in result), 'type': 'TEXT', 'method': self.name}]
+
+
+@register_backend
+class TesseractBackend(DecoderBackend):
+    """Tesseract through pytesseract; needs the tesseract binary on PATH"""
+    name = 'tesseract'
+    kind = 'text'
+    cost = 15.0
+    rotations = True
+    config_section = 'tesseract'
+
+    _version_checked = None
+
+    def available(self):
+        if not PYTESSERACT_AVAILABLE:
+            return False
+        if TesseractBackend._version_checked is None:
+            try:
+                pytesseract.get_tesseract_version()
+                TesseractBackend._version_checked = True
+            except Exception:
+                TesseractBackend._version_checked = False
+        return TesseractBackend._version_checked
+
+    def decode(self, image):
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        allowlist = self.config.get('allowlist') or get_config('easyocr').get('allowlist')
+        options = f"--psm {self.config.get('psm', 11)}"
+        if allowlist:
+            options += f" -c tessedit_char_whitelist={allowlist}"
+        data = pytesseract.image_to_data(gray, config=options,
+                                         output_type=pytesseract.Output.DICT)
+
+        # Same (box, text, confidence) shape as EasyOCR so lines rank the same way
+        words = []
+        for i, text in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if text.strip() and confidence >= 0:
+                x, y, w, h = (data[key][i] for key in ('left', 'top', 'width', 'height'))
+                words.append(([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], text, confidence / 100))
+        line = best_text_line(words, min_length=self.config.get('min_text_length', 6))
+        if line is None:
+            return []
+        text, confidence = line
+        return [{'data': text, 'type': 'TEXT', 'method': self.name, 'confidence': confidence}]
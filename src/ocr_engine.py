@@ -1,9 +1,26 @@
 import cv2
 import numpy as np
-from pyzbar.pyzbar import decode
 import os
+import queue
+import threading
+import time
+import tracemalloc
+import warnings
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 
+from backends import create_backends
+from config import get_config
+from preprocessing import ENHANCEMENT_VARIANTS, VariantLadder, release_scratch_buffers
+from quality import assess_quality
+from rectification import fit_quadrilateral, map_symbol, rectify_region, skew_degrees, symbol_angle
+from segmentation import find_label_regions
+from text_extraction import clean_text, find_barcode_candidates, human_readable_strips, score_candidate
+from tiling import decode_tiles, merge_symbols
+from utils import get_rss_bytes, release_memory, timestamp
+
 try:
     import easyocr
     EASYOCR_AVAILABLE = True
@@ -11,32 +28,389 @@ except ImportError:
     EASYOCR_AVAILABLE = False
 
 
+class ImageBudgetError(ValueError):
+    """Raised when an image exceeds the configured pixel or memory budget"""
+
+
 class BarcodeDetector:
     """OCR Barcode Detector for extracting barcode contents from images"""
     
-    def __init__(self):
-        """Initialize the barcode detector"""
+    def __init__(self, profile=None):
+        """
+        Initialize the barcode detector
+        Args:
+            profile: Cascade profile from CASCADE_PROFILES (default:
+                     DETECTION_CONFIG['profile'])
+        """
         self.reader = None  # Lazy load EasyOCR
+        self.memory_config = get_config('memory')
+        self.image_config = get_config('image')
+        self.tiling_config = get_config('tiling')
+        self.segmentation_config = get_config('segmentation')
+        self.morphology_config = get_config('morphology')
+        self.easyocr_config = get_config('easyocr')
+        self.enhancement_config = get_config('enhancement')
+        self.quality_config = get_config('quality')
+        self.rectification_config = get_config('rectification')
+        self.rotation_config = get_config('rotation')
+        self.race_config = get_config('race')
+        self.validation_config = get_config('validation')
+        self.ladder = VariantLadder(
+            self.enhancement_config.get('variants', []),
+            warmup=self.enhancement_config.get('warmup', 20)
+        )
+        self.detection_config = get_config('detection')
+        self.profile = profile or self.detection_config.get('profile', 'any')
+        profile_config = get_config('profiles').get(self.profile)
+        if profile_config is None:
+            raise ValueError(f"Unknown cascade profile: {self.profile}")
+        self.methods = list(profile_config.get('methods')
+                            or self.detection_config.get('methods', ['pyzbar', 'morphology', 'easyocr']))
+        self.symbologies = profile_config.get('symbologies')
+        self.backends = create_backends([m for m in self.methods if m != 'morphology'],
+                                        detector=self, symbologies=self.symbologies)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._ocr_lock = threading.Lock()
+        self._image_cache = OrderedDict()
+        self._active_calls = 0
+        self._last_used = time.monotonic()
+        self._watchdog = None
+        self._rotation_pool = None
+        self._race_pool = None
+        self.metrics = {
+            'model_loads': 0,
+            'model_unloads': 0,
+            'cache_evictions': 0,
+            'last_loaded_at': None,
+            'last_unloaded_at': None,
+            'last_unload_reason': None,
+            'events': deque(maxlen=50),
+        }
 
     def _load_image(self, image_path):
-        """Load image as numpy array"""
-        image = cv2.imread(image_path)
-        return image
+        """Load image as numpy array, reusing recently decoded images"""
+        decoded = self._decode_image(image_path)
+        return decoded[0] if decoded is not None else None
+
+    def _decode_image(self, image_path):
+        """
+        Decode an image within the IMAGE_CONFIG size caps
+        Returns: tuple (image, scale) where scale maps decoded pixels back
+        to the original resolution, or None if the file cannot be read
+        """
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        key = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        
+        with self._lock:
+            cached = self._image_cache.get(key)
+            if cached is not None:
+                self._image_cache.move_to_end(key)
+                return cached
+        
+        start = time.perf_counter()
+        size, image_format = _read_image_header(image_path)
+        reduction = self._choose_reduction(size)
+        self._check_budget(size, image_format, reduction)
+        image = cv2.imread(image_path, self._imread_flag(reduction))
+        if image is None:
+            return None
+        
+        # Reduced decodes only come in powers of two; finish with an area resize
+        fit = self._fit_to_caps(image)
+        if fit is not None:
+            image = fit
+        scale = max(size) / max(image.shape[:2]) if size is not None else float(reduction)
+        
+        self.metrics['last_decode'] = {
+            'path': image_path,
+            'source_size': size,
+            'decoded_shape': image.shape,
+            'reduction': reduction,
+            'decode_ms': round((time.perf_counter() - start) * 1000, 1),
+        }
+        
+        decoded = (image, scale)
+        cache_size = self.memory_config.get('image_cache_size', 0)
+        if cache_size > 0:
+            with self._lock:
+                self._image_cache[key] = decoded
+                while len(self._image_cache) > cache_size:
+                    self._image_cache.popitem(last=False)
+                self._start_watchdog()
+        return decoded
+
+    def _choose_reduction(self, size):
+        """
+        Pick the largest power-of-two decoder reduction that keeps the
+        image at or above the configured caps
+        """
+        if size is None or not self.image_config.get('reduced_decode', True):
+            return 1
+        max_w = self.image_config.get('max_width', 2000)
+        max_h = self.image_config.get('max_height', 2000)
+        # Compare long side with long cap so EXIF rotation cannot matter
+        scale = max(
+            max(size) / max(max_w, max_h),
+            min(size) / min(max_w, max_h)
+        )
+        reduction = 1
+        for factor in (2, 4, 8):
+            if factor <= scale:
+                reduction = factor
+        return reduction
+
+    def _check_budget(self, size, image_format, reduction):
+        """
+        Enforce the per-image pixel and decode-memory budgets from the
+        header alone, before any pixels are decoded
+        """
+        if size is None:
+            return
+        width, height = size
+        pixels = width * height
+        max_pixels = self.image_config.get('max_pixels')
+        if max_pixels and pixels > max_pixels:
+            # 'downscale' is handled by the reduced decode and the size caps
+            if self.image_config.get('oversize_policy', 'downscale') == 'reject':
+                raise ImageBudgetError(
+                    f"{width}x{height} ({pixels / 1e6:.0f} MP) exceeds the "
+                    f"{max_pixels / 1e6:.0f} MP pixel budget"
+                )
+        
+        max_decode_mb = self.image_config.get('max_decode_mb')
+        if max_decode_mb:
+            decode_mb = _estimate_decode_bytes(
+                size, image_format, reduction,
+                channels=1 if self.image_config.get('grayscale', True) else 3
+            ) / (1024 * 1024)
+            if decode_mb > max_decode_mb:
+                raise ImageBudgetError(
+                    f"decoding {width}x{height} {image_format or 'image'} needs "
+                    f"~{decode_mb:.0f} MB, over the {max_decode_mb} MB memory budget"
+                )
+
+    def _full_resolution_refusal(self, image_path):
+        """
+        Why a reduced source may not be decoded at native resolution, or
+        None if it may: over max_pixels only the 'tile' policy allows it,
+        and the native decode has to fit max_decode_mb
+        """
+        size, image_format = _read_image_header(image_path)
+        if size is None:
+            return "unknown image size"
+        max_pixels = self.image_config.get('max_pixels')
+        if max_pixels and size[0] * size[1] > max_pixels \
+                and self.image_config.get('oversize_policy', 'downscale') != 'tile':
+            return "image over pixel budget"
+        max_decode_mb = self.image_config.get('max_decode_mb')
+        channels = 1 if self.image_config.get('grayscale', True) else 3
+        if max_decode_mb and _estimate_decode_bytes(
+                size, image_format, 1, channels=channels) / (1024 * 1024) > max_decode_mb:
+            return "over memory budget"
+        return None
+
+    def _imread_flag(self, reduction):
+        """cv2.imread flag for the requested reduction and color mode"""
+        if not self.image_config.get('grayscale', True):
+            return {
+                1: cv2.IMREAD_COLOR,
+                2: cv2.IMREAD_REDUCED_COLOR_2,
+                4: cv2.IMREAD_REDUCED_COLOR_4,
+                8: cv2.IMREAD_REDUCED_COLOR_8,
+            }[reduction]
+        return {
+            1: cv2.IMREAD_GRAYSCALE,
+            2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+            4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+            8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+        }[reduction]
+
+    def _fit_to_caps(self, image):
+        """Area-resize image to fit max_width/max_height; None if it already fits"""
+        max_w = self.image_config.get('max_width', 2000)
+        max_h = self.image_config.get('max_height', 2000)
+        h, w = image.shape[:2]
+        if w >= h:
+            factor = min(max(max_w, max_h) / w, min(max_w, max_h) / h)
+        else:
+            factor = min(max(max_w, max_h) / h, min(max_w, max_h) / w)
+        if factor >= 1:
+            return None
+        size = (max(1, int(w * factor)), max(1, int(h * factor)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    def _crop_roi(self, image, bbox):
+        """
+        Crop a region, re-reading it at full resolution when the decoded
+        frame was reduced and the crop is too small to keep its detail;
+        sources over the full-resolution budget are cropped as decoded
+        """
+        x, y, w, h = bbox
+        roi = image[y:y+h, x:x+w]
+        source = getattr(self._local, 'source', None)
+        if source is None or image is not source['image'] or source['scale'] <= 1:
+            return roi
+        if min(w, h) >= self.image_config.get('min_crop_side', 200):
+            return roi
+        # The full-resolution frame is decoded once per detection and
+        # released with the source when the detection finishes; False
+        # records that it cannot or may not be read
+        full = source.get('full')
+        if full is None:
+            if self._full_resolution_refusal(source['path']) is None:
+                full = cv2.imread(source['path'], self._imread_flag(1))
+            source['full'] = full = full if full is not None else False
+        if full is False:
+            return roi
+        scale = full.shape[1] / image.shape[1]
+        x0, y0 = int(x * scale), int(y * scale)
+        x1, y1 = int((x + w) * scale), int((y + h) * scale)
+        return full[y0:y1, x0:x1].copy()
     
     def _get_reader(self):
         """Lazy load EasyOCR reader to avoid startup delays"""
-        if self.reader is None and EASYOCR_AVAILABLE:
-            self.reader = easyocr.Reader(
-                ['en'], 
-                gpu=False,
-                verbose=False,
-                model_storage_directory=os.path.expanduser('~/.easyocr')
-            )
-        return self.reader
+        with self._lock:
+            if self.reader is None and EASYOCR_AVAILABLE:
+                self.reader = easyocr.Reader(
+                    ['en'], 
+                    gpu=False,
+                    verbose=False,
+                    model_storage_directory=os.path.expanduser('~/.easyocr')
+                )
+                event = 'reload' if self.metrics['model_unloads'] else 'load'
+                self.metrics['model_loads'] += 1
+                self.metrics['last_loaded_at'] = timestamp()
+                self._record_event(event)
+                self._start_watchdog()
+            return self.reader
+
+    def _record_event(self, event, reason=None):
+        """Append a memory-management event to the metrics log"""
+        self.metrics['events'].append({
+            'event': event,
+            'reason': reason,
+            'time': timestamp(),
+            'rss_mb': self._rss_mb(),
+        })
+
+    @staticmethod
+    def _rss_mb():
+        """Current resident memory in MB (None if unknown)"""
+        rss = get_rss_bytes()
+        return round(rss / (1024 * 1024), 1) if rss is not None else None
+
+    def _start_watchdog(self):
+        """Start the idle watchdog thread if it is not already running"""
+        if self.memory_config.get('idle_timeout') is None:
+            return
+        if self._watchdog is not None and self._watchdog.is_alive():
+            return
+        # The thread only holds a weak reference so it never keeps the detector alive
+        self._watchdog = threading.Thread(
+            target=_idle_watchdog,
+            args=(weakref.ref(self), self.memory_config.get('check_interval', 30)),
+            name='BarcodeDetector-idle-watchdog',
+            daemon=True
+        )
+        self._watchdog.start()
+
+    def _is_holding_memory(self):
+        """Whether the model or any cached images are still resident"""
+        return self.reader is not None or bool(self._image_cache)
+
+    def evict_caches(self, reason='manual'):
+        """Drop cached images and scratch buffers and return freed memory to the OS"""
+        with self._lock:
+            released = release_scratch_buffers()
+            if not self._image_cache and not released:
+                return
+            self._image_cache.clear()
+            self.metrics['cache_evictions'] += 1
+            self._record_event('evict_caches', reason)
+        release_memory()
+
+    def unload(self, reason='manual'):
+        """
+        Drop the EasyOCR model and all caches; the model reloads on next use
+        Automatic unloads (idle, RSS budget) are skipped while a detection
+        is running. The worker pools are only shut down when no detection
+        is running and are recreated on next use
+        """
+        with self._lock:
+            # Re-checked under the lock: a detection may have started since
+            # the caller decided to unload
+            if reason != 'manual' and self._active_calls:
+                return
+            had_reader = self.reader is not None
+            self.reader = None
+            self._image_cache.clear()
+            if not self._active_calls:
+                for attr in ('_rotation_pool', '_race_pool'):
+                    pool = getattr(self, attr)
+                    if pool is not None:
+                        pool.shutdown(wait=False)
+                        setattr(self, attr, None)
+            if had_reader:
+                self.metrics['model_unloads'] += 1
+                self.metrics['last_unloaded_at'] = timestamp()
+                self.metrics['last_unload_reason'] = reason
+                self._record_event('unload', reason)
+        release_memory()
+
+    def _check_idle(self):
+        """Unload everything once the detector has been idle for too long"""
+        idle_timeout = self.memory_config.get('idle_timeout')
+        with self._lock:
+            if idle_timeout is None or self._active_calls:
+                return
+            if time.monotonic() - self._last_used < idle_timeout:
+                return
+        self.unload(reason='idle')
+
+    def _enforce_memory_budget(self):
+        """Evict caches, then the model, while RSS exceeds the configured budget"""
+        budget_mb = self.memory_config.get('rss_budget_mb')
+        if budget_mb is None:
+            return
+        rss_mb = self._rss_mb()
+        if rss_mb is None or rss_mb <= budget_mb:
+            return
+        self.evict_caches(reason='rss_budget')
+        rss_mb = self._rss_mb()
+        if rss_mb is not None and rss_mb > budget_mb:
+            self.unload(reason='rss_budget')
+
+    def get_memory_metrics(self):
+        """
+        Get memory-management metrics
+        Returns: dict with load/unload counters, timestamps and recent events
+        """
+        with self._lock:
+            metrics = dict(self.metrics)
+            metrics['events'] = list(self.metrics['events'])
+            metrics['model_loaded'] = self.reader is not None
+            metrics['cached_images'] = len(self._image_cache)
+            metrics['idle_seconds'] = round(time.monotonic() - self._last_used, 1)
+        metrics['rss_mb'] = self._rss_mb()
+        return metrics
     
     def _rotate_image(self, image, angle):
         """Rotate image by given angle while keeping full frame"""
-        (h, w) = image.shape[:2]
+        matrix, size = self._rotation_matrix(image.shape, angle)
+        rotated = cv2.warpAffine(image, matrix, size, borderMode=cv2.BORDER_REPLICATE)
+        return rotated
+
+    @staticmethod
+    def _rotation_matrix(shape, angle):
+        """
+        Affine transform of _rotate_image
+        Returns: tuple (2x3 matrix, (width, height) of the rotated frame)
+        """
+        (h, w) = shape[:2]
         center = (w // 2, h // 2)
         matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
         cos = np.abs(matrix[0, 0])
@@ -45,173 +419,848 @@ class BarcodeDetector:
         nH = int((h * cos) + (w * sin))
         matrix[0, 2] += (nW / 2) - center[0]
         matrix[1, 2] += (nH / 2) - center[1]
-        rotated = cv2.warpAffine(image, matrix, (nW, nH), borderMode=cv2.BORDER_REPLICATE)
-        return rotated
+        return matrix, (nW, nH)
 
-    def _try_rotations(self, image, detector_fn, angles=None):
-        """Try detection on multiple rotations to handle tilted codes"""
+    def _try_rotations(self, image, detector_fn, angles=None, parallel=False, cancel=None):
+        """
+        Try detection on multiple rotations to handle tilted codes
+        With parallel=True the angles are evaluated concurrently on the
+        rotation pool, but outcomes are still taken in angle order: the
+        result is the one the serial sweep would return
+        Angles not yet started are skipped once the cancel event is set;
+        an unvalidated result (see _best_result) does not end the sweep
+        """
         if angles is None:
-            angles = [0, -15, 15, -30, 30, -45, 45]
+            angles = self.rotation_config.get('angles', [0, -15, 15, -30, 30, -45, 45])
+        if parallel and len(angles) > 1:
+            outcomes = self._parallel_angles(image, detector_fn, angles, cancel)
+        else:
+            outcomes = (
+                (None, "Cancelled") if cancel is not None and cancel.is_set()
+                else self._detect_at_angle(image, detector_fn, angle)
+                for angle in angles
+            )
+        
         last_msg = "No result"
-        for angle in angles:
-            rotated = image if angle == 0 else self._rotate_image(image, angle)
-            result, msg = detector_fn(rotated)
-            if result:
+        fallback = None
+        try:
+            for angle, (result, msg) in zip(angles, outcomes):
+                if not result:
+                    last_msg = msg
+                    continue
                 if angle != 0:
                     msg = f"{msg} (angle {angle}°)"
-                return result, msg
-            last_msg = msg
+                _, validated, score = self._best_result(result)
+                if validated:
+                    return result, msg
+                if fallback is None or score > fallback[2]:
+                    fallback = (result, msg, score)
+        finally:
+            # Cancels the angles still queued once one has decoded
+            outcomes.close()
+        if fallback is not None:
+            return fallback[0], fallback[1]
         return None, last_msg
 
-    def detect_barcode_pyzbar(self, image_path=None, image=None):
+    def _detect_at_angle(self, image, detector_fn, angle):
+        """Run detector_fn on the image rotated by angle (unrotated at 0)"""
+        rotated = image if angle == 0 else self._rotate_image(image, angle)
+        return detector_fn(rotated)
+
+    def _parallel_angles(self, image, detector_fn, angles, cancel=None):
         """
-        Detect barcode using pyzbar library
-        Returns: tuple (barcode_data, confidence)
+        Submit every angle to the rotation pool and yield (results, message)
+        in angle order; closing the generator (or setting cancel) cancels
+        the angles not started
         """
+        cancelled = threading.Event()
+        # Workers see the caller's decoded source, so cached candidates are shared
+        source = getattr(self._local, 'source', None)
+        
+        def run(angle):
+            if cancelled.is_set() or (cancel is not None and cancel.is_set()):
+                return None, "Cancelled"
+            self._local.source = source
+            try:
+                return self._detect_at_angle(image, detector_fn, angle)
+            finally:
+                self._local.source = None
+        
+        pool = self._get_rotation_pool()
+        run = self._charged(run)
+        futures = [pool.submit(run, angle) for angle in angles]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            cancelled.set()
+            for future in futures:
+                future.cancel()
+
+    def _charged(self, fn):
+        """
+        Wrap fn for a pool thread so the thread CPU time it uses is added to
+        the calling thread's CPU account (set per racing path, see
+        _race_cascade); fn itself is returned when there is no account
+        """
+        account = getattr(self._local, 'cpu_account', None)
+        if account is None:
+            return fn
+        
+        def charged(*args, **kwargs):
+            # Work fn hands on to further pools is charged to the same account
+            outer = getattr(self._local, 'cpu_account', None)
+            self._local.cpu_account = account
+            started = time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                account.append(time.thread_time() - started)
+                self._local.cpu_account = outer
+        
+        return charged
+
+    def _get_rotation_pool(self):
+        """Thread pool shared by parallel rotation sweeps, created on first use"""
+        with self._lock:
+            if self._rotation_pool is None:
+                self._rotation_pool = ThreadPoolExecutor(
+                    max_workers=self.rotation_config.get('workers', 4),
+                    thread_name_prefix='rotations'
+                )
+            return self._rotation_pool
+
+    def _backend(self, name):
+        """Backend instance by name, created on first use if not in the cascade"""
+        if name not in self.backends:
+            self.backends.update(create_backends([name], detector=self, symbologies=self.symbologies))
+        return self.backends[name]
+
+    def _crop_backends(self):
+        """Frame-level symbol decoders in the cascade, cheapest first"""
+        backends = [
+            self.backends[m] for m in self.methods
+            if m in self.backends and self.backends[m].kind == 'symbol'
+            and not self.backends[m].regions and self.backends[m].enabled()
+        ]
+        return sorted(backends, key=lambda backend: backend.cost)
+
+    def detect_with_backend(self, name, image_path=None, image=None):
+        """
+        Run one registered decoder backend on an image
+        Symbol decoders run over whole frames, region decoders over the
+        located barcode candidates and text backends over the whole frame
+        Returns: tuple (results, message)
+        """
+        backend = self._backend(name)
         try:
+            if not backend.available():
+                return None, f"{name} not available"
+            
             if image is None:
                 image = self._load_image(image_path)
             if image is None:
                 return None, "Error: Could not load image"
             
-            # Decode barcodes
-            barcodes = decode(image)
-            
-            if barcodes:
-                results = []
-                for barcode in barcodes:
-                    barcode_data = barcode.data.decode('utf-8')
-                    barcode_type = barcode.type
-                    results.append({
-                        'data': barcode_data,
-                        'type': barcode_type,
-                        'method': 'pyzbar'
-                    })
+            if backend.regions:
+                min_score = backend.config.get('min_score', 0.5)
+                candidates = [c for c in self._barcode_candidates(image) if c['score'] >= min_score]
+                for crop, to_frame in self._region_crops(image, candidates):
+                    symbols = backend.decode(crop)
+                    if symbols:
+                        return [map_symbol(symbol, to_frame) for symbol in symbols], "Success"
+                return None, f"No barcode decoded from candidate regions with {name}"
+            
+            if backend.kind == 'text':
+                results = backend.decode(image)
+                if results:
+                    return results, "Success"
+                return None, f"No barcode-like text line found with {name}"
+            
+            results = self._decode_frame(image, backend.decode)
+            if results:
                 return results, "Success"
             
-            return None, "No barcode detected with pyzbar"
+            return None, f"No barcode detected with {name}"
         
         except Exception as e:
-            return None, f"Error in pyzbar detection: {str(e)}"
+            return None, f"Error in {name} detection: {str(e)}"
+
+    def detect_barcode_scanline(self, image_path=None, image=None):
+        """
+        Decode axis-aligned Code128/EAN barcodes with a few NumPy scanlines
+        across the located candidate regions
+        Returns: tuple (results, message)
+        """
+        return self.detect_with_backend('scanline', image_path, image)
+
+    def detect_barcode_pyzbar(self, image_path=None, image=None):
+        """
+        Detect barcode using pyzbar library
+        Returns: tuple (barcode_data, confidence)
+        """
+        return self.detect_with_backend('pyzbar', image_path, image)
     
-    def detect_barcode_morphology(self, image_path=None, image=None):
+    @staticmethod
+    def _decode_frame(image, decode_fn):
         """
-        Detect barcode using morphological operations + OCR
+        Run decode_fn over a whole (capped) frame; tiling it would cut any
+        code wider than the tile overlap at the seams
         """
+        return merge_symbols(decode_fn(image))
+
+    def _decode_tiled(self, image, decode_fn, scale=1.0):
+        """
+        Run decode_fn over a full-resolution frame as overlapping tiles in
+        parallel (the whole frame at once if tiling is disabled)
+        """
+        config = self.tiling_config
+        decode_fn = self._charged(decode_fn)
+        if not config.get('enabled', True):
+            # One tile covering the whole frame
+            return decode_tiles(image, decode_fn, tile_size=max(image.shape[:2]),
+                                overlap=0, workers=1, scale=scale)
+        return decode_tiles(
+            image, decode_fn,
+            tile_size=config.get('tile_size', 1536),
+            overlap=config.get('overlap', 512),
+            workers=config.get('workers', 4),
+            scale=scale
+        )
+
+    def detect_barcode_full_resolution(self):
+        """
+        Re-run the symbol decoders on the full-resolution source as parallel
+        tiles when the decoded frame was reduced; small codes on large scans
+        often only survive at native resolution
+        Returns: tuple (results, message) with geometry in decoded-frame pixels
+        """
+        source = getattr(self._local, 'source', None)
+        if source is None or source['scale'] <= 1 or not self.tiling_config.get('full_resolution', True):
+            return None, "Full-resolution pass not needed"
+        
+        refusal = self._full_resolution_refusal(source['path'])
+        if refusal is not None:
+            return None, f"Full-resolution pass skipped: {refusal}"
+        
         try:
-            reader = self._get_reader()
-            if reader is None:
-                return None, "EasyOCR not available"
+            full = cv2.imread(source['path'], cv2.IMREAD_GRAYSCALE)
+            if full is None:
+                return None, "Error: Could not load image"
+            scale = full.shape[1] / source['image'].shape[1]
+            backends = [backend for backend in self._crop_backends() if backend.available()]
             
+            def decode_tile(tile):
+                for backend in backends:
+                    symbols = backend.decode(tile)
+                    if symbols:
+                        return symbols
+                return []
+            
+            results = self._decode_tiled(full, decode_tile, scale=scale)
+            del full
+            if results:
+                return results, "Success (full-resolution tiles)"
+            return None, "No barcode detected in full-resolution tiles"
+        except Exception as e:
+            return None, f"Error in full-resolution detection: {str(e)}"
+    
+    def detect_barcode_morphology(self, image_path=None, image=None):
+        """
+        Detect barcode by ranking barcode-like regions, decoding the top-K
+        crops with the symbol backends and OCRing only small, high-scoring regions
+        """
+        try:
             if image is None:
                 image = self._load_image(image_path)
             if image is None:
                 return None, "Error: Could not load image"
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            config = self.morphology_config
+            candidates = self._barcode_candidates(image)
+            if not candidates:
+                return None, "No barcode-like regions found"
             
-            # Apply morphological operations
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
-            grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+            crops = self._region_crops(image, candidates)
             
-            # Threshold
-            _, thresh = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            # Cheap pass first: the symbol decoders on every candidate crop
+            for backend in self._crop_backends():
+                if not backend.available():
+                    continue
+                for (crop, to_frame), candidate in zip(crops, candidates):
+                    symbols = backend.decode(crop)
+                    if symbols:
+                        results = [
+                            dict(map_symbol(symbol, to_frame), method='morphology', score=candidate['score'])
+                            for symbol in symbols
+                        ]
+                        return results, f"Success ({backend.name} on candidate region)"
             
-            # Find contours
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Cheap enhancement variants of the same crops before any OCR
+            if self.enhancement_config.get('enabled', True):
+                results, msg = self._decode_enhanced(crops, candidates)
+                if results:
+                    return results, msg
             
-            if not contours:
-                return None, "No contours found"
+            # OCR only the printed line next to small, convincingly barcode-like regions
+            image_area = image.shape[0] * image.shape[1]
+            ocr_candidates = [
+                candidate for candidate in candidates
+                if candidate['score'] >= config.get('min_ocr_score', 0.35)
+                and candidate['bbox'][2] * candidate['bbox'][3]
+                <= config.get('max_ocr_area_ratio', 0.15) * image_area
+            ]
+            if not ocr_candidates:
+                return None, "No candidate region small and confident enough for OCR"
             
-            # Get largest contour
-            largest_contour = max(contours, key=cv2.contourArea)
-            x, y, w, h = cv2.boundingRect(largest_contour)
+            # A read that does not validate moves on to the next candidate
+            fallback = None
+            for candidate in ocr_candidates:
+                results, msg = self.detect_barcode_hrl(image, candidate['bbox'])
+                if results:
+                    for result in results:
+                        result['method'] = 'morphology'
+                        result['score'] = candidate['score']
+                    _, validated, score = self._best_result(results)
+                    if validated:
+                        return results, msg
+                    if fallback is None or score > fallback[2]:
+                        fallback = (results, msg, score)
+            if fallback is not None:
+                return fallback[0], fallback[1]
             
-            # Extract region
-            roi = image[y:y+h, x:x+w]
-            
-            # OCR on extracted region
-            result = reader.readtext(roi)
-            
-            if result:
-                text = ''.join([text[1] for text in result])
-                return [{'data': text, 'method': 'morphology'}], "Success"
-            
-            return None, "No text found in extracted region"
+            return None, "No text found in candidate regions"
         
         except Exception as e:
             return None, f"Error in morphology detection: {str(e)}"
-    
-    def detect_barcode_ocr(self, image_path=None, image=None):
+
+    def detect_barcode_hrl(self, image, location):
         """
-        Detect barcode using EasyOCR
+        OCR the human-readable line printed next to a located barcode
+        Only thin strips beside the bars are read, with a restricted
+        character set, instead of the whole page
+        Args:
+            image: Frame the location refers to
+            location: (x, y, w, h) box or polygon [(x, y), ...] of the bars
+                      (e.g. pyzbar rect/polygon or a morphology candidate)
+        Returns: tuple (results, message)
         """
         try:
             reader = self._get_reader()
             if reader is None:
                 return None, "EasyOCR not available"
             
-            if image is None:
-                image = self._load_image(image_path)
-            if image is None:
-                return None, "Error: Could not load image"
-            
-            # Direct OCR
-            result = reader.readtext(image)
-            
-            if result:
-                text = ''.join([text[1] for text in result])
-                return [{'data': text, 'method': 'easyocr'}], "Success"
+            config = self.easyocr_config
+            strips = human_readable_strips(
+                image.shape, location,
+                strip_ratio=config.get('hrl_strip_ratio', 0.45),
+                margin=config.get('hrl_margin', 0.1)
+            )
+            for strip in strips:
+                crop = self._crop_roi(image, strip)
+                if crop.size == 0:
+                    continue
+                # Text beside vertical codes runs top to bottom
+                if crop.shape[0] > crop.shape[1]:
+                    crop = cv2.rotate(crop, cv2.ROTATE_90_CLOCKWISE)
+                result = self._readtext_fast(reader, crop)
+                if not result:
+                    continue
+                fragments = sorted(result, key=lambda r: min(p[0] for p in r[0]))
+                text = clean_text(''.join(fragment[1] for fragment in fragments))
+                if text:
+                    return [{
+                        'data': text,
+                        'method': 'easyocr_hrl',
+                        'confidence': float(np.mean([f[2] for f in fragments])),
+                        'rect': strip,
+                    }], "Success (human-readable line)"
             
-            return None, "No text found with EasyOCR"
+            return None, "No human-readable line found next to barcode"
         
         except Exception as e:
-            return None, f"Error in OCR detection: {str(e)}"
+            return None, f"Error in human-readable line OCR: {str(e)}"
+
+    def _decode_enhanced(self, crops, candidates):
+        """
+        Retry the symbol decoders on enhanced variants of candidate crops,
+        best-ranked variant first, recording each variant's cost and outcome
+        Returns: tuple (results, message)
+        """
+        # Only the cheapest decoder (pyzbar by default): every variant of
+        # every crop is decoded, so per-call cost dominates
+        backends = [backend for backend in self._crop_backends() if backend.available()][:1]
+        if not backends:
+            return None, "No symbol decoder available for enhanced crops"
+        
+        for name in self.ladder.order():
+            variant = ENHANCEMENT_VARIANTS[name]
+            started = time.perf_counter()
+            results = None
+            for (crop, to_frame), candidate in zip(crops, candidates):
+                gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+                enhanced = variant(gray)
+                if enhanced is None:
+                    continue
+                # Variants may resize the crop
+                factor = gray.shape[1] / enhanced.shape[1]
+                to_frame_enhanced = to_frame @ np.diag([factor, factor, 1.0])
+                for backend in backends:
+                    symbols = backend.decode(enhanced)
+                    if symbols:
+                        results = [
+                            dict(map_symbol(symbol, to_frame_enhanced),
+                                 method='morphology', score=candidate['score'], enhancement=name)
+                            for symbol in symbols
+                        ]
+                        break
+                if results:
+                    break
+            self.ladder.record(name, bool(results), (time.perf_counter() - started) * 1000)
+            if results:
+                return results, f"Success ({name} enhanced candidate region)"
+        
+        return None, "No barcode decoded from enhanced candidate regions"
+
+    def _barcode_candidates(self, image):
+        """Ranked barcode-like regions, computed once per decoded frame"""
+        source = getattr(self._local, 'source', None)
+        if source is not None and image is source['image'] and 'candidates' in source:
+            return source['candidates']
+        config = self.morphology_config
+        candidates = find_barcode_candidates(
+            image,
+            top_k=config.get('top_k', 5),
+            max_area_ratio=config.get('max_area_ratio', 0.5)
+        )
+        if source is not None and image is source['image']:
+            source['candidates'] = candidates
+        return candidates
+
+    def _padded_box(self, image, bbox):
+        """Grow a box by the configured quiet-zone margin, clipped to the image"""
+        x, y, w, h = bbox
+        pad = self.morphology_config.get('padding', 0.1)
+        height, width = image.shape[:2]
+        x0, y0 = max(0, int(x - w * pad)), max(0, int(y - h * pad))
+        x1, y1 = min(width, int(x + w * (1 + pad))), min(height, int(y + h * (1 + pad)))
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _candidate_crop(self, image, bbox):
+        """
+        Crop a candidate with a quiet-zone margin
+        Returns: tuple (crop, (x0, y0) origin in image, crop pixels per image pixel)
+        """
+        x0, y0, w, h = self._padded_box(image, bbox)
+        crop = self._crop_roi(image, (x0, y0, w, h))
+        return crop, (x0, y0), crop.shape[1] / max(1, w)
     
-    def extract_barcode(self, image_path):
+    def _region_crops(self, image, candidates):
+        """
+        Crops of candidate regions for the symbol decoders: skewed regions
+        are warped to a fronto-parallel strip, axis-aligned ones cropped
+        Returns: list of (crop, 3x3 transform from crop to image pixels)
+        """
+        config = self.rectification_config
+        crops = []
+        for candidate in candidates:
+            if config.get('enabled', True):
+                quad = fit_quadrilateral(candidate['contour'])
+                if skew_degrees(quad) > config.get('min_skew_degrees', 3):
+                    crops.append(rectify_region(image, quad, self.morphology_config.get('padding', 0.1)))
+                    continue
+            crop, (x0, y0), crop_scale = self._candidate_crop(image, candidate['bbox'])
+            crops.append((crop, np.array([[1 / crop_scale, 0, x0], [0, 1 / crop_scale, y0], [0, 0, 1]])))
+        return crops
+
+    def detect_barcode_ocr(self, image_path=None, image=None):
+        """
+        Detect barcode using EasyOCR
+        """
+        if not self._backend('easyocr').available():
+            return None, "EasyOCR not available"
+        return self.detect_with_backend('easyocr', image_path, image)
+    
+    def extract_barcode(self, image_path, race=False):
         """
         Extract barcode content using cascading approach
+        Args:
+            image_path: Image file
+            race: Latency-optimised mode for interactive use: OCR starts
+                  speculatively alongside the symbol decoders and the first
+                  path to decode wins (see _race_cascade)
         Returns: dict with success status and barcode content
         """
-        image = self._load_image(image_path)
-        if image is None:
+        return self._tracked_call(self._extract_barcode, image_path, race)
+
+    def extract_barcodes(self, image_path):
+        """
+        Extract every barcode in an image in one detection pass
+        All symbol decoders run over the frame, every candidate region and
+        (if configured) the frame rotations; hits are mapped back to the
+        frame and de-duplicated. OCR runs only when no symbol decodes
+        Returns: dict with overall success and a 'barcodes' list of dicts
+        with 'data', 'type', 'method', 'rect', 'polygon' (original image
+        pixels), 'angle' (degrees), 'confidence' and 'validated'
+        """
+        return self._tracked_call(self._extract_barcodes, image_path)
+
+    def extract_barcodes_from_frame(self, frame, window=None, ocr=False):
+        """
+        extract_barcodes for an in-memory frame (e.g. from cv2.VideoCapture)
+        Frames over the IMAGE_CONFIG size caps are reduced first; geometry
+        is reported in the frame's own pixels
+        Args:
+            frame: Grayscale or BGR image
+            window: Optional (x, y, w, h) where a code is expected (ROI
+                    tracking): only that part is decoded, by the symbol
+                    decoders directly, cheapest first, without localization
+            ocr: OCR the frame when no symbol decodes (off by default: the
+                 text methods cost far more than a video frame's budget)
+        Returns: dict with overall success and a 'barcodes' list
+        """
+        if window is not None:
+            return self._tracked_call(self._extract_window_barcodes, frame, window)
+        return self._tracked_call(self._extract_frame_barcodes, frame, ocr)
+
+    def extract_labels(self, image_path):
+        """
+        Extract the barcode of every label on a multi-label sheet
+        Labels are segmented from the page and run through the cascade
+        concurrently; a page without separate labels is treated as one label
+        Returns: dict with overall success and a 'labels' list holding each
+        label's bounding box (original image pixels) and cascade result
+        """
+        return self._tracked_call(self._extract_labels, image_path)
+
+    def _tracked_call(self, fn, *args):
+        """Run a detection entry point with idle, memory-budget and peak-memory accounting"""
+        with self._lock:
+            self._active_calls += 1
+            self._last_used = time.monotonic()
+        
+        peak_token = _start_peak_tracking() if self.image_config.get('report_peak_memory', False) else None
+        cpu_started = time.process_time()
+        try:
+            result = fn(*args)
+            if peak_token is not None:
+                peak, shared = _finish_peak_tracking(peak_token)
+                peak_token = None
+                result['python_peak_mb'] = round(peak / (1024 * 1024), 1)
+                if shared:
+                    result['python_peak_shared'] = True
+            if self.image_config.get('report_cpu_time', False):
+                result['cpu_ms'] = round((time.process_time() - cpu_started) * 1000, 1)
+            return result
+        finally:
+            if peak_token is not None:
+                _finish_peak_tracking(peak_token)
+            with self._lock:
+                self._active_calls -= 1
+                self._last_used = time.monotonic()
+                idle = not self._active_calls
+            # Scratch buffers live in every thread that touched the image
+            # (pool threads included), tens of MB each on large frames
+            if idle and self.memory_config.get('release_scratch', True):
+                release_scratch_buffers()
+            self._enforce_memory_budget()
+
+    def _extract_barcode(self, image_path, race=False):
+        """Run the detection cascade (or the race, see _race_cascade) on one image"""
+        try:
+            decoded = self._decode_image(image_path)
+        except ImageBudgetError as e:
             return {
                 'success': False,
                 'barcode_content': None,
                 'method': None,
-                'message': 'Failed to load image'
+                'message': f'Image rejected: {e}'
             }
-
-        # Try pyzbar first (fastest and most accurate) with rotations
-        result, msg = self._try_rotations(image, lambda img: self.detect_barcode_pyzbar(image=img))
-        if result:
+        if decoded is None:
             return {
-                'success': True,
-                'barcode_content': result[0]['data'],
-                'method': 'pyzbar',
-                'message': msg
+                'success': False,
+                'barcode_content': None,
+                'method': None,
+                'message': 'Failed to load image'
             }
+        image, scale = decoded
+        self._local.source = {'path': image_path, 'image': image, 'scale': scale}
+        try:
+            return self._run_cascade(image, race=race)
+        finally:
+            self._local.source = None
 
-        # Try morphology approach with rotations
-        result, msg = self._try_rotations(image, lambda img: self.detect_barcode_morphology(image=img))
-        if result:
-            return {
-                'success': True,
-                'barcode_content': result[0]['data'],
-                'method': 'morphology',
-                'message': msg
-            }
+    def _extract_barcodes(self, image_path):
+        """Collect every symbol on one image (see extract_barcodes)"""
+        try:
+            decoded = self._decode_image(image_path)
+        except ImageBudgetError as e:
+            return {'success': False, 'barcodes': [], 'message': f'Image rejected: {e}'}
+        if decoded is None:
+            return {'success': False, 'barcodes': [], 'message': 'Failed to load image'}
+        image, scale = decoded
+        return self._barcodes_in_frame(image, scale, image_path)
+
+    def _extract_frame_barcodes(self, frame, ocr=False):
+        """Collect every symbol on one in-memory frame"""
+        if self.image_config.get('grayscale', True) and frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        fit = self._fit_to_caps(frame)
+        if fit is None:
+            return self._barcodes_in_frame(frame, 1.0, ocr=ocr)
+        return self._barcodes_in_frame(fit, frame.shape[1] / fit.shape[1], ocr=ocr)
+
+    def _extract_window_barcodes(self, frame, window):
+        """Decode one window of a frame with the first symbol decoder that reads it"""
+        x, y, w, h = window
+        crop = frame[y:y + h, x:x + w]
+        if self.image_config.get('grayscale', True) and crop.ndim == 3:
+            crop = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        backends = sorted(
+            (backend for backend in self.backends.values()
+             if backend.kind == 'symbol' and backend.enabled() and backend.available()),
+            key=lambda backend: backend.cost
+        )
+        for backend in backends:
+            symbols = backend.decode(crop)
+            if symbols:
+                to_frame = np.array([[1.0, 0, x], [0, 1.0, y], [0, 0, 1.0]])
+                barcodes = [self._describe_symbol(dict(map_symbol(symbol, to_frame), method=backend.name))
+                            for symbol in merge_symbols(symbols)]
+                return {'success': True, 'barcodes': barcodes, 'message': f'Decoded {len(barcodes)} barcode(s)'}
+        return {'success': False, 'barcodes': [], 'message': 'No barcode decoded in window'}
+
+    def _barcodes_in_frame(self, image, scale, image_path=None, ocr=True):
+        """
+        Every symbol on a decoded image, geometry scaled to the original
+        Without a source file there is nothing to re-read at full resolution;
+        with ocr=False the text methods never run
+        """
+        self._local.source = {'path': image_path, 'image': image, 'scale': scale if image_path else 1.0}
+        try:
+            verdict, reason = self._quality_verdict(image)
+            if verdict == 'reject':
+                return {'success': False, 'barcodes': [],
+                        'message': f'Image rejected by quality gate: {reason}'}
+            symbols, msg = self._collect_symbols(image)
+            if not symbols and ocr:
+                symbols, msg = self._collect_text(image, msg)
+        finally:
+            self._local.source = None
+        
+        # Geometry in original image pixels, like extract_labels
+        to_original = np.diag([scale, scale, 1.0])
+        barcodes = [self._describe_symbol(map_symbol(symbol, to_original)) for symbol in symbols]
+        if not barcodes:
+            return {'success': False, 'barcodes': [],
+                    'message': f'Failed to detect barcode. Last error: {msg}'}
+        return {'success': True, 'barcodes': barcodes, 'message': f'Decoded {len(barcodes)} barcode(s)'}
+
+    def _collect_symbols(self, image):
+        """
+        Every symbol the symbol decoders read in a frame: whole-frame
+        passes, every candidate region (rectified when skewed) and, when
+        frame rotations are enabled, the rotated frames
+        Returns: tuple (de-duplicated symbols in frame pixels, message)
+        """
+        frame_backends = [backend for backend in self._crop_backends() if backend.available()]
+        symbols = []
+        for backend in frame_backends:
+            symbols += [dict(symbol, method=backend.name) for symbol in self._decode_frame(image, backend.decode)]
+        
+        # Region decoders first, then the frame decoders, cheapest first; one hit per region
+        region_backends = sorted(
+            (backend for backend in self.backends.values()
+             if backend.kind == 'symbol' and backend.regions and backend.enabled() and backend.available()),
+            key=lambda backend: backend.cost
+        ) + frame_backends
+        candidates = self._barcode_candidates(image)
+        for (crop, to_frame), candidate in zip(self._region_crops(image, candidates), candidates):
+            for backend in region_backends:
+                if backend.regions and candidate['score'] < backend.config.get('min_score', 0.5):
+                    continue
+                found = backend.decode(crop)
+                if found:
+                    symbols += [dict(map_symbol(symbol, to_frame), method=backend.name) for symbol in found]
+                    break
+        
+        rectify = self.rectification_config.get('enabled', True)
+        if not rectify or self.rectification_config.get('frame_rotations', False):
+            for angle in self.rotation_config.get('angles', []):
+                if angle == 0:
+                    continue
+                matrix, _ = self._rotation_matrix(image.shape, angle)
+                to_frame = np.linalg.inv(np.vstack([matrix, [0, 0, 1]]))
+                rotated = self._rotate_image(image, angle)
+                for backend in frame_backends:
+                    symbols += [dict(map_symbol(symbol, to_frame), method=backend.name)
+                                for symbol in self._decode_frame(rotated, backend.decode)]
+        
+        if not symbols:
+            full, msg = self.detect_barcode_full_resolution()
+            return full or [], msg
+        return merge_symbols(symbols), "Success"
+
+    def _collect_text(self, image, msg):
+        """
+        Best OCR read of the text methods, for images without any symbol
+        Returns: tuple (list with at most one result, message)
+        """
+        best = None
+        for method in self.methods:
+            if not self._is_text_method(method):
+                continue
+            results, msg = self._run_stage(method, image)
+            if not results:
+                continue
+            result, validated, score = self._best_result(results)
+            if validated:
+                return [result], msg
+            if best is None or score > best[1]:
+                best = (result, score)
+        if best is not None and best[1] >= self.validation_config.get('min_score', 0.0):
+            return [best[0]], msg
+        return [], msg
+
+    def _describe_symbol(self, symbol):
+        """Public form of one decoded symbol for extract_barcodes"""
+        config = self.validation_config
+        validated, score = score_candidate(symbol, config.get('patterns'),
+                                           config.get('min_text_confidence', 0.0))
+        polygon = symbol.get('polygon')
+        if polygon is None and symbol.get('rect') is not None:
+            x, y, w, h = symbol['rect']
+            polygon = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+        return {
+            'data': symbol['data'],
+            'type': symbol.get('type', 'TEXT'),
+            'method': symbol.get('method'),
+            'rect': symbol.get('rect'),
+            'polygon': polygon,
+            'angle': symbol_angle(polygon) if polygon else None,
+            'confidence': round(float(symbol.get('confidence', score)), 3),
+            'validated': validated,
+        }
 
-        # Try pure OCR with rotations
-        result, msg = self._try_rotations(image, lambda img: self.detect_barcode_ocr(image=img))
-        if result:
+    def _extract_labels(self, image_path):
+        """Segment a sheet into labels and run the cascade on each concurrently"""
+        try:
+            decoded = self._decode_image(image_path)
+        except ImageBudgetError as e:
+            return {'success': False, 'labels': [], 'message': f'Image rejected: {e}'}
+        if decoded is None:
+            return {'success': False, 'labels': [], 'message': 'Failed to load image'}
+        image, scale = decoded
+        
+        config = self.segmentation_config
+        regions = find_label_regions(
+            image,
+            min_area_ratio=config.get('min_area_ratio', 0.03),
+            max_area_ratio=config.get('max_area_ratio', 0.5),
+            max_labels=config.get('max_labels', 12)
+        )
+        if not regions:
+            # Not a multi-label sheet: the whole page is the only label
+            regions = [(0, 0, image.shape[1], image.shape[0])]
+            self._local.source = {'path': image_path, 'image': image, 'scale': scale}
+            try:
+                outcomes = [self._run_cascade(image)]
+            finally:
+                self._local.source = None
+        else:
+            crops = self._label_crops(image_path, image, scale, regions)
+            workers = min(config.get('workers', 4), len(crops))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(self._run_cascade, crops))
+        
+        labels = []
+        for index, ((x, y, w, h), outcome) in enumerate(zip(regions, outcomes)):
+            label = dict(outcome)
+            label['label_index'] = index
+            label['bbox'] = tuple(int(round(v * scale)) for v in (x, y, w, h))
+            labels.append(label)
+        
+        found = sum(1 for label in labels if label['success'])
+        return {
+            'success': found > 0,
+            'labels': labels,
+            'message': f'Decoded {found} of {len(labels)} labels'
+        }
+
+    def _label_crops(self, image_path, image, scale, regions):
+        """Crop label regions, from the native-resolution page when it fits the budget"""
+        page, page_scale = image, 1.0
+        if scale > 1 and self._full_resolution_refusal(image_path) is None:
+            full = cv2.imread(image_path, self._imread_flag(1))
+            if full is not None:
+                page, page_scale = full, full.shape[1] / image.shape[1]
+        
+        crops = []
+        for x, y, w, h in regions:
+            x0, y0 = int(x * page_scale), int(y * page_scale)
+            x1, y1 = int((x + w) * page_scale), int((y + h) * page_scale)
+            crop = page[y0:y1, x0:x1]
+            fit = self._fit_to_caps(crop)
+            crops.append(fit if fit is not None else crop.copy())
+        return crops
+
+    def _readtext(self, reader, image, **kwargs):
+        """Serialize EasyOCR calls; the reader is shared between worker threads"""
+        with self._ocr_lock:
+            return reader.readtext(image, **kwargs)
+
+    def _readtext_fast(self, reader, image):
+        """
+        EasyOCR tuned for short barcode strings: allowlisted characters,
+        capped canvas, no paragraph merging and greedy decoding
+        """
+        fast = self.easyocr_config.get('fast_mode', {})
+        return self._readtext(
+            reader, image,
+            allowlist=self.easyocr_config.get('allowlist'),
+            decoder=fast.get('decoder', 'greedy'),
+            paragraph=False,
+            canvas_size=fast.get('canvas_size', 1280),
+            mag_ratio=fast.get('mag_ratio', 1.0),
+            text_threshold=fast.get('text_threshold', 0.6),
+            low_text=fast.get('low_text', 0.35),
+        )
+
+    def _run_cascade(self, image, race=False):
+        """
+        Run the configured detection methods on a decoded image, in order,
+        or as two racing paths (race=True)
+        """
+        methods = self.methods
+        verdict, reason = self._quality_verdict(image)
+        if verdict == 'reject':
             return {
-                'success': True,
-                'barcode_content': result[0]['data'],
-                'method': 'easyocr',
-                'message': msg
+                'success': False,
+                'barcode_content': None,
+                'method': None,
+                'message': f'Image rejected by quality gate: {reason}'
             }
+        if race:
+            text_methods = [m for m in methods if self._is_text_method(m)]
+            if text_methods and len(text_methods) < len(methods):
+                return self._race_cascade(image, [m for m in methods if m not in text_methods], text_methods)
+
+        # A validated result ends the cascade; the best other one is kept
+        # in case no later stage validates
+        msg = "No detection methods configured"
+        fallback = None
+        for method in methods:
+            result, msg = self._run_stage(method, image)
+            if not result:
+                continue
+            best, validated, score = self._best_result(result)
+            if validated:
+                return self._cascade_result(method, best, msg, True)
+            if fallback is None or score > fallback[3]:
+                fallback = (method, best, msg, score)
+        
+        if fallback is not None and fallback[3] >= self.validation_config.get('min_score', 0.0):
+            return self._cascade_result(*fallback[:3], False)
 
         # All methods failed
         return {
@@ -220,3 +1269,267 @@ class BarcodeDetector:
             'method': None,
             'message': f'Failed to detect barcode. Last error: {msg}'
         }
+
+    def _quality_verdict(self, image):
+        """Quality gate verdict ('ok' or 'reject') and reason; 'ok' when the gate is off"""
+        if not self.quality_config.get('enabled', False):
+            return 'ok', None
+        verdict, reason, _ = assess_quality(image, self.quality_config)
+        return verdict, reason
+
+    def _best_result(self, results):
+        """
+        Rank a stage's results by symbology checksum and waybill format
+        (score_candidate); with validation disabled the first one wins
+        Returns: tuple (result, is_valid, score) of the best result
+        """
+        config = self.validation_config
+        if not config.get('enabled', True):
+            return results[0], True, 1.0
+        scored = [
+            score_candidate(result, config.get('patterns'), config.get('min_text_confidence', 0.0))
+            for result in results
+        ]
+        best = max(range(len(results)), key=lambda i: (scored[i], -i))
+        return (results[best], *scored[best])
+
+    @staticmethod
+    def _cascade_result(method, result, msg, validated):
+        """Successful cascade result dict for one decoded result"""
+        return {
+            'success': True,
+            'barcode_content': result['data'],
+            'method': method,
+            'message': msg,
+            'validated': validated,
+        }
+
+    def _is_text_method(self, method):
+        """Whether a cascade method OCRs text rather than decoding symbols"""
+        return method != 'morphology' and self.backends[method].kind == 'text'
+
+    def _race_cascade(self, image, symbol_methods, text_methods):
+        """
+        Latency-optimised cascade: the symbol stages and the text (OCR)
+        stages run as two paths on the race pool. The text path starts
+        speculatively once RACE_CONFIG['speculate_after'] has failed; the
+        first path to decode wins and the other stops at its next stage or
+        angle (a decoder call already running finishes in the background)
+        Returns: the cascade result dict plus 'race' with the winning path
+        and the CPU time of each path that has finished: its own thread's
+        plus that of the rotation and tile tasks it submitted (threads a
+        library starts internally, e.g. torch's, are not attributed; the
+        detection's 'cpu_ms' covers the whole process)
+        """
+        trigger = self.race_config.get('speculate_after', 'pyzbar')
+        outcomes = queue.Queue()
+        cancelled = threading.Event()
+        source = getattr(self._local, 'source', None)
+        pool = self._get_race_pool()
+        start_lock = threading.Lock()
+        text_started = []
+        
+        def run_path(name, methods, on_failure=None):
+            self._local.source = source
+            # Seconds of CPU charged to this path by its pool tasks (_charged)
+            self._local.cpu_account = account = []
+            cpu_started = time.thread_time()
+            # (method, result, message, validated, score) of the best result so far
+            outcome = (None, None, "No detection methods configured", False, 0.0)
+            try:
+                for method in methods:
+                    if cancelled.is_set():
+                        break
+                    result, msg = self._run_stage(method, image, cancel=cancelled)
+                    if result:
+                        best, validated, score = self._best_result(result)
+                        if outcome[1] is None or validated or score > outcome[4]:
+                            outcome = (method, best, msg, validated, score)
+                        if validated:
+                            break
+                    elif outcome[1] is None:
+                        outcome = (None, None, msg, False, 0.0)
+                    if on_failure is not None:
+                        on_failure(method)
+            finally:
+                self._local.source = None
+                self._local.cpu_account = None
+                cpu = time.thread_time() - cpu_started + sum(account)
+                outcomes.put((name, *outcome, cpu * 1000))
+        
+        def start_text(after=None):
+            if after is not None and after != trigger:
+                return
+            with start_lock:
+                if not text_started:
+                    text_started.append(pool.submit(run_path, 'text', text_methods))
+        
+        if trigger not in symbol_methods:
+            start_text()
+        pool.submit(run_path, 'symbol', symbol_methods, start_text)
+        
+        cpu_ms = {}
+        fallback = None
+        while True:
+            name, method, result, msg, validated, score, path_cpu_ms = outcomes.get()
+            cpu_ms[name] = round(path_cpu_ms, 1)
+            if validated:
+                cancelled.set()
+                return dict(self._cascade_result(method, result, msg, True),
+                            race={'winner': name, 'cpu_ms': cpu_ms})
+            if result is not None and (fallback is None or score > fallback[4]):
+                fallback = (name, method, result, msg, score)
+            if name == 'symbol':
+                # Symbol path exhausted before its trigger stage: OCR is all that is left
+                start_text()
+            if len(cpu_ms) == 2:
+                break
+        
+        if fallback is not None and fallback[4] >= self.validation_config.get('min_score', 0.0):
+            return dict(self._cascade_result(*fallback[1:4], False),
+                        race={'winner': fallback[0], 'cpu_ms': cpu_ms})
+        return {
+            'success': False,
+            'barcode_content': None,
+            'method': None,
+            'message': f'Failed to detect barcode. Last error: {msg}',
+            'race': {'winner': None, 'cpu_ms': cpu_ms},
+        }
+
+    def _get_race_pool(self):
+        """Thread pool running the racing paths, created on first use"""
+        with self._lock:
+            if self._race_pool is None:
+                self._race_pool = ThreadPoolExecutor(
+                    max_workers=max(2, self.race_config.get('workers', 2)),
+                    thread_name_prefix='race'
+                )
+            return self._race_pool
+
+    def _run_stage(self, method, image, cancel=None):
+        """
+        Run one cascade stage, with rotations where the backend needs them
+        A set cancel event stops a rotation sweep before its next angle
+        """
+        # Rectified candidate crops cover skewed codes, so symbol decoders
+        # skip the full-frame rotation passes unless configured otherwise
+        rectify = self.rectification_config.get('enabled', True)
+        frame_rotations = not rectify or self.rectification_config.get('frame_rotations', False)
+        parallel = self.rotation_config.get('parallel', False)
+        if method == 'morphology':
+            if not frame_rotations:
+                return self.detect_barcode_morphology(image=image)
+            return self._try_rotations(image, lambda img: self.detect_barcode_morphology(image=img),
+                                       parallel=parallel, cancel=cancel)
+        
+        backend = self.backends[method]
+        if not backend.enabled():
+            return None, f"{method} disabled"
+        if backend.rotations and (backend.kind == 'text' or frame_rotations):
+            result, msg = self._try_rotations(
+                image, lambda img: self.detect_with_backend(method, image=img),
+                parallel=parallel and backend.cost <= self.rotation_config.get('max_parallel_cost', 20.0),
+                cancel=cancel
+            )
+        else:
+            result, msg = self.detect_with_backend(method, image=image)
+        
+        # Small codes on large scans may only decode at native resolution;
+        # one pass with every symbol decoder after the last frame-level one
+        frame_symbol_methods = [b.name for b in self._crop_backends()]
+        if not result and frame_symbol_methods and method == max(
+                frame_symbol_methods, key=self.methods.index):
+            full, full_msg = self.detect_barcode_full_resolution()
+            if full:
+                return full, full_msg
+        return result, msg
+
+
+_header_lock = threading.Lock()
+
+# Detections measured with tracemalloc, across all detectors: tracing runs
+# while at least one is in progress and the peak is reset when one starts
+# with none running, so each figure covers its own detection unless
+# detections overlap in time
+_peak_lock = threading.Lock()
+_peak_state = {'active': 0, 'started': 0, 'owned': False}
+
+
+def _start_peak_tracking():
+    """Begin measuring one detection's Python heap peak; returns a token"""
+    with _peak_lock:
+        alone = _peak_state['active'] == 0
+        if alone:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _peak_state['owned'] = True
+            tracemalloc.reset_peak()
+        _peak_state['active'] += 1
+        _peak_state['started'] += 1
+        return tracemalloc.get_traced_memory()[0], _peak_state['started'], alone
+
+
+def _finish_peak_tracking(token):
+    """
+    End a measurement started by _start_peak_tracking
+    Returns: tuple (peak bytes allocated above the start of the detection,
+    whether other detections overlapped it)
+    """
+    baseline, started, alone = token
+    with _peak_lock:
+        peak = tracemalloc.get_traced_memory()[1]
+        shared = not alone or _peak_state['started'] != started or _peak_state['active'] > 1
+        _peak_state['active'] -= 1
+        if _peak_state['active'] == 0 and _peak_state['owned']:
+            tracemalloc.stop()
+            _peak_state['owned'] = False
+    return max(0, peak - baseline), shared
+
+
+def _read_image_header(image_path):
+    """
+    Read size and format from the file header without decoding pixels
+    PIL's decompression-bomb limit is lifted for this header-only read so
+    IMAGE_CONFIG['max_pixels'] and 'oversize_policy' decide what happens
+    to very large images (see BarcodeDetector._check_budget)
+    Returns: tuple ((width, height), format), or (None, None) if unreadable
+    """
+    try:
+        # The limit is a PIL global; the lock keeps concurrent reads from
+        # restoring it while another one still needs it lifted
+        with _header_lock, warnings.catch_warnings():
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            limit, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+            try:
+                with Image.open(image_path) as img:
+                    return img.size, img.format
+            finally:
+                Image.MAX_IMAGE_PIXELS = limit
+    except Exception:
+        return None, None
+
+
+def _estimate_decode_bytes(size, image_format, reduction, channels=1):
+    """
+    Estimate peak bytes needed to decode an image
+    libjpeg scales during decoding; other codecs decode at full size first
+    """
+    width, height = size
+    reduced = (width // reduction) * (height // reduction) * channels
+    if image_format == 'JPEG':
+        return reduced
+    return width * height * channels + reduced
+
+
+def _idle_watchdog(detector_ref, interval):
+    """Background loop that unloads an idle detector and then exits"""
+    while True:
+        time.sleep(interval)
+        detector = detector_ref()
+        if detector is None:
+            return
+        detector._check_idle()
+        detector._enforce_memory_budget()
+        if not detector._is_holding_memory():
+            return
+        del detector
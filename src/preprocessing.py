@@ -1,6 +1,87 @@
+import threading
+import weakref
+from functools import lru_cache
+
 import cv2
 import numpy as np
 
+# Per-thread CLAHE objects and scratch buffers (neither is thread safe)
+_local = threading.local()
+
+# Every live ScratchBuffers, so they can all be released at once
+_all_scratch = weakref.WeakSet()
+
+
+@lru_cache(maxsize=64)
+def structuring_element(shape, size):
+    """
+    Cached structuring element; shared, so treat it as read-only
+    
+    Args:
+        shape: cv2.MORPH_RECT, cv2.MORPH_ELLIPSE or cv2.MORPH_CROSS
+        size: (width, height)
+    
+    Returns:
+        uint8 kernel
+    """
+    return cv2.getStructuringElement(shape, tuple(size))
+
+
+def get_clahe(clip_limit=2.0, tile_grid_size=(8, 8)):
+    """This thread's CLAHE object for the given settings"""
+    cache = _local.__dict__.setdefault('clahe', {})
+    key = (clip_limit, tuple(tile_grid_size))
+    if key not in cache:
+        cache[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tuple(tile_grid_size))
+    return cache[key]
+
+
+class ScratchBuffers:
+    """Named scratch arrays, reused while their shape and dtype stay the same"""
+    
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+        _all_scratch.add(self)
+    
+    def get(self, name, shape, dtype):
+        """Buffer for name, reallocated only when shape or dtype change"""
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != tuple(shape) or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+            self.allocations += 1
+        return buffer
+    
+    def nbytes(self):
+        """Bytes held by the buffers"""
+        return sum(buffer.nbytes for buffer in list(self._buffers.values()))
+    
+    def clear(self):
+        """Release all buffers"""
+        self._buffers.clear()
+
+
+def release_scratch_buffers():
+    """
+    Drop the buffers of every ScratchBuffers (all threads); they are
+    reallocated on next use, and arrays still in use stay valid
+    Returns: bytes released
+    """
+    released = 0
+    for scratch in list(_all_scratch):
+        released += scratch.nbytes()
+        scratch.clear()
+    return released
+
+
+def thread_scratch():
+    """This thread's shared ScratchBuffers"""
+    scratch = getattr(_local, 'scratch', None)
+    if scratch is None:
+        scratch = _local.scratch = ScratchBuffers()
+    return scratch
+
 
 def preprocess_image(image_path, target_size=None):
     """
@@ -37,8 +118,7 @@ def enhance_contrast(image):
     if len(image.shape) == 3:
         image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(image)
+    enhanced = get_clahe(2.0, (8, 8)).apply(image)
     
     return enhanced
 
@@ -86,7 +166,7 @@ def apply_morphology(image, operation='close', kernel_size=(5, 5)):
     Returns:
         Processed image
     """
-    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size)
+    kernel = structuring_element(cv2.MORPH_RECT, tuple(kernel_size))
     
     if operation == 'close':
         result = cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel)
@@ -98,3 +178,126 @@ def apply_morphology(image, operation='close', kernel_size=(5, 5)):
         raise ValueError(f"Unknown operation: {operation}")
     
     return result
+
+
+def unsharp_mask(image, amount=1.5, sigma=1.5):
+    """
+    Sharpen soft bar edges with an unsharp mask
+    
+    Args:
+        image: Input grayscale image
+        amount: Strength of the sharpening
+        sigma: Gaussian blur sigma of the mask
+    
+    Returns:
+        Sharpened image
+    """
+    blurred = cv2.GaussianBlur(image, (0, 0), sigma)
+    return cv2.addWeighted(image, 1 + amount, blurred, -amount, 0)
+
+
+def adaptive_binary(image, block_size=31, offset=10):
+    """
+    Binarize with a local threshold; copes with uneven lighting and shadows
+    
+    Args:
+        image: Input grayscale image
+        block_size: Neighbourhood size (odd)
+        offset: Constant subtracted from the local mean
+    
+    Returns:
+        Binary image
+    """
+    return cv2.adaptiveThreshold(image, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                 cv2.THRESH_BINARY, block_size, offset)
+
+
+def upscale_small(image, min_side=200, factor=2):
+    """
+    Upscale a small crop so narrow bars span more pixels
+    
+    Args:
+        image: Input image
+        min_side: Only crops whose short side is below this are upscaled
+        factor: Upscaling factor
+    
+    Returns:
+        Upscaled image, or None if the crop is already large enough
+    """
+    if min(image.shape[:2]) >= min_side:
+        return None
+    return cv2.resize(image, None, fx=factor, fy=factor, interpolation=cv2.INTER_CUBIC)
+
+
+# Enhancement variants tried on located barcode regions; each takes a
+# grayscale image and returns the enhanced image or None if not applicable
+ENHANCEMENT_VARIANTS = {
+    'clahe': enhance_contrast,
+    'unsharp': unsharp_mask,
+    'upscale': upscale_small,
+    'adaptive_threshold': adaptive_binary,
+    'otsu': get_binary_image,
+    'denoise': denoise_image,
+}
+
+
+class VariantLadder:
+    """
+    Ranked list of enhancement variants
+    
+    Starts in the configured order and, once enough attempts have been
+    recorded, re-ranks the variants by measured successes per millisecond.
+    Shared between threads.
+    """
+    
+    def __init__(self, names, warmup=20):
+        """
+        Args:
+            names: Variant names from ENHANCEMENT_VARIANTS in starting order
+            warmup: Attempts recorded before the measured ranking is used
+        """
+        unknown = [name for name in names if name not in ENHANCEMENT_VARIANTS]
+        if unknown:
+            raise ValueError(f"Unknown enhancement variant(s): {', '.join(unknown)}")
+        self.names = list(names)
+        self.warmup = warmup
+        self._stats = {name: {'attempts': 0, 'successes': 0, 'total_ms': 0.0} for name in names}
+        self._lock = threading.Lock()
+    
+    def order(self):
+        """Variant names, best first"""
+        with self._lock:
+            attempts = sum(stats['attempts'] for stats in self._stats.values())
+            if attempts < self.warmup:
+                return list(self.names)
+            return sorted(self.names, key=lambda name: -self._score(self._stats[name]))
+    
+    @staticmethod
+    def _score(stats):
+        """Smoothed success rate per millisecond"""
+        rate = (stats['successes'] + 1) / (stats['attempts'] + 2)
+        mean_ms = stats['total_ms'] / stats['attempts'] if stats['attempts'] else 1.0
+        return rate / max(mean_ms, 0.1)
+    
+    def record(self, name, success, elapsed_ms):
+        """Record one attempt of a variant"""
+        with self._lock:
+            stats = self._stats[name]
+            stats['attempts'] += 1
+            stats['successes'] += int(success)
+            stats['total_ms'] += elapsed_ms
+    
+    def stats(self):
+        """Per-variant attempts, successes, mean time and score, best first"""
+        with self._lock:
+            rows = []
+            for name in self.names:
+                stats = self._stats[name]
+                rows.append({
+                    'variant': name,
+                    'attempts': stats['attempts'],
+                    'successes': stats['successes'],
+                    'mean_ms': round(stats['total_ms'] / stats['attempts'], 2) if stats['attempts'] else None,
+                    'score': round(self._score(stats), 4),
+                })
+        return sorted(rows, key=lambda row: -row['score'])
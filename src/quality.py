@@ -0,0 +1,138 @@
+import cv2
+import numpy as np
+
+from preprocessing import structuring_element, thread_scratch
+
+
+def downscaled_gray(image, max_side=512):
+    """Grayscale copy with the longest side at most max_side"""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    factor = max_side / max(gray.shape[:2])
+    if factor < 1:
+        gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _exposure(gray):
+    """1st-to-99th percentile spread and fraction of clipped pixels"""
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    cumulative = np.cumsum(hist) / gray.size
+    low = int(np.searchsorted(cumulative, 0.01))
+    high = int(np.searchsorted(cumulative, 0.99))
+    return high - low, float((hist[:3].sum() + hist[253:].sum()) / gray.size)
+
+
+def measure_quality(gray, block=15, edge_threshold=40.0, coherence=0.7):
+    """
+    Cheap image statistics, meant for a downscaled copy (downscaled_gray)
+
+    Args:
+        gray: 2D uint8 image
+        block: Structure-tensor window in pixels
+        edge_threshold: Smoothed gradient magnitude counted as an edge
+        coherence: Minimum structure-tensor coherence of bar texture
+
+    Returns:
+        dict with 'sharpness' (Laplacian variance), 'dynamic_range'
+        (1st to 99th percentile), 'clipped' (fraction of pixels at either
+        end of the histogram), 'barcode_energy' (area fraction of the
+        largest patch of strong, parallel edges) and 'text_energy'
+        (fraction of pixels on strong edges of any orientation)
+    """
+    buffers = thread_scratch()
+    shape = gray.shape
+
+    dynamic_range, clipped = _exposure(gray)
+
+    laplacian = cv2.Laplacian(gray, cv2.CV_32F, dst=buffers.get('quality_lap', shape, np.float32))
+    sharpness = float(laplacian.var())
+
+    # Structure tensor: bars give strong gradients that all point one way,
+    # text strokes and noise point every way
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, dst=buffers.get('quality_gx', shape, np.float32))
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, dst=buffers.get('quality_gy', shape, np.float32))
+    window = (block, block)
+    jxx = cv2.boxFilter(gx * gx, -1, window)
+    jyy = cv2.boxFilter(gy * gy, -1, window)
+    jxy = cv2.boxFilter(gx * gy, -1, window)
+    energy = jxx + jyy
+    anisotropy = np.sqrt((jxx - jyy) ** 2 + 4 * jxy ** 2)
+
+    strong = energy > 2 * edge_threshold ** 2
+    text_energy = float(np.count_nonzero(strong) / gray.size)
+
+    bars = (strong & (anisotropy > coherence * energy)).astype(np.uint8)
+    # Opening removes isolated stroke fragments; a barcode survives as one patch
+    bars = cv2.morphologyEx(bars, cv2.MORPH_OPEN, structuring_element(cv2.MORPH_RECT, (7, 7)))
+    count, _, stats, _ = cv2.connectedComponentsWithStats(bars)
+    largest = int(stats[1:, cv2.CC_STAT_AREA].max()) if count > 1 else 0
+
+    return {
+        'sharpness': round(sharpness, 1),
+        'dynamic_range': dynamic_range,
+        'clipped': round(clipped, 4),
+        'barcode_energy': round(largest / gray.size, 4),
+        'text_energy': round(text_energy, 4),
+    }
+
+
+def measure_detail(gray, edge_threshold=40.0):
+    """
+    The exposure, sharpness and edge statistics of measure_quality with
+    small integer buffers instead of float ones, so they stay cheap on a
+    full-resolution image; edges are per pixel rather than smoothed
+
+    Returns:
+        dict with 'sharpness', 'dynamic_range' and 'text_energy'
+    """
+    dynamic_range, _ = _exposure(gray)
+    _, deviation = cv2.meanStdDev(cv2.Laplacian(gray, cv2.CV_16S))
+    # Sobel responses scaled back to intensity steps, saturating at 255
+    gx = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 1, 0), alpha=0.25)
+    gy = cv2.convertScaleAbs(cv2.Sobel(gray, cv2.CV_16S, 0, 1), alpha=0.25)
+    edges = cv2.countNonZero(cv2.compare(cv2.add(gx, gy), edge_threshold, cv2.CMP_GT))
+    return {
+        'sharpness': round(float(deviation[0, 0]) ** 2, 1),
+        'dynamic_range': dynamic_range,
+        'text_energy': round(edges / gray.size, 4),
+    }
+
+
+def _problem(stats, config):
+    """Why an image measured by measure_quality is not worth decoding, or None"""
+    # Low contrast alone is not enough: a small code on a large, otherwise
+    # empty page has a narrow histogram but strong edges
+    if (stats['dynamic_range'] < config.get('min_dynamic_range', 30)
+            and stats['text_energy'] < config.get('min_edge_energy', 0.001)):
+        return f"blank or badly exposed (dynamic range {stats['dynamic_range']})"
+    if stats['sharpness'] < config.get('min_sharpness', 40):
+        return f"too blurred (sharpness {stats['sharpness']})"
+    return None
+
+
+def assess_quality(image, config):
+    """
+    Decide whether an image is worth running the cascade on
+
+    Only blank, badly exposed and blurred images are turned away: barcode
+    texture is not a reason to skip decoders, since fine bars vanish from a
+    downscaled copy. A reject found on the downscaled copy is confirmed at
+    the image's own resolution before it stands.
+
+    Args:
+        image: Grayscale or BGR image
+        config: QUALITY_CONFIG
+
+    Returns:
+        (verdict, reason, stats): verdict is 'ok' (run the cascade) or
+        'reject' (nothing a decoder could read), reason is None for 'ok'
+    """
+    max_side = config.get('max_side', 512)
+    stats = measure_quality(downscaled_gray(image, max_side))
+    problem = _problem(stats, config)
+    if problem is not None and max(image.shape[:2]) > max_side:
+        stats = measure_detail(downscaled_gray(image, max(image.shape[:2])))
+        problem = _problem(stats, config)
+    if problem is not None:
+        return 'reject', problem, stats
+    return 'ok', None, stats
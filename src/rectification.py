@@ -0,0 +1,127 @@
+import cv2
+import numpy as np
+
+
+def fit_quadrilateral(contour):
+    """
+    Fit four corners to a located barcode region
+
+    The convex hull is simplified with approxPolyDP; when that does not give
+    exactly four corners (rounded or ragged outlines) the minimum-area
+    rectangle is used instead.
+
+    Args:
+        contour: OpenCV contour of the region
+
+    Returns:
+        float32 array of shape (4, 2), ordered by order_corners
+    """
+    hull = cv2.convexHull(contour)
+    perimeter = cv2.arcLength(hull, True)
+    for epsilon in (0.02, 0.04, 0.06):
+        approx = cv2.approxPolyDP(hull, epsilon * perimeter, True)
+        if len(approx) == 4:
+            return order_corners(approx.reshape(4, 2))
+        if len(approx) < 4:
+            break
+    return order_corners(cv2.boxPoints(cv2.minAreaRect(contour)))
+
+
+def order_corners(points):
+    """
+    Order four corners clockwise (image coordinates) so that the first edge
+    is a long side, starting from the corner nearest the image origin;
+    a strip warped from them has its long axis horizontal
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(4, 2)
+    center = points.mean(axis=0)
+    angles = np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0])
+    points = points[np.argsort(angles)]
+
+    edges = np.linalg.norm(points - np.roll(points, -1, axis=0), axis=1)
+    start = 0 if edges[0] + edges[2] >= edges[1] + edges[3] else 1
+    # Of the two corners that start a long side, prefer the top-left one
+    if points[start + 2].sum() < points[start].sum():
+        start += 2
+    return np.roll(points, -start, axis=0)
+
+
+def skew_degrees(quad):
+    """Largest deviation of the quadrilateral's edges from the image axes"""
+    deltas = np.roll(quad, -1, axis=0) - quad
+    angles = np.degrees(np.arctan2(deltas[:, 1], deltas[:, 0])) % 90
+    return float(np.max(np.minimum(angles, 90 - angles)))
+
+
+def symbol_angle(polygon):
+    """
+    Orientation of a decoded symbol's long side, in degrees counter-clockwise
+    from the image x axis, in (-90, 90]
+    """
+    box = cv2.boxPoints(cv2.minAreaRect(np.asarray(polygon, dtype=np.float32).reshape(-1, 2)))
+    quad = order_corners(box)
+    dx, dy = quad[1] - quad[0]
+    angle = float(np.degrees(np.arctan2(-dy, dx)))
+    if angle <= -90:
+        angle += 180
+    elif angle > 90:
+        angle -= 180
+    return round(angle, 1) + 0.0
+
+
+def rectify_region(image, quad, padding=0.1):
+    """
+    Warp a quadrilateral region to a fronto-parallel strip
+
+    Args:
+        image: Frame the quadrilateral was located in
+        quad: Corners from fit_quadrilateral
+        padding: Quiet-zone margin added on every side (fraction of size)
+
+    Returns:
+        tuple (strip, matrix): the warped crop, long axis horizontal, and the
+        3x3 transform from strip pixels back to frame pixels
+    """
+    quad = np.asarray(quad, dtype=np.float32)
+    center = quad.mean(axis=0)
+    source = center + (quad - center) * (1 + 2 * padding)
+
+    width = int(round((np.linalg.norm(source[1] - source[0]) + np.linalg.norm(source[2] - source[3])) / 2))
+    height = int(round((np.linalg.norm(source[3] - source[0]) + np.linalg.norm(source[2] - source[1])) / 2))
+    width, height = max(width, 8), max(height, 8)
+    target = np.float32([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]])
+
+    to_strip = cv2.getPerspectiveTransform(source, target)
+    strip = cv2.warpPerspective(image, to_strip, (width, height),
+                                flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    return strip, np.linalg.inv(to_strip)
+
+
+def map_symbol(symbol, matrix):
+    """
+    Map a decoded symbol's geometry through a 3x3 transform
+
+    Args:
+        symbol: Result dict with optional 'rect' (x, y, w, h) and 'polygon'
+        matrix: Transform from the decoded image to frame pixels
+
+    Returns:
+        New result dict; 'polygon' is mapped point by point (a rect without a
+        polygon is mapped by its corners) and 'rect' becomes its bounding box
+    """
+    mapped = dict(symbol)
+    polygon = symbol.get('polygon')
+    if polygon is None and symbol.get('rect') is not None:
+        x, y, w, h = symbol['rect']
+        polygon = [(x, y), (x + w, y), (x + w, y + h), (x, y + h)]
+    if polygon is None:
+        return mapped
+
+    points = cv2.perspectiveTransform(np.asarray(polygon, dtype=np.float32).reshape(-1, 1, 2),
+                                      np.asarray(matrix, dtype=np.float64))
+    points = np.rint(points.reshape(-1, 2)).astype(np.int32)
+    if symbol.get('polygon') is not None:
+        mapped['polygon'] = [tuple(int(v) for v in point) for point in points]
+    if symbol.get('rect') is not None:
+        mapped['rect'] = tuple(int(v) for v in cv2.boundingRect(points))
+    return mapped
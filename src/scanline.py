@@ -0,0 +1,418 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# Code128 bar/space widths (in modules) for symbol values 0-105
+CODE128_PATTERNS = [
+    '212222', '222122', '222221', '121223', '121322', '131222', '122213', '122312', '132212', '221213',
+    '221312', '231212', '112232', '122132', '122231', '113222', '123122', '123221', '223211', '221132',
+    '221231', '213212', '223112', '312131', '311222', '321122', '321221', '312212', '322112', '322211',
+    '212123', '212321', '232121', '111323', '131123', '131321', '112313', '132113', '132311', '211313',
+    '231113', '231311', '112133', '112331', '132131', '113123', '113321', '133121', '313121', '211331',
+    '231131', '213113', '213311', '213131', '311123', '311321', '331121', '312113', '312311', '332111',
+    '314111', '221411', '431111', '111224', '111422', '121124', '121421', '141122', '141221', '112214',
+    '112412', '122114', '122411', '142112', '142211', '241211', '221114', '413111', '241112', '134111',
+    '111242', '121142', '121241', '114212', '124112', '124211', '411212', '421112', '421211', '212141',
+    '214121', '412121', '111143', '111341', '131141', '114113', '114311', '411113', '411311', '113141',
+    '114131', '311141', '411131', '211412', '211214', '211232',
+]
+CODE128_STOP = '2331112'
+CODE128_START = {103: 'A', 104: 'B', 105: 'C'}
+
+# EAN left-hand (odd parity, L) widths, starting with a space; R codes use
+# the same widths starting with a bar and G codes are the L widths reversed
+EAN_L_PATTERNS = ['3211', '2221', '2122', '1411', '1132', '1231', '1114', '1312', '1213', '3112']
+EAN_G_PATTERNS = [p[::-1] for p in EAN_L_PATTERNS]
+EAN13_PARITY = {
+    'LLLLLL': 0, 'LLGLGG': 1, 'LLGGLG': 2, 'LLGGGL': 3, 'LGLLGG': 4,
+    'LGGLLG': 5, 'LGGGLL': 6, 'LGLGLG': 7, 'LGLGGL': 8, 'LGGLGL': 9,
+}
+
+_C128 = np.array([[int(c) for c in p] for p in CODE128_PATTERNS], dtype=np.float32)
+_C128_STOP = np.array([int(c) for c in CODE128_STOP], dtype=np.float32)
+_EAN_LG = np.array([[int(c) for c in p] for p in EAN_L_PATTERNS + EAN_G_PATTERNS],
+                   dtype=np.float32)
+
+SUPPORTED_SYMBOLOGIES = ('CODE128', 'EAN13', 'EAN8')
+
+
+def scan_runs(profile, min_contrast=40):
+    """
+    Binarize a 1D intensity profile into alternating bar/space runs
+    
+    Edges are placed at the sub-pixel position where the profile crosses
+    the threshold, so modules narrower than ~2 px still measure correctly.
+
+    Args:
+        profile: 1D intensity array along the scanline
+        min_contrast: Minimum dark/light spread to attempt a decode
+
+    Returns:
+        tuple (widths, is_dark, bounds) or None if the profile is too flat
+    """
+    profile = np.asarray(profile, dtype=np.float32)
+    lo, hi = np.percentile(profile, (5, 95))
+    if hi - lo < min_contrast:
+        return None
+    threshold = (lo + hi) / 2
+    dark = profile < threshold
+    crossings = np.flatnonzero(dark[1:] != dark[:-1])
+    before, after = profile[crossings], profile[crossings + 1]
+    edges = crossings + (threshold - before) / (after - before)
+    bounds = np.concatenate(([0.0], edges, [float(len(dark))]))
+    first = np.concatenate(([0], crossings + 1))
+    return np.diff(bounds).astype(np.float32), dark[first], bounds
+
+
+def _nearest(windows, patterns, total):
+    """Best pattern index, L1 error and margin to the runner-up per window"""
+    norm = windows * (total / windows.sum(axis=1, keepdims=True))
+    err = np.abs(norm[:, None, :] - patterns[None, :, :]).sum(axis=2)
+    best_index = err.argmin(axis=1)
+    two_smallest = np.partition(err, 1, axis=1)
+    return best_index, two_smallest[:, 0], two_smallest[:, 1] - two_smallest[:, 0]
+
+
+def decode_code128_runs(widths, is_dark, max_error=1.6, min_margin=0.4):
+    """
+    Decode Code128 from run widths with vectorized pattern matching
+
+    Every 6-run window is matched against the whole symbol table at once;
+    a decode only counts when all symbols match cleanly, the stop pattern
+    is found and the mod-103 checksum holds.
+
+    Returns:
+        List of (text, first_run, end_run) tuples
+    """
+    if len(widths) < 6 * 3 + 7:
+        return []
+    codes, errors, margins = _nearest(sliding_window_view(widths, 6), _C128, 11.0)
+    clean = (errors <= max_error) & (margins >= min_margin)
+
+    stop_windows = sliding_window_view(widths, 7)
+    stop_norm = stop_windows * (13.0 / stop_windows.sum(axis=1, keepdims=True))
+    is_stop = np.abs(stop_norm - _C128_STOP).sum(axis=1) <= max_error
+
+    starts = np.flatnonzero(is_dark[:len(codes)] & clean & (codes >= 103))
+    found = []
+    for start in starts:
+        module = widths[start:start+6].sum() / 11.0
+        if start == 0 or widths[start - 1] < 3 * module:
+            continue  # no quiet zone
+        values = [int(codes[start])]
+        run = start + 6
+        while run + 7 <= len(widths):
+            if is_stop[run]:
+                break
+            if run >= len(codes) or not clean[run] or codes[run] >= 103:
+                run = None
+                break
+            values.append(int(codes[run]))
+            run += 6
+        else:
+            run = None
+        if run is None or len(values) < 3:
+            continue
+        *symbols, check = values
+        if sum(v * max(i, 1) for i, v in enumerate(symbols)) % 103 != check:
+            continue
+        text = code128_text(symbols)
+        if text:
+            found.append((text, int(start), int(run + 7)))
+    return found
+
+
+def code128_text(values):
+    """
+    Translate Code128 symbol values (start symbol first, no checksum) to text
+
+    Returns:
+        Decoded string, or None for sequences this decoder does not handle
+    """
+    code = CODE128_START.get(values[0])
+    if code is None:
+        return None
+    out = []
+    shift = False
+    for value in values[1:]:
+        current = ('B' if code == 'A' else 'A') if shift else code
+        shift = False
+        if current == 'C':
+            if value < 100:
+                out.append(f'{value:02d}')
+            elif value == 100:
+                code = 'B'
+            elif value == 101:
+                code = 'A'
+            elif value == 102:
+                out.append('\x1d')
+            else:
+                return None
+        elif value < 96:
+            if current == 'B' or value < 64:
+                out.append(chr(value + 32))
+            else:
+                out.append(chr(value - 64))
+        elif value == 98:
+            shift = True
+        elif value == 99:
+            code = 'C'
+        elif value == 100 and current == 'A':
+            code = 'B'
+        elif value == 101 and current == 'B':
+            code = 'A'
+        elif value == 102:
+            out.append('\x1d')
+        else:
+            # FNC2/FNC3/FNC4 - leave these to zbar
+            return None
+    text = ''.join(out)
+    # A leading FNC1 only marks GS1-128 and is not part of the data
+    return text[1:] if text.startswith('\x1d') else text
+
+
+def ean_checksum_ok(digits):
+    """Verify the EAN-8/EAN-13/UPC-A check digit (list or string of digits)"""
+    digits = [int(d) for d in digits]
+    body, check = digits[:-1], digits[-1]
+    # Weights alternate 3,1,... starting from the digit next to the check digit
+    total = sum(d * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(body)))
+    return (10 - total % 10) % 10 == check
+
+
+def decode_ean_runs(widths, is_dark, digits_per_half=6, max_error=1.4, max_guard_error=0.6):
+    """
+    Decode EAN-13 (digits_per_half=6) or EAN-8 (4) from run widths
+
+    Returns:
+        List of (text, first_run, end_run) tuples
+    """
+    d = digits_per_half
+    n_runs = 3 + 4 * d + 5 + 4 * d + 3
+    n_modules = 3 + 7 * d + 5 + 7 * d + 3
+    if len(widths) < n_runs:
+        return []
+    windows = sliding_window_view(widths, n_runs)
+    candidates = np.flatnonzero(is_dark[:len(windows)])
+    candidates = candidates[candidates > 0]
+    if len(candidates) == 0:
+        return []
+    windows = windows[candidates]
+    module = windows.sum(axis=1, keepdims=True) / n_modules
+    unit = windows / module
+
+    middle = 3 + 4 * d
+    guards = np.concatenate(
+        [unit[:, :3], unit[:, middle:middle+5], unit[:, -3:]], axis=1
+    )
+    quiet = widths[candidates - 1] >= 3 * module[:, 0]
+    ok = quiet & (np.abs(guards - 1).max(axis=1) <= max_guard_error)
+
+    found = []
+    for index in np.flatnonzero(ok):
+        row = windows[index]
+        left = row[3:middle].reshape(d, 4)
+        right = row[middle+5:middle+5+4*d].reshape(d, 4)
+        left_codes, left_err, _ = _nearest(left, _EAN_LG, 7.0)
+        right_codes, right_err, _ = _nearest(right, _EAN_LG[:10], 7.0)
+        if left_err.max() > max_error or right_err.max() > max_error:
+            continue
+
+        digits = [int(c % 10) for c in left_codes] + [int(c) for c in right_codes]
+        parity = ''.join('G' if c >= 10 else 'L' for c in left_codes)
+        if d == 6:
+            if parity not in EAN13_PARITY:
+                continue
+            digits.insert(0, EAN13_PARITY[parity])
+        elif parity != 'L' * d:
+            continue
+        if not ean_checksum_ok(digits):
+            continue
+        start = int(candidates[index])
+        found.append((''.join(map(str, digits)), start, start + n_runs))
+    return found
+
+
+def decode_profile(profile, symbologies=None):
+    """
+    Decode every supported symbol crossed by one scanline
+
+    Args:
+        profile: 1D intensity profile
+        symbologies: Iterable of type names to try (default: all supported)
+
+    Returns:
+        List of (type, text, start_px, end_px) tuples
+    """
+    runs = scan_runs(profile)
+    if runs is None:
+        return []
+    widths, is_dark, bounds = runs
+    wanted = set(symbologies or SUPPORTED_SYMBOLOGIES)
+
+    found = []
+    if 'CODE128' in wanted:
+        found += [('CODE128',) + hit for hit in decode_code128_runs(widths, is_dark)]
+    if 'EAN13' in wanted:
+        found += [('EAN13',) + hit for hit in decode_ean_runs(widths, is_dark, 6)]
+    if 'EAN8' in wanted:
+        found += [('EAN8',) + hit for hit in decode_ean_runs(widths, is_dark, 4)]
+    return [(kind, text, int(round(bounds[a])), int(round(bounds[b]))) for kind, text, a, b in found]
+
+
+def _bar_extent(view, a0, a1, b0, b1, min_match=0.9):
+    """
+    Extend the agreeing scanlines b0..b1 across the bars
+
+    Each line is binarized over the symbol's span a0..a1 and compared with
+    the bar/space pattern of the agreeing lines; the extent grows outwards
+    from the middle one while at least min_match of its pixels follow that
+    pattern. A scanline band only grazing the bars' edge can still decode,
+    so the extent may also end up inside b0..b1.
+
+    Returns:
+        tuple (first, last) line covered by the bars
+    """
+    reference = view[b0:b1+1, a0:a1].astype(np.float32).mean(axis=0)
+    threshold = (reference.min() + reference.max()) / 2
+    matches = ((view[:, a0:a1] < threshold) == (reference < threshold)).mean(axis=1)
+    first = last = (b0 + b1) // 2
+    if matches[first] < min_match:
+        return b0, b1
+    while first > 0 and matches[first - 1] >= min_match:
+        first -= 1
+    while last < len(matches) - 1 and matches[last + 1] >= min_match:
+        last += 1
+    return first, last
+
+
+def decode_scanlines(gray, region=None, lines=7, band=3, min_agreement=2, symbologies=None):
+    """
+    Decode axis-aligned 1D barcodes from a handful of scanlines
+
+    Scanlines run along the long side of the region (rows for horizontal
+    codes, columns for codes printed sideways) and in both directions.
+    A symbol is only reported when at least min_agreement scanlines decode
+    the same checksum-valid value, so anything doubtful is left to zbar.
+
+    Args:
+        gray: Grayscale image
+        region: Optional (x, y, w, h) to scan; default is the whole image
+        lines: Number of scanlines
+        band: Rows averaged per scanline to suppress noise
+        min_agreement: Scanlines that must agree on a value
+        symbologies: Iterable of type names to try (default: all supported)
+
+    Returns:
+        List of result dicts with 'data', 'type', 'method', 'rect' and 'polygon';
+        the box spans the symbol's full bar height, not just the scanlines
+    """
+    if region is None:
+        region = (0, 0, gray.shape[1], gray.shape[0])
+    x, y, w, h = region
+    patch = gray[y:y+h, x:x+w]
+    if patch.size == 0:
+        return []
+
+    orientations = [False, True] if region == (0, 0, gray.shape[1], gray.shape[0]) else [h > w]
+    results = []
+    for transposed in orientations:
+        view = patch.T if transposed else patch
+        length = view.shape[0]
+        # Stay in the middle of the region where bars are tallest
+        positions = np.linspace(length * 0.2, length * 0.8, lines).astype(int)
+        hits = {}
+        for pos in positions:
+            lo, hi = max(0, pos - band // 2), min(length, pos + band // 2 + 1)
+            profile = view[lo:hi].mean(axis=0)
+            for reverse in (False, True):
+                scan = profile[::-1] if reverse else profile
+                decoded = decode_profile(scan, symbologies)
+                for kind, text, start, end in decoded:
+                    if reverse:
+                        start, end = len(scan) - end, len(scan) - start
+                    hits.setdefault((kind, text), []).append((pos, start, end))
+                if decoded:
+                    break  # no need to read this line backwards
+            if any(len(spans) > min_agreement for spans in hits.values()):
+                break
+
+        for (kind, text), spans in hits.items():
+            if len({pos for pos, _, _ in spans}) < min_agreement:
+                continue
+            spans = [(int(pos), start, end) for pos, start, end in spans]
+            a0 = min(start for _, start, _ in spans)
+            a1 = max(end for _, _, end in spans)
+            b0, b1 = _bar_extent(view, a0, a1,
+                                 min(pos for pos, _, _ in spans),
+                                 max(pos for pos, _, _ in spans))
+            if transposed:
+                rect = (x + b0, y + a0, b1 - b0 + 1, a1 - a0)
+            else:
+                rect = (x + a0, y + b0, a1 - a0, b1 - b0 + 1)
+            rx, ry, rw, rh = rect
+            results.append({
+                'data': text,
+                'type': kind,
+                'method': 'scanline',
+                'rect': rect,
+                'polygon': [(rx, ry), (rx, ry + rh), (rx + rw, ry + rh), (rx + rw, ry)],
+            })
+    return results
+
+
+def encode_code128(data):
+    """
+    Encode text as Code128 module widths (code set C for even-length digit
+    strings, B otherwise); used for synthetic test images
+
+    Returns:
+        List of bar/space widths in modules, starting with a bar
+    """
+    if len(data) >= 4 and len(data) % 2 == 0 and data.isdigit():
+        values = [105] + [int(data[i:i+2]) for i in range(0, len(data), 2)]
+    else:
+        if any(not 32 <= ord(c) < 128 for c in data):
+            raise ValueError(f"Cannot encode {data!r} in Code128 set B")
+        values = [104] + [ord(c) - 32 for c in data]
+    check = sum(v * max(i, 1) for i, v in enumerate(values)) % 103
+    pattern = ''.join(CODE128_PATTERNS[v] for v in values + [check]) + CODE128_STOP
+    return [int(c) for c in pattern]
+
+
+def encode_ean13(digits):
+    """
+    Encode 12 or 13 digits as EAN-13 module widths (check digit added or verified)
+
+    Returns:
+        List of bar/space widths in modules, starting with a bar
+    """
+    digits = [int(c) for c in str(digits)]
+    if len(digits) == 12:
+        total = sum(d * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digits)))
+        digits.append((10 - total % 10) % 10)
+    if len(digits) != 13 or not ean_checksum_ok(digits):
+        raise ValueError("EAN-13 needs 12 digits or 13 digits with a valid check digit")
+    parity = next(p for p, first in EAN13_PARITY.items() if first == digits[0])
+    widths = '111'
+    for digit, kind in zip(digits[1:7], parity):
+        widths += (EAN_G_PATTERNS if kind == 'G' else EAN_L_PATTERNS)[digit]
+    widths += '11111'
+    for digit in digits[7:]:
+        widths += EAN_L_PATTERNS[digit]
+    widths += '111'
+    return [int(c) for c in widths]
+
+
+def render_modules(widths, module_px=3, height=120, quiet_modules=10):
+    """
+    Render bar/space module widths as a grayscale image (bars black)
+
+    Returns:
+        uint8 image
+    """
+    row = [255] * (quiet_modules * module_px)
+    for index, width in enumerate(widths):
+        row += [0 if index % 2 == 0 else 255] * (width * module_px)
+    row += [255] * (quiet_modules * module_px)
+    return np.tile(np.array(row, dtype=np.uint8), (height, 1))
@@ -0,0 +1,76 @@
+import cv2
+
+from preprocessing import structuring_element
+
+
+def find_label_regions(image, min_area_ratio=0.03, max_area_ratio=0.5, max_labels=12):
+    """
+    Find rectangular labels on a sheet (e.g. an A4 page of waybills)
+
+    Args:
+        image: Input image (grayscale or BGR)
+        min_area_ratio: Smallest label area as a fraction of the page
+        max_area_ratio: Largest label area as a fraction of the page
+        max_labels: Maximum number of regions to return
+
+    Returns:
+        List of (x, y, w, h) label boxes in reading order; empty if the
+        page does not look like a multi-label sheet
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    page_area = gray.shape[0] * gray.shape[1]
+
+    # Label borders and cut lines show up as long closed edges
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(edges, structuring_element(cv2.MORPH_RECT, (5, 5)))
+    contours, _ = cv2.findContours(edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+    candidates = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if not min_area_ratio * page_area <= area <= max_area_ratio * page_area:
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) != 4 or not cv2.isContourConvex(approx):
+            continue
+        x, y, w, h = cv2.boundingRect(approx)
+        # Reject skewed quads whose box is much larger than the contour
+        if area < 0.8 * w * h:
+            continue
+        candidates.append((x, y, w, h))
+
+    regions = _outermost(candidates)
+    if len(regions) < 2:
+        return []
+    return _reading_order(regions)[:max_labels]
+
+
+def _contains(outer, inner, tolerance=8):
+    """Whether box outer contains box inner (within a few pixels)"""
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return (ix >= ox - tolerance and iy >= oy - tolerance and
+            ix + iw <= ox + ow + tolerance and iy + ih <= oy + oh + tolerance)
+
+
+def _outermost(boxes):
+    """Drop boxes nested inside another box (inner sections, double edges)"""
+    boxes = sorted(set(boxes), key=lambda b: b[2] * b[3], reverse=True)
+    kept = []
+    for box in boxes:
+        if not any(_contains(outer, box) for outer in kept):
+            kept.append(box)
+    return kept
+
+
+def _reading_order(boxes):
+    """Sort boxes into rows top-to-bottom, then left-to-right within a row"""
+    rows = []
+    for box in sorted(boxes, key=lambda b: b[1]):
+        first = rows[-1][0] if rows else None
+        if first is not None and box[1] < first[1] + first[3] / 2:
+            rows[-1].append(box)
+        else:
+            rows.append([box])
+    return [box for row in rows for box in sorted(row, key=lambda b: b[0])]
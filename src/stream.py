@@ -0,0 +1,295 @@
+import time
+
+import cv2
+import numpy as np
+
+from config import get_config
+from quality import downscaled_gray
+from tiling import merge_symbols
+
+
+def open_capture(source):
+    """
+    Open a video file or camera
+
+    Args:
+        source: Video file path, V4L2 device path (/dev/videoN) or camera index
+
+    Returns:
+        tuple (cv2.VideoCapture, live): live is True for cameras
+
+    Raises:
+        ValueError: If the source cannot be opened
+    """
+    source = str(source)
+    if source.isdigit():
+        capture, live = cv2.VideoCapture(int(source)), True
+    elif source.startswith('/dev/video'):
+        capture, live = cv2.VideoCapture(source, cv2.CAP_V4L2), True
+    else:
+        capture, live = cv2.VideoCapture(source), False
+    if not capture.isOpened():
+        capture.release()
+        raise ValueError(f"Could not open video source: {source}")
+    if live:
+        # Keep only the newest frame queued so a slow decode never works on stale frames
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return capture, live
+
+
+def sample_frames(capture, target_fps, realtime=False, stats=None):
+    """
+    Yield frames at no more than target_fps
+
+    Every frame is grabbed, but only the frames due for the next slot are
+    retrieved (converted and copied); the others are skipped. Timestamps
+    are media seconds for files and, with realtime=True (cameras), wall-clock
+    seconds since the first frame, so frames that arrive while the caller
+    is still decoding are dropped.
+
+    Args:
+        capture: Opened cv2.VideoCapture
+        target_fps: Frames per second to yield (0 or None = every frame)
+        realtime: Pace by the wall clock instead of the media frame rate
+        stats: Optional dict whose 'skipped' count is incremented
+
+    Yields:
+        tuple (frame_index, timestamp_seconds, frame)
+    """
+    interval = 1.0 / target_fps if target_fps else 0.0
+    media_fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+    started = time.monotonic()
+    next_due = 0.0
+    index = -1
+    while capture.grab():
+        index += 1
+        if realtime or media_fps <= 0:
+            timestamp = time.monotonic() - started
+        else:
+            timestamp = index / media_fps
+        # Small tolerance: media timestamps are frame_index / fps
+        if timestamp + 1e-6 < next_due:
+            if stats is not None:
+                stats['skipped'] = stats.get('skipped', 0) + 1
+            continue
+        ok, frame = capture.retrieve()
+        if not ok:
+            continue
+        # Slots stay on the target grid; after falling behind, restart from now
+        next_due = next_due + interval if timestamp - next_due < interval else timestamp + interval
+        yield index, timestamp, frame
+
+
+def frame_sharpness(frame, max_side=512):
+    """Laplacian variance of a downscaled grayscale copy (see quality.measure_quality)"""
+    gray = downscaled_gray(frame, max_side)
+    return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+
+class RepeatFilter:
+    """
+    Suppress repeated reads of the same barcode across consecutive frames
+
+    A (type, data) pair read again within `window` seconds of its last
+    sighting is a repeat; after a longer gap it is reported again.
+    """
+
+    def __init__(self, window=2.0):
+        self.window = window
+        self._last_seen = {}
+
+    def is_new(self, barcode, timestamp):
+        """Record a read; True if it starts a new sighting"""
+        key = (barcode.get('type'), barcode['data'])
+        last = self._last_seen.get(key)
+        self._last_seen[key] = timestamp
+        return last is None or timestamp - last > self.window
+
+    def expire(self, timestamp):
+        """Forget codes not seen for longer than the window (bounds memory)"""
+        self._last_seen = {
+            key: seen for key, seen in self._last_seen.items()
+            if timestamp - seen <= self.window
+        }
+
+
+def _grown(rect, margin, shape):
+    """Box grown by margin x its longer side on every side, clipped to the frame"""
+    x, y, w, h = rect
+    pad = int(round(margin * max(w, h)))
+    x0, y0 = max(0, x - pad), max(0, y - pad)
+    x1, y1 = min(shape[1], x + w + pad), min(shape[0], y + h + pad)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class RoiTracker:
+    """
+    Follow decoded barcodes from one sampled frame to the next
+
+    Each track keeps the code's last box and a grayscale template of it;
+    the template is matched (normalised cross-correlation) inside a window
+    around the last box to predict where the code moved.
+    """
+
+    def __init__(self, search_margin=0.5, min_match=0.6):
+        self.search_margin = search_margin
+        self.min_match = min_match
+        self.tracks = []
+
+    def reset(self, barcodes, gray):
+        """Start one track per barcode with a box, dropping the old ones"""
+        self.tracks = []
+        for barcode in barcodes:
+            self.update({'data': barcode['data'], 'type': barcode.get('type')}, barcode, gray)
+
+    def update(self, track, barcode, gray):
+        """Move a track to a fresh read of its code"""
+        rect = barcode.get('rect')
+        if not rect or rect[2] < 4 or rect[3] < 4:
+            return
+        x, y, w, h = rect
+        template = gray[y:y + h, x:x + w]
+        if template.shape[:2] != (h, w):
+            return
+        track.update(rect=tuple(rect), template=template.copy())
+        # By identity: tracks of one code compare equal up to their templates
+        if not any(known is track for known in self.tracks):
+            self.tracks.append(track)
+
+    def predict(self, track, gray):
+        """Predicted (x, y, w, h) of a track's code in a new frame; None if lost"""
+        x0, y0, w0, h0 = _grown(track['rect'], self.search_margin, gray.shape)
+        template = track['template']
+        h, w = template.shape[:2]
+        if w0 < w or h0 < h:
+            return None
+        scores = cv2.matchTemplate(gray[y0:y0 + h0, x0:x0 + w0], template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if best < self.min_match:
+            return None
+        return x0 + dx, y0 + dy, w, h
+
+
+def latency_stats(samples):
+    """Count, mean, median, 95th percentile and maximum of latencies in ms"""
+    if not samples:
+        return {'frames': 0}
+    values = np.asarray(samples)
+    return {
+        'frames': len(samples),
+        'mean_ms': round(float(values.mean()), 1),
+        'p50_ms': round(float(np.percentile(values, 50)), 1),
+        'p95_ms': round(float(np.percentile(values, 95)), 1),
+        'max_ms': round(float(values.max()), 1),
+    }
+
+
+def _decode_tracks(detector, frame, gray, tracker, decode_margin):
+    """
+    Decode each track's predicted window
+    Returns: list of barcodes in frame pixels, or None when a track is lost
+    """
+    barcodes = []
+    for track in list(tracker.tracks):
+        predicted = tracker.predict(track, gray)
+        if predicted is None:
+            return None
+        window = _grown(predicted, decode_margin, gray.shape)
+        found = detector.extract_barcodes_from_frame(frame, window=window)['barcodes']
+        ours = [barcode for barcode in found if barcode['data'] == track['data']]
+        if not ours:
+            return None
+        tracker.update(track, ours[0], gray)
+        barcodes.append(ours[0])
+    # Windows of neighbouring tracks overlap and may hold the same read
+    return merge_symbols(barcodes)
+
+
+def scan_stream(detector, source, config=None, max_frames=None):
+    """
+    Decode barcodes from a video file or camera
+
+    Sampled frames that are sharp enough go through
+    detector.extract_barcodes_from_frame; repeated reads of a code still in
+    view are dropped. With tracking on, codes read in the previous frame
+    are decoded inside their predicted windows, and the whole frame is
+    searched only when a track is lost (or every full_frame_every frames).
+
+    Args:
+        detector: BarcodeDetector
+        source: Video file, V4L2 device path or camera index (open_capture)
+        config: STREAM_CONFIG (None = config.py)
+        max_frames: Stop after this many sampled frames (None = end of stream)
+
+    Yields:
+        Event dicts for a JSONL stream: one 'start', a 'barcode' per new
+        sighting (the extract_barcodes fields plus 'frame' and 'time'), a
+        'text' event per new OCR read (only with STREAM_CONFIG['ocr']),
+        optional per-frame 'frame' events and a final 'summary' with frame
+        counts and per-mode latency statistics
+    """
+    config = config or get_config('stream')
+    capture, live = open_capture(source)
+    target_fps = config.get('target_fps', 5.0)
+    min_sharpness = config.get('min_sharpness', 60)
+    max_side = get_config('quality').get('max_side', 512)
+    repeats = RepeatFilter(config.get('repeat_seconds', 2.0))
+    tracking = config.get('tracking', {})
+    tracker = RoiTracker(tracking.get('search_margin', 0.5), tracking.get('min_match', 0.6))
+    full_frame_every = tracking.get('full_frame_every', 10)
+    ocr = config.get('ocr', False)
+    stats = {'sampled': 0, 'skipped': 0, 'blurred': 0, 'decoded': 0, 'barcodes': 0, 'track_losses': 0}
+    latencies = {'tracked': [], 'full': []}
+    since_full = 0
+
+    try:
+        yield {
+            'event': 'start',
+            'source': str(source),
+            'live': live,
+            'source_fps': capture.get(cv2.CAP_PROP_FPS) or None,
+            'target_fps': target_fps,
+        }
+        frames = sample_frames(capture, target_fps, live or config.get('realtime_files', False), stats)
+        for index, timestamp, frame in frames:
+            stats['sampled'] += 1
+            if min_sharpness and frame_sharpness(frame, max_side) < min_sharpness:
+                stats['blurred'] += 1
+            else:
+                started = time.perf_counter()
+                stats['decoded'] += 1
+                gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                barcodes, mode = None, 'full'
+                if tracking.get('enabled', True) and tracker.tracks \
+                        and (not full_frame_every or since_full < full_frame_every):
+                    barcodes = _decode_tracks(detector, frame, gray, tracker,
+                                              tracking.get('decode_margin', 0.25))
+                    if barcodes is None:
+                        stats['track_losses'] += 1
+                    else:
+                        mode = 'tracked'
+                        since_full += 1
+                if barcodes is None:
+                    barcodes = detector.extract_barcodes_from_frame(frame, ocr=ocr)['barcodes']
+                    tracker.reset([barcode for barcode in barcodes if barcode['type'] != 'TEXT'], gray)
+                    since_full = 0
+                latency_ms = (time.perf_counter() - started) * 1000
+                latencies[mode].append(latency_ms)
+
+                for barcode in barcodes:
+                    if repeats.is_new(barcode, timestamp):
+                        stats['barcodes'] += 1
+                        # OCR reads are printed text, not decoded symbols
+                        event = 'text' if barcode['type'] == 'TEXT' else 'barcode'
+                        yield dict(event=event, frame=index, time=round(timestamp, 3), **barcode)
+                repeats.expire(timestamp)
+                if config.get('frame_events', False):
+                    yield {'event': 'frame', 'frame': index, 'time': round(timestamp, 3), 'mode': mode,
+                           'latency_ms': round(latency_ms, 1), 'reads': len(barcodes)}
+            if max_frames and stats['sampled'] >= max_frames:
+                break
+    finally:
+        capture.release()
+
+    yield dict(event='summary', **stats,
+               latency={mode: latency_stats(samples) for mode, samples in latencies.items()})
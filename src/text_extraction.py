@@ -1,7 +1,21 @@
+import re
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from PIL import Image
 
+from preprocessing import structuring_element, thread_scratch
+from scanline import ean_checksum_ok
+
+# Symbologies whose decoders only report data that passed the symbology's
+# checksum (Code128 mod-103, Code93, Reed-Solomon for 2D codes, ...)
+CHECKED_SYMBOLOGIES = frozenset({'CODE128', 'CODE93', 'UPCE', 'ISBN10', 'DATABAR',
+                                 'DATABAR_EXP', 'QRCODE', 'PDF417'})
+
+# GS1 mod-10 check digit, re-verified here (not every decoder checks it)
+GS1_SYMBOLOGIES = frozenset({'EAN13', 'EAN8', 'UPCA', 'ISBN13'})
+
 
 def extract_text_region(image, bounding_box):
     """
@@ -41,6 +55,206 @@ def get_contour_region(image):
     return (x, y, w, h), largest_contour
 
 
+def find_barcode_candidates(image, top_k=5, min_area_ratio=0.002, max_area_ratio=0.5):
+    """
+    Rank regions of an image by how much they look like a barcode
+    
+    Bars produce strong gradients in one direction only, so candidates are
+    scored by gradient coherence (structure tensor), fill ratio of their
+    rotated bounding box and aspect ratio, instead of simply taking the
+    largest contour (which on a waybill is usually the whole label).
+    
+    Args:
+        image: Input image (grayscale or BGR)
+        top_k: Maximum number of candidates to return
+        min_area_ratio: Ignore regions smaller than this fraction of the image
+        max_area_ratio: Ignore regions larger than this fraction of the image
+    
+    Returns:
+        List of candidate dicts sorted by descending 'score', each with
+        'bbox' (x, y, w, h), 'min_area_rect', 'contour', 'score',
+        'coherence', 'fill' and 'aspect'
+    """
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = image.shape[:2]
+    image_area = float(height * width)
+    
+    # Per-thread scratch buffers: nothing below escapes this call
+    scratch = thread_scratch()
+    shape = image.shape[:2]
+    gx = cv2.Scharr(image, cv2.CV_32F, 1, 0, dst=scratch.get('candidates.gx', shape, np.float32))
+    gy = cv2.Scharr(image, cv2.CV_32F, 0, 1, dst=scratch.get('candidates.gy', shape, np.float32))
+    
+    # High where gradients are strong in one direction (bars), low in text/flat areas
+    abs_x = cv2.convertScaleAbs(gx, dst=scratch.get('candidates.u8a', shape, np.uint8))
+    abs_y = cv2.convertScaleAbs(gy, dst=scratch.get('candidates.u8b', shape, np.uint8))
+    directional = cv2.absdiff(abs_x, abs_y, dst=scratch.get('candidates.u8c', shape, np.uint8))
+    # Close the gaps between bars for both bar orientations
+    contours = list(_bar_regions(
+        directional, (structuring_element(cv2.MORPH_RECT, (21, 7)), structuring_element(cv2.MORPH_RECT, (7, 21))),
+        abs_x, abs_y
+    ))
+    
+    # |gx| - |gy| vanishes for bars near 45 degrees; the same difference
+    # along the diagonals locates skewed codes. Thresholded on its own so
+    # axis-aligned regions come out exactly as before, and at half
+    # resolution because diagonal kernels are not separable
+    diagonal = scratch.get('candidates.f32', shape, np.float32)
+    abs_d1 = cv2.convertScaleAbs(cv2.add(gx, gy, dst=diagonal), dst=abs_x, alpha=0.7071)
+    abs_d2 = cv2.convertScaleAbs(cv2.subtract(gx, gy, dst=diagonal), dst=abs_y, alpha=0.7071)
+    directional = cv2.absdiff(abs_d1, abs_d2, dst=directional)
+    half = ((shape[0] + 1) // 2, (shape[1] + 1) // 2)
+    small = cv2.pyrDown(directional, dst=scratch.get('candidates.half_a', half, np.uint8))
+    contours += [
+        contour * 2 for contour in _bar_regions(
+            small, (_diagonal_element(9, 1, 3), _diagonal_element(9, -1, 3)),
+            scratch.get('candidates.half_b', half, np.uint8),
+            scratch.get('candidates.half_c', half, np.uint8),
+            blur=5, iterations=2
+        )
+    ]
+    
+    candidates = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area < max(100, min_area_ratio * image_area) or area > max_area_ratio * image_area:
+            continue
+        
+        rect = cv2.minAreaRect(contour)
+        rect_w, rect_h = rect[1]
+        if min(rect_w, rect_h) < 1:
+            continue
+        fill = area / (rect_w * rect_h)
+        aspect = max(rect_w, rect_h) / min(rect_w, rect_h)
+        
+        x, y, w, h = cv2.boundingRect(contour)
+        coherence = _gradient_coherence(gx[y:y+h, x:x+w], gy[y:y+h, x:x+w])
+        
+        # 1D codes are elongated; square regions (2D codes) are still possible
+        if 1.5 <= aspect <= 12:
+            aspect_score = 1.0
+        elif aspect < 1.5:
+            aspect_score = 0.6
+        else:
+            aspect_score = 0.3
+        
+        candidates.append({
+            'bbox': (x, y, w, h),
+            'min_area_rect': rect,
+            'contour': contour,
+            'score': coherence * min(fill, 1.0) * aspect_score,
+            'coherence': coherence,
+            'fill': fill,
+            'aspect': aspect,
+        })
+    
+    candidates.sort(key=lambda c: c['score'], reverse=True)
+    # A code between the axes and the diagonals can be found by both passes
+    kept = []
+    for candidate in candidates:
+        if all(_overlap_ratio(candidate['bbox'], other['bbox']) < 0.5 for other in kept):
+            kept.append(candidate)
+    return kept[:top_k]
+
+
+def _bar_regions(directional, kernels, buffer_a, buffer_b, blur=9, iterations=4):
+    """
+    Contours of bar-like regions in a directional-gradient map
+
+    Args:
+        directional: uint8 response, overwritten
+        kernels: Closing kernels bridging the gaps between bars
+        buffer_a, buffer_b: uint8 scratch arrays of the same shape
+        blur: Box filter size smoothing the response
+        iterations: Erosions (then dilations) removing thin residue
+    """
+    blurred = cv2.blur(directional, (blur, blur), dst=buffer_a)
+    _, mask = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=buffer_b)
+    closed = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernels[0], dst=directional)
+    for kernel in kernels[1:]:
+        closed = cv2.bitwise_or(closed, cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, dst=buffer_a),
+                                dst=closed)
+    closed = cv2.erode(closed, None, iterations=iterations, dst=buffer_a)
+    closed = cv2.dilate(closed, None, iterations=iterations, dst=buffer_b)
+    
+    # RETR_LIST so codes inside a label's printed border are still found
+    contours, _ = cv2.findContours(closed, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    return contours
+
+
+def _overlap_ratio(a, b):
+    """Intersection area of two (x, y, w, h) boxes over the smaller box's area"""
+    w = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    h = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    return w * h / max(1, min(a[2] * a[3], b[2] * b[3]))
+
+
+def human_readable_strips(image_shape, location, strip_ratio=0.45, margin=0.1):
+    """
+    Boxes where the human-readable text of a barcode is normally printed
+    
+    Args:
+        image_shape: Shape of the image the location refers to
+        location: (x, y, w, h) box or polygon [(x, y), ...] around the bars
+        strip_ratio: Strip thickness as a fraction of the bar height
+        margin: Horizontal margin as a fraction of the bar width
+    
+    Returns:
+        List of (x, y, w, h) strips, most likely first (below, then above;
+        right, then left for codes printed sideways)
+    """
+    if len(location) == 4 and np.isscalar(location[0]):
+        x, y, w, h = [int(v) for v in location]
+    else:
+        x, y, w, h = cv2.boundingRect(np.array(location, dtype=np.int32).reshape(-1, 1, 2))
+    height, width = image_shape[:2]
+    
+    if w >= h:
+        thickness = max(8, int(h * strip_ratio))
+        pad = int(w * margin)
+        boxes = [(x - pad, y + h, w + 2 * pad, thickness),
+                 (x - pad, y - thickness, w + 2 * pad, thickness)]
+    else:
+        thickness = max(8, int(w * strip_ratio))
+        pad = int(h * margin)
+        boxes = [(x + w, y - pad, thickness, h + 2 * pad),
+                 (x - thickness, y - pad, thickness, h + 2 * pad)]
+    
+    strips = []
+    for bx, by, bw, bh in boxes:
+        x0, y0 = max(0, bx), max(0, by)
+        x1, y1 = min(width, bx + bw), min(height, by + bh)
+        if x1 - x0 >= 8 and y1 - y0 >= 8:
+            strips.append((x0, y0, x1 - x0, y1 - y0))
+    return strips
+
+
+@lru_cache(maxsize=8)
+def _diagonal_element(size, direction, width):
+    """Cached diagonal line kernel: direction 1 runs down-right, -1 up-right"""
+    kernel = np.zeros((size, size), dtype=np.uint8)
+    start, end = ((0, 0), (size - 1, size - 1)) if direction > 0 else ((0, size - 1), (size - 1, 0))
+    cv2.line(kernel, start, end, 1, width)
+    return kernel
+
+
+def _gradient_coherence(gx, gy):
+    """
+    Structure-tensor coherence of a region: 1.0 for perfectly parallel
+    edges (bars), near 0 for isotropic texture such as text or noise
+    """
+    jxx = float(np.sum(gx * gx))
+    jyy = float(np.sum(gy * gy))
+    jxy = float(np.sum(gx * gy))
+    total = jxx + jyy
+    if total <= 0:
+        return 0.0
+    return float(np.sqrt((jxx - jyy) ** 2 + 4 * jxy ** 2) / total)
+
+
 def detect_edges(image, method='canny'):
     """
     Detect edges in image
@@ -58,9 +272,9 @@ def detect_edges(image, method='canny'):
     if method == 'canny':
         edges = cv2.Canny(image, 50, 150)
     elif method == 'sobel':
-        sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=5)
-        sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=5)
-        edges = np.sqrt(sobelx**2 + sobely**2).astype(np.uint8)
+        sobelx = cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=5)
+        sobely = cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=5)
+        edges = cv2.convertScaleAbs(cv2.magnitude(sobelx, sobely))
     else:
         raise ValueError(f"Unknown method: {method}")
     
@@ -82,6 +296,30 @@ def clean_text(text):
     return cleaned
 
 
+def best_text_line(ocr_results, min_length=6):
+    """
+    Pick the OCR fragment that most looks like a barcode string
+    
+    Args:
+        ocr_results: EasyOCR detail output [(box, text, confidence), ...]
+        min_length: Shortest acceptable cleaned string
+    
+    Returns:
+        tuple (text, confidence) or None if no fragment qualifies
+    """
+    best = None
+    best_score = 0.0
+    for _, text, confidence in ocr_results:
+        cleaned = clean_text(text)
+        if len(cleaned) < min_length:
+            continue
+        # Favour confident reads; length only counts up to a typical waybill number
+        score = confidence * min(len(cleaned) / 12.0, 1.0)
+        if score > best_score:
+            best, best_score = (cleaned, float(confidence)), score
+    return best
+
+
 def filter_numeric(text):
     """
     Filter only numeric characters
@@ -95,22 +333,73 @@ def filter_numeric(text):
     return ''.join(c for c in text if c.isdigit())
 
 
-def validate_barcode_format(barcode_content):
+def validate_barcode_format(barcode_content, symbol_type=None, patterns=None):
     """
     Validate barcode format
     
     Args:
         barcode_content: Barcode string
+        symbol_type: Decoded symbology ('CODE128', 'EAN13', ...); None or
+                     'TEXT' for OCR reads
+        patterns: Regular expressions a valid waybill number fully matches
+                  (None = any string of 8-128 digits)
     
     Returns:
         tuple (is_valid, confidence_score)
     """
-    # Check if all digits
-    if not barcode_content.replace(' ', '').isdigit():
-        return False, 0.5
+    content = ''.join(barcode_content.split())
+    if not content:
+        return False, 0.0
+    
+    if symbol_type in GS1_SYMBOLOGIES:
+        if content.isdigit() and len(content) in (8, 12, 13) and ean_checksum_ok(content):
+            return True, 1.0
+        return False, 0.0
+    if symbol_type in CHECKED_SYMBOLOGIES:
+        return True, 1.0
+    
+    if patterns is not None:
+        if any(re.fullmatch(pattern, content) for pattern in patterns):
+            return True, 1.0
+    else:
+        # Check if all digits
+        if not content.isdigit():
+            return False, 0.5
+        
+        # Check length (typical barcodes are 12-128 characters)
+        if len(content) < 8 or len(content) > 128:
+            return False, 0.6
+        
+        return True, 1.0
+    
+    # A printed EAN/UPC number carries its own check digit
+    if content.isdigit() and len(content) in (8, 12, 13) and ean_checksum_ok(content):
+        return True, 1.0
+    return False, 0.5
+
+
+def score_candidate(result, patterns=None, min_text_confidence=0.0):
+    """
+    Score one decoded result for the cascade
     
-    # Check length (typical barcodes are 12-128 characters)
-    if len(barcode_content) < 8 or len(barcode_content) > 128:
-        return False, 0.6
+    Args:
+        result: Result dict with 'data', optional 'type' and, for OCR reads,
+                'confidence'
+        patterns: Waybill-number patterns (see validate_barcode_format)
+        min_text_confidence: Lowest OCR confidence a read needs to count as
+                             validated, whatever its format
     
-    return True, 1.0
+    Returns:
+        tuple (is_valid, score): score is the format confidence, scaled by
+        the OCR confidence for text reads
+    """
+    symbol_type = result.get('type')
+    is_text = symbol_type in (None, 'TEXT')
+    is_valid, score = validate_barcode_format(
+        result.get('data') or '', None if is_text else symbol_type, patterns
+    )
+    if is_text:
+        confidence = float(result.get('confidence', 1.0))
+        score *= confidence
+        is_valid = is_valid and confidence >= min_text_confidence
+    return is_valid, score
@@ -0,0 +1,145 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Decoding pools shared by every caller, one per worker count; the threads
+# (and the per-thread zbar scanners they hold) live for the whole process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def split_tiles(width, height, tile_size=1024, overlap=256):
+    """
+    Split an image into overlapping tiles
+
+    Args:
+        width: Image width
+        height: Image height
+        tile_size: Tile side length (pixels)
+        overlap: Overlap between neighbouring tiles (pixels)
+
+    Returns:
+        List of (x, y, w, h) tiles covering the whole image
+    """
+    step = max(1, tile_size - overlap)
+    xs = _tile_starts(width, tile_size, step)
+    ys = _tile_starts(height, tile_size, step)
+    return [
+        (x, y, min(tile_size, width - x), min(tile_size, height - y))
+        for y in ys for x in xs
+    ]
+
+
+def _tile_starts(length, tile_size, step):
+    """Start offsets along one axis; the last tile is flush with the edge"""
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, step))
+    starts.append(length - tile_size)
+    return starts
+
+
+def offset_symbol(symbol, dx, dy, scale=1.0):
+    """
+    Map a decoded symbol's geometry from tile to image coordinates
+
+    Args:
+        symbol: Result dict with optional 'rect' (x, y, w, h) and 'polygon'
+        dx: Tile x offset
+        dy: Tile y offset
+        scale: Divisor applied after offsetting (e.g. full-res to decoded frame)
+
+    Returns:
+        New result dict with translated geometry
+    """
+    mapped = dict(symbol)
+    if symbol.get('rect') is not None:
+        x, y, w, h = symbol['rect']
+        mapped['rect'] = (
+            int(round((x + dx) / scale)), int(round((y + dy) / scale)),
+            int(round(w / scale)), int(round(h / scale))
+        )
+    if symbol.get('polygon') is not None:
+        mapped['polygon'] = [
+            (int(round((px + dx) / scale)), int(round((py + dy) / scale)))
+            for px, py in symbol['polygon']
+        ]
+    return mapped
+
+
+def _rects_overlap(a, b):
+    """Whether two (x, y, w, h) rectangles intersect"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def merge_symbols(symbols):
+    """
+    De-duplicate symbols decoded more than once (e.g. in tile overlaps)
+
+    Two hits are the same symbol when data and type match and their
+    rectangles intersect; identical codes at different places are kept.
+
+    Args:
+        symbols: List of result dicts
+
+    Returns:
+        De-duplicated list, first occurrence wins
+    """
+    merged = []
+    for symbol in symbols:
+        duplicate = False
+        for kept in merged:
+            if kept['data'] != symbol['data'] or kept.get('type') != symbol.get('type'):
+                continue
+            if kept.get('rect') is None or symbol.get('rect') is None \
+                    or _rects_overlap(kept['rect'], symbol['rect']):
+                duplicate = True
+                break
+        if not duplicate:
+            merged.append(symbol)
+    return merged
+
+
+def _get_pool(workers):
+    """Shared decoding pool with the given number of threads"""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tiles')
+        return pool
+
+
+def decode_tiles(image, decode_fn, tile_size=1024, overlap=256, workers=4, scale=1.0):
+    """
+    Decode an image tile by tile in parallel
+
+    pyzbar and OpenCV release the GIL while decoding, so threads scale
+    across cores without copying the image. A code no longer than the
+    overlap along either axis always lies wholly inside at least one tile;
+    longer codes may be cut at every seam and are missed.
+
+    Args:
+        image: Input image
+        decode_fn: Callable(tile) -> list of result dicts in tile coordinates
+        tile_size: Tile side length (pixels)
+        overlap: Overlap between tiles; at least the largest expected code
+        workers: Number of decoding threads (a shared, persistent pool)
+        scale: Divisor mapping image coordinates to the caller's frame
+
+    Returns:
+        De-duplicated list of result dicts in (scaled) image coordinates
+    """
+    height, width = image.shape[:2]
+    tiles = split_tiles(width, height, tile_size, overlap)
+
+    def run(tile):
+        x, y, w, h = tile
+        return [offset_symbol(s, x, y, scale) for s in decode_fn(image[y:y+h, x:x+w])]
+
+    if len(tiles) == 1 or workers <= 1:
+        per_tile = [run(tile) for tile in tiles]
+    else:
+        per_tile = list(_get_pool(workers).map(run, tiles))
+
+    return merge_symbols([s for symbols in per_tile for s in symbols])
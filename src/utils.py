@@ -1,9 +1,19 @@
 import os
+import sys
+import gc
+import ctypes
+import fnmatch
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import json
 import csv
 
+# Image file extensions picked up from directories (compared lower-case)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff')
+
 
 def get_project_root():
     """Get project root directory"""
@@ -91,6 +101,82 @@ def timestamp():
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
+def get_rss_bytes():
+    """
+    Get the resident set size of the current process
+    
+    Returns:
+        RSS in bytes, or None if it cannot be determined
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def release_memory():
+    """
+    Collect garbage and hand freed heap pages back to the OS
+    """
+    gc.collect()
+    
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    
+    # glibc keeps freed arenas mapped; malloc_trim returns them to the OS
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class BoundedExecutor:
+    """
+    Thread pool whose submit() blocks while max_pending tasks are queued or
+    running, so feeding it an endless stream of work (a watched directory,
+    a list of paths on stdin) keeps memory constant
+    """
+    
+    def __init__(self, max_workers, max_pending=None, thread_name_prefix=''):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix=thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max_workers)
+    
+    def submit(self, fn, *args, **kwargs):
+        """Submit fn(*args, **kwargs), waiting for a free slot; returns its Future"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+    
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stop accepting work; with wait=True, let the submitted tasks finish
+        cancel_futures=True drops the tasks that have not started yet
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
+        return False
+
+
 def format_barcode_output(barcode_content):
     """
     Format barcode output to required format
@@ -104,6 +190,71 @@ def format_barcode_output(barcode_content):
     return f"b'{barcode_content}'"
 
 
+def _pattern_matcher(patterns):
+    """One case-insensitive regex for a list of glob patterns (None if there are none)"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns), re.IGNORECASE)
+
+
+def iter_image_files(directory_path, extensions=None, recursive=True, include=None, exclude=None,
+                     sort=False, follow_symlinks=False):
+    """
+    Yield image file paths under a directory as they are found
+    
+    Each directory is read once with os.scandir (no per-extension globbing,
+    no stat call for most entries), so callers can start processing while
+    discovery continues. Unreadable directories are skipped.
+    
+    Args:
+        directory_path: Path to directory
+        extensions: File extensions, matched case-insensitively (default IMAGE_EXTENSIONS)
+        recursive: Descend into subdirectories
+        include: Glob patterns (case-insensitive); a file is kept only if its
+                 name or its path relative to directory_path matches one (None = every image)
+        exclude: Glob patterns for files, and for directories not to descend into
+        sort: Yield each directory's files in name order, before its subdirectories
+              (also in name order)
+        follow_symlinks: Descend into symlinked directories (beware of loops)
+    
+    Yields:
+        File paths (str)
+    """
+    extensions = tuple(ext.lower() for ext in (extensions or IMAGE_EXTENSIONS))
+    included = _pattern_matcher(include)
+    excluded = _pattern_matcher(exclude)
+    root = os.path.join(str(directory_path), '')
+    
+    def matches(matcher, entry):
+        return matcher.match(entry.name) or matcher.match(entry.path[len(root):])
+    
+    stack = [root]
+    while stack:
+        subdirectories = []
+        try:
+            with os.scandir(stack.pop()) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name) if sort else scanner
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if recursive and not (excluded and matches(excluded, entry)):
+                            subdirectories.append(entry.path)
+                        continue
+                    if not entry.name.lower().endswith(extensions):
+                        continue
+                    if included and not matches(included, entry):
+                        continue
+                    if excluded and matches(excluded, entry):
+                        continue
+                    yield entry.path
+        except OSError:
+            continue
+        stack.extend(reversed(subdirectories))
+
+
 def get_image_files(directory_path, extensions=None):
     """
     Get all image files from directory
@@ -113,17 +264,6 @@ def get_image_files(directory_path, extensions=None):
         extensions: List of file extensions (e.g., ['.jpg', '.png'])
     
     Returns:
-        List of image file paths
+        Sorted list of image file paths (not recursive; see iter_image_files)
     """
-    if extensions is None:
-        extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff']
-    
-    if not os.path.exists(directory_path):
-        return []
-    
-    image_files = []
-    for ext in extensions:
-        image_files.extend(Path(directory_path).glob(f'*{ext}'))
-        image_files.extend(Path(directory_path).glob(f'*{ext.upper()}'))
-    
-    return sorted(list(set(image_files)))
+    return sorted(Path(path) for path in iter_image_files(directory_path, extensions, recursive=False))
@@ -0,0 +1,283 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+import time
+
+from utils import IMAGE_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+
+class Inotify:
+    """
+    Minimal inotify binding through ctypes (Linux only)
+
+    Raises:
+        OSError: If inotify is not available or the directory cannot be watched
+    """
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+
+    # struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self, directory):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify not available: {e}") from e
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+
+    def read(self, timeout):
+        """Names of the files created, written or moved in within timeout seconds"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, _, _, length = self._EVENT.unpack_from(data, offset)
+            start = offset + self._EVENT.size
+            name = data[start:start + length].rstrip(b'\0')
+            offset = start + length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Ledger:
+    """
+    Append-only record of processed files, one 'size<TAB>mtime_ns<TAB>path'
+    line each; a restart skips files whose size and mtime are unchanged
+
+    Only files still on disk are kept in memory: entries for removed files
+    are dropped on load and, while watching, through forget. Once the file
+    holds more dead lines (removed files, older versions) than live ones it
+    is rewritten with the live entries only.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._done = {}
+        self._lock = threading.Lock()
+        # Lines in the file that no longer describe a live entry
+        self._stale = 0
+        lines = 0
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    lines += 1
+                    parts = line.rstrip('\n').split('\t', 2)
+                    # A torn last line from a crash is ignored
+                    if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+                        self._done[parts[2]] = (int(parts[0]), int(parts[1]))
+            self._done = {p: version for p, version in self._done.items() if os.path.exists(p)}
+            self._stale = lines - len(self._done)
+        self._file = open(path, 'a', encoding='utf-8')
+        with self._lock:
+            self._compact_if_stale()
+
+    def contains(self, path, stat):
+        """Whether this version of the file has been processed"""
+        return self._done.get(path) == (stat.st_size, stat.st_mtime_ns)
+
+    def record(self, path, stat):
+        """Mark a file processed; flushed at once so a crash loses nothing"""
+        with self._lock:
+            self._file.write(f"{stat.st_size}\t{stat.st_mtime_ns}\t{path}\n")
+            self._file.flush()
+            if path in self._done:
+                self._stale += 1
+            self._done[path] = (stat.st_size, stat.st_mtime_ns)
+            self._compact_if_stale()
+
+    def forget(self, path):
+        """Drop a removed file; its line goes at the next compaction"""
+        with self._lock:
+            if self._done.pop(path, None) is not None:
+                self._stale += 1
+                self._compact_if_stale()
+
+    def _compact_if_stale(self):
+        """
+        Rewrite the file with the live entries once dead lines outnumber
+        them (the caller holds the lock). Never down to nothing: a share
+        that is not mounted makes every file look removed
+        """
+        if not self._done or self._stale <= len(self._done):
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            for path, (size, mtime_ns) in self._done.items():
+                f.write(f"{size}\t{mtime_ns}\t{path}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        # Atomic: a crash leaves either the old file or the new one
+        os.replace(temporary, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._stale = 0
+
+    def close(self):
+        self._file.close()
+
+
+class DirectoryWatcher:
+    """
+    Yield the image files that appear in a directory once they are complete
+
+    Files already present are picked up on the first scan. A file is ready
+    when its size and modification time have not changed for settle_seconds,
+    so files still being copied in are left alone. inotify wakes the watcher
+    as soon as a file is written (with a slow safety rescan); without it the
+    directory is polled.
+
+    What the watcher remembers is bounded by the directory's contents: a
+    file missing from a scan is forgotten (and passed to forget), so a
+    drop folder whose files are moved out does not grow its memory.
+    """
+
+    def __init__(self, directory, extensions=None, settle_seconds=2.0, poll_interval=2.0,
+                 rescan_interval=60.0, use_inotify=True, skip=None, forget=None):
+        """
+        Args:
+            directory: Directory to watch (not recursive)
+            extensions: File extensions to pick up (default IMAGE_EXTENSIONS)
+            settle_seconds: Quiet time before a file counts as complete
+            poll_interval: Seconds between scans when polling
+            rescan_interval: Seconds between safety rescans with inotify
+            use_inotify: Try inotify before falling back to polling
+            skip: Optional callable(path, stat) -> True for files already
+                  processed (e.g. Ledger.contains)
+            forget: Optional callable(path) for files that have left the
+                    directory (e.g. Ledger.forget)
+        """
+        self.directory = directory
+        self.extensions = tuple(ext.lower() for ext in (extensions or IMAGE_EXTENSIONS))
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.use_inotify = use_inotify
+        self.skip = skip
+        self.forget = forget
+        self.mode = None
+        # path -> (size, mtime_ns) of the files yielded and still present
+        self._yielded = {}
+        # Image files found by the last full scan
+        self._seen = set()
+
+    def watch(self, stop=None):
+        """
+        Watch until stop (a threading.Event) is set
+
+        Yields:
+            tuple (path, os.stat_result) of each settled file, once per version
+        """
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = Inotify(self.directory)
+            except OSError:
+                inotify = None
+        self.mode = 'inotify' if inotify else 'polling'
+        scan_interval = self.rescan_interval if inotify else self.poll_interval
+        pending = {}
+        next_scan = time.monotonic()
+        try:
+            while stop is None or not stop.is_set():
+                now = time.monotonic()
+                if now >= next_scan:
+                    try:
+                        self._scan(pending, now)
+                        next_scan = now + scan_interval
+                    except OSError as e:
+                        # A network share can vanish for a while (unmounted,
+                        # ESTALE): keep watching and rescan soon
+                        logger.warning("Scan of %s failed, retrying: %s", self.directory, e)
+                        next_scan = now + self.poll_interval
+
+                yield from self._settled(pending)
+
+                wait = min(self.poll_interval, self.settle_seconds) if pending else self.poll_interval
+                if inotify is not None:
+                    for name in inotify.read(wait):
+                        self._consider(os.path.join(self.directory, name), pending, time.monotonic())
+                elif stop is not None:
+                    stop.wait(wait)
+                else:
+                    time.sleep(wait)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _scan(self, pending, now):
+        """List the directory, consider every file and forget the missing ones"""
+        seen = set()
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.path.lower().endswith(self.extensions):
+                    seen.add(entry.path)
+                self._consider(entry.path, pending, now)
+        # An unmounted share shows up as an empty mount point: an empty
+        # listing only counts once it has files again
+        if seen:
+            self._drop_missing(seen)
+
+    def _drop_missing(self, seen):
+        """Forget the files that are no longer in the directory"""
+        for path in (self._seen | self._yielded.keys()) - seen:
+            self._yielded.pop(path, None)
+            if self.forget is not None:
+                self.forget(path)
+        self._seen = seen
+
+    def _consider(self, path, pending, now):
+        """Start watching a file that may be new"""
+        if path in pending or not path.lower().endswith(self.extensions):
+            return
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        if self._yielded.get(path) == (stat.st_size, stat.st_mtime_ns):
+            return
+        if self.skip is not None and self.skip(path, stat):
+            return
+        pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+
+    def _settled(self, pending):
+        """Yield the pending files whose size and mtime have stopped changing"""
+        now = time.monotonic()
+        for path, (size, mtime_ns, since) in list(pending.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                pending[path] = (stat.st_size, stat.st_mtime_ns, now)
+            elif stat.st_size > 0 and now - since >= self.settle_seconds:
+                del pending[path]
+                self._yielded[path] = (size, mtime_ns)
+                yield path, stat
@@ -0,0 +1,84 @@
+from ctypes import c_void_p
+
+import numpy as np
+from pyzbar.pyzbar import ZBarSymbol, _decode_symbols, _symbols_for_image
+from pyzbar.pyzbar_error import PyZbarError
+from pyzbar.wrapper import (
+    ZBarConfig,
+    zbar_image_create, zbar_image_destroy, zbar_image_set_data,
+    zbar_image_set_format, zbar_image_set_size,
+    zbar_image_scanner_create, zbar_image_scanner_destroy,
+    zbar_image_scanner_set_config, zbar_scan_image,
+)
+
+# zbar's fourcc for 8-bit grayscale ('Y800')
+Y800_FOURCC = 808466521
+
+
+class ZBarScanner:
+    """
+    A configured zbar image scanner reused across scans
+
+    pyzbar.decode() creates and configures a new scanner and copies the
+    pixels into a bytes object on every call. This keeps one scanner and
+    hands zbar the NumPy buffer directly. zbar scanners are not thread
+    safe: keep one instance per thread.
+    """
+
+    def __init__(self, symbols=None):
+        """
+        Args:
+            symbols: ZBarSymbol values to decode (None = every symbology)
+        """
+        self._scanner = zbar_image_scanner_create()
+        if not self._scanner:
+            raise PyZbarError('Could not create image scanner')
+        if symbols:
+            # Same configuration pyzbar applies per call, done once
+            for symbol in set(ZBarSymbol).difference(symbols):
+                zbar_image_scanner_set_config(self._scanner, symbol, ZBarConfig.CFG_ENABLE, 0)
+            for symbol in symbols:
+                zbar_image_scanner_set_config(self._scanner, symbol, ZBarConfig.CFG_ENABLE, 1)
+
+    def scan(self, gray):
+        """
+        Scan a grayscale image
+
+        Args:
+            gray: 2D uint8 array; C-contiguous arrays are passed without a
+                  copy, strided views (tiles, crops) are compacted once
+
+        Returns:
+            List of pyzbar Decoded tuples
+        """
+        if gray.ndim != 2 or gray.dtype != np.uint8:
+            raise ValueError("ZBarScanner.scan expects a 2D uint8 grayscale image")
+        gray = np.ascontiguousarray(gray)
+        height, width = gray.shape
+
+        image = zbar_image_create()
+        if not image:
+            raise PyZbarError('Could not create zbar image')
+        try:
+            zbar_image_set_format(image, Y800_FOURCC)
+            zbar_image_set_size(image, width, height)
+            # No cleanup handler: the array outlives the zbar image
+            zbar_image_set_data(image, c_void_p(gray.ctypes.data), gray.nbytes, None)
+            if zbar_scan_image(self._scanner, image) < 0:
+                raise PyZbarError('Unsupported image format')
+            return list(_decode_symbols(_symbols_for_image(image)))
+        finally:
+            zbar_image_destroy(image)
+
+    def close(self):
+        """Destroy the zbar scanner"""
+        if self._scanner:
+            zbar_image_scanner_destroy(self._scanner)
+            self._scanner = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            # Interpreter shutdown may already have torn down the library
+            pass
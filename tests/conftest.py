@@ -0,0 +1,76 @@
+"""
+Shared test setup: import paths and a BarcodeDetector factory
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import ocr_engine
+from backends import create_backends
+from ocr_engine import BarcodeDetector
+
+
+@pytest.fixture
+def no_easyocr(monkeypatch):
+    """Run without EasyOCR so no test loads the model"""
+    monkeypatch.setattr(ocr_engine, 'EASYOCR_AVAILABLE', False)
+
+
+@pytest.fixture
+def make_detector(no_easyocr):
+    """
+    Factory for BarcodeDetectors with EasyOCR disabled
+
+    Args (of the returned callable):
+        profile: Cascade profile (None = DETECTION_CONFIG['profile'])
+        methods: Cascade methods to run (None = the profile's)
+        quality: Keep the quality gate as configured (False = off)
+        **image_config: IMAGE_CONFIG overrides
+    """
+    def make(profile=None, methods=None, quality=True, **image_config):
+        detector = BarcodeDetector(profile)
+        if methods is not None:
+            detector.methods = methods
+            detector.backends = create_backends([m for m in methods if m != 'morphology'], detector)
+        if not quality:
+            detector.quality_config = dict(detector.quality_config, enabled=False)
+        if image_config:
+            detector.image_config = dict(detector.image_config, **image_config)
+        return detector
+
+    return make
+
+
+class FakeReader:
+    """Stands in for easyocr.Reader: readtext answers through a callable"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = []
+
+    def readtext(self, image, **kwargs):
+        self.calls.append((image.shape, kwargs))
+        return self.answer(image)
+
+
+@pytest.fixture
+def fake_reader(monkeypatch):
+    """
+    Attach a FakeReader to a detector
+
+    Args (of the returned callable):
+        detector: BarcodeDetector whose _get_reader returns the fake
+        answer: Callable(image) -> EasyOCR detail output [(box, text, confidence), ...]
+    """
+    def attach(detector, answer):
+        reader = FakeReader(answer)
+        monkeypatch.setattr(detector, '_get_reader', lambda: reader)
+        return reader
+
+    return attach
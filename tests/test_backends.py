@@ -0,0 +1,103 @@
+"""
+Tests for the decoder backend registry
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from backends import BACKENDS, create_backends
+from scanline import encode_code128, encode_ean13, render_modules
+
+
+def _qr_label(text):
+    """A QR code from OpenCV's encoder on a white page"""
+    qr = cv2.QRCodeEncoder.create().encode(text)
+    qr = cv2.resize(qr, None, fx=8, fy=8, interpolation=cv2.INTER_NEAREST)
+    page = np.full((700, 900), 255, dtype=np.uint8)
+    page[100:100 + qr.shape[0], 150:150 + qr.shape[1]] = qr
+    return page
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match='nosuch'):
+        create_backends(['pyzbar', 'nosuch'])
+
+
+def test_backends_declare_kind_and_cost():
+    for name, cls in BACKENDS.items():
+        assert cls.name == name
+        assert cls.kind in ('symbol', 'text')
+        assert cls.cost > 0
+
+
+def test_cascade_reports_backend_method(tmp_path, make_detector):
+    """The first backend that decodes is reported as the method"""
+    path = str(tmp_path / 'qr.png')
+    cv2.imwrite(path, _qr_label('MRX12345678901'))
+    detector = make_detector(methods=['scanline', 'opencv_qr'])
+
+    result = detector.extract_barcode(path)
+
+    assert result['success']
+    assert result['barcode_content'] == 'MRX12345678901'
+    assert result['method'] == 'opencv_qr'
+
+
+def test_region_backend_maps_geometry_to_frame(make_detector):
+    """Scanline hits on candidate crops come back in frame coordinates"""
+    page = np.full((700, 900), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128('R1234567890'), module_px=2, height=100, quiet_modules=0)
+    page[300:400, 250:250 + bars.shape[1]] = bars
+    detector = make_detector(methods=['scanline'])
+
+    results, _ = detector.detect_with_backend('scanline', image=page)
+
+    x, y, w, h = results[0]['rect']
+    assert results[0]['data'] == 'R1234567890'
+    assert abs(x - 250) <= 4 and 300 <= y < 400 and abs(w - bars.shape[1]) <= 8
+
+
+def test_profile_symbologies_reach_backends():
+    """The allowlist becomes zbar symbols and disables decoders that cannot match"""
+    backends = create_backends(['pyzbar', 'opencv_barcode', 'opencv_qr', 'scanline'],
+                               symbologies=['code128', 'QRCODE'])
+
+    assert [symbol.name for symbol in backends['pyzbar'].zbar_symbols] == ['CODE128', 'QRCODE']
+    assert not backends['opencv_barcode'].enabled()
+    assert backends['opencv_qr'].enabled()
+    assert backends['scanline'].wanted() == {'CODE128'}
+
+
+def test_unknown_symbology_is_rejected():
+    with pytest.raises(ValueError, match='CODE129'):
+        create_backends(['pyzbar'], symbologies=['CODE129'])
+
+
+def test_profile_skips_other_symbologies(make_detector):
+    """An EAN-13 symbol is ignored by the production profile but read by default"""
+    page = np.full((700, 900), 255, dtype=np.uint8)
+    bars = render_modules(encode_ean13('590123412345'), module_px=3, height=120, quiet_modules=0)
+    page[300:420, 250:250 + bars.shape[1]] = bars
+
+    production = make_detector(profile='production')
+    default = make_detector()
+
+    assert production.detect_with_backend('scanline', image=page)[0] is None
+    assert default.detect_with_backend('scanline', image=page)[0][0]['data'] == '5901234123457'
+    assert default.backends['opencv_barcode'].enabled()
+
+
+def test_persistent_scanner_matches_pyzbar():
+    """The reused scanner decodes frames and strided tiles exactly like pyzbar.decode"""
+    from pyzbar.pyzbar import decode
+    from zbar_scanner import ZBarScanner
+
+    page = np.full((400, 700), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128('MRX12345678901'), module_px=2, height=100, quiet_modules=0)
+    page[150:250, 100:100 + bars.shape[1]] = bars
+    scanner = ZBarScanner()
+
+    for image in (page, page[50:350, 50:650], page):
+        expected = [(b.data, b.type, tuple(b.rect)) for b in decode(image)]
+        assert [(b.data, b.type, tuple(b.rect)) for b in scanner.scan(image)] == expected
@@ -0,0 +1,51 @@
+"""
+Tests for the multi-result API (every barcode in an image with geometry)
+"""
+
+import cv2
+import numpy as np
+
+from scanline import encode_code128, render_modules
+from tiling import merge_symbols
+
+
+def _sheet():
+    """Two labels: one straight code and one rotated by 30 degrees"""
+    page = np.full((900, 1400), 255, dtype=np.uint8)
+    straight = render_modules(encode_code128('M00968463036'), module_px=2, height=110, quiet_modules=0)
+    page[100:210, 100:100 + straight.shape[1]] = straight
+
+    tile = np.full((500, 600), 255, dtype=np.uint8)
+    skewed = render_modules(encode_code128('234095357601330'), module_px=2, height=110, quiet_modules=0)
+    tile[195:305, 300 - skewed.shape[1] // 2:300 - skewed.shape[1] // 2 + skewed.shape[1]] = skewed
+    matrix = cv2.getRotationMatrix2D((300, 250), 30, 1.0)
+    page[350:850, 700:1300] = cv2.warpAffine(tile, matrix, (600, 500), borderValue=255)
+    return page
+
+
+def test_every_barcode_is_returned_once_with_geometry(tmp_path, make_detector):
+    path = str(tmp_path / 'sheet.png')
+    cv2.imwrite(path, _sheet())
+    detector = make_detector()
+
+    result = detector.extract_barcodes(path)
+
+    assert result['success']
+    found = {barcode['data']: barcode for barcode in result['barcodes']}
+    assert sorted(found) == ['234095357601330', 'M00968463036']
+    assert len(result['barcodes']) == 2
+
+    straight, skewed = found['M00968463036'], found['234095357601330']
+    assert straight['type'] == 'CODE128' and straight['validated']
+    assert abs(straight['angle']) <= 2 and 80 <= straight['rect'][0] <= 110
+    assert abs(skewed['angle'] - 30) <= 3
+    x, y, w, h = skewed['rect']
+    assert 700 <= x and x + w <= 1300 and 350 <= y and y + h <= 850
+
+
+def test_repeated_hits_of_one_symbol_are_merged():
+    hit = {'data': 'M00968463036', 'type': 'CODE128', 'rect': (100, 100, 300, 110)}
+    moved = dict(hit, rect=(104, 98, 296, 112))
+    elsewhere = dict(hit, rect=(600, 600, 300, 110))
+
+    assert merge_symbols([hit, moved, elsewhere]) == [hit, elsewhere]
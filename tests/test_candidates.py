@@ -0,0 +1,88 @@
+"""
+Tests for barcode candidate ranking in the morphology stage
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from config import get_config
+from scanline import encode_code128, render_modules
+from text_extraction import find_barcode_candidates, score_candidate
+
+BARS = render_modules(encode_code128('M00968463036'), module_px=2, height=110, quiet_modules=0)
+
+
+def _label():
+    """Address text above a barcode, as on a waybill"""
+    page = np.full((800, 1200), 255, dtype=np.uint8)
+    page[500:610, 600:600 + BARS.shape[1]] = BARS
+    for line in range(5):
+        cv2.putText(page, 'SHIP TO 221B BAKER STREET LONDON', (60, 80 + line * 50),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    return page
+
+
+def _rotated(angle):
+    """The barcode alone, rotated about the page centre"""
+    page = np.full((800, 1200), 255, dtype=np.uint8)
+    x = 600 - BARS.shape[1] // 2
+    page[345:455, x:x + BARS.shape[1]] = BARS
+    matrix = cv2.getRotationMatrix2D((600, 400), angle, 1.0)
+    return cv2.warpAffine(page, matrix, (1200, 800), borderValue=255)
+
+
+def test_bars_outrank_text():
+    candidates = find_barcode_candidates(_label(), top_k=5)
+
+    best = candidates[0]
+    x, y, w, h = best['bbox']
+    assert abs(x - 600) <= 4 and abs(y - 500) <= 4 and abs(w - BARS.shape[1]) <= 8
+    assert best['coherence'] > 0.9 and best['fill'] > 0.9
+    # Text lines are found too, but their gradients point every way
+    assert all(other['coherence'] < 0.6 and other['score'] < best['score'] / 2
+               for other in candidates[1:])
+    assert [c['score'] for c in candidates] == sorted((c['score'] for c in candidates), reverse=True)
+
+
+def test_top_k_limits_the_candidates():
+    assert len(find_barcode_candidates(_label(), top_k=2)) == 2
+
+
+@pytest.mark.parametrize('angle', [45, -40, 20])
+def test_rotated_bars_are_found_by_the_diagonal_pass(angle):
+    best = find_barcode_candidates(_rotated(angle))[0]
+
+    (cx, cy), (w, h), _ = best['min_area_rect']
+    assert abs(cx - 600) <= 6 and abs(cy - 400) <= 6
+    assert abs(max(w, h) - BARS.shape[1]) <= 12 and abs(min(w, h) - 110) <= 12
+    assert best['score'] > 0.8
+
+
+def test_scratch_buffers_do_not_leak_between_calls():
+    """Results do not depend on what the per-thread buffers held before"""
+    label = _label()
+    first = find_barcode_candidates(label)
+    find_barcode_candidates(_rotated(45))
+    find_barcode_candidates(np.full((300, 500), 255, dtype=np.uint8))
+
+    again = find_barcode_candidates(label)
+    assert [c['bbox'] for c in again] == [c['bbox'] for c in first]
+    assert [c['score'] for c in again] == pytest.approx([c['score'] for c in first])
+
+
+def test_decoded_reads_rank_by_checksum_format_and_confidence():
+    patterns = get_config('validation')['patterns']
+    reads = [
+        {'data': 'SHIPTO', 'type': 'TEXT', 'confidence': 0.99},
+        {'data': 'M00968463036', 'type': 'TEXT', 'confidence': 0.7},
+        {'data': 'M00968463036', 'type': 'TEXT', 'confidence': 0.9},
+        {'data': '4006381333931', 'type': 'EAN13'},
+        {'data': '4006381333932', 'type': 'EAN13'},
+    ]
+
+    ranked = sorted(reads, key=lambda read: score_candidate(read, patterns), reverse=True)
+
+    assert ranked[0] == reads[3]
+    assert ranked[1:3] == [reads[2], reads[1]]
+    assert ranked[-1] == reads[4]
@@ -0,0 +1,88 @@
+"""
+Tests for the paths-in, JSON-lines-out CLI mode
+"""
+
+import io
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+import main
+
+
+class SlowFirstDetector:
+    """Stands in for BarcodeDetector: the first path takes longest"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def extract_barcode(self, path):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.3 if path == 'p0' else 0.01)
+        with self.lock:
+            self.active -= 1
+        return {'success': True, 'barcode_content': path.upper(), 'method': 'test', 'message': 'ok'}
+
+
+def _run(monkeypatch, ordered):
+    paths = (f'p{i}' for i in range(40))
+    out = io.StringIO()
+    monkeypatch.setattr(sys, 'stdout', out)
+    detector = SlowFirstDetector()
+    main.run_jsonl(paths, ordered=ordered, detector=detector)
+    return [json.loads(line)['path'] for line in out.getvalue().splitlines()], detector
+
+
+def test_ordered_output_follows_input(monkeypatch):
+    written, detector = _run(monkeypatch, ordered=True)
+
+    assert written == [f'p{i}' for i in range(40)]
+    assert detector.peak <= main.get_config('batch')['workers']
+
+
+def test_unordered_output_does_not_wait_for_slow_images(monkeypatch):
+    written, _ = _run(monkeypatch, ordered=False)
+
+    assert sorted(written) == sorted(f'p{i}' for i in range(40))
+    assert written[0] != 'p0'
+
+
+def test_manifest_skips_blank_lines_and_comments(tmp_path):
+    manifest = tmp_path / 'paths.txt'
+    manifest.write_text('a.jpg\n\n# scanned 2024-05-01\nb c.png\r\n')
+
+    assert list(main.read_manifest(str(manifest))) == ['a.jpg', 'b c.png']
+
+
+class ClosedPipe(io.StringIO):
+    """stdout of a pipe whose reader has exited (e.g. '| head -0')"""
+
+    def write(self, text):
+        raise BrokenPipeError(32, 'Broken pipe')
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_closed_stdout_stops_the_run_quietly(monkeypatch, capsys, ordered):
+    consumed = []
+
+    def paths():
+        for i in range(1000):
+            consumed.append(i)
+            yield f'p{i}'
+
+    monkeypatch.setattr(sys, 'stdout', ClosedPipe())
+    detector = SlowFirstDetector()
+
+    main.run_jsonl(paths(), ordered=ordered, detector=detector)
+
+    # The first failed write ends the run: no more paths are read and the
+    # queued ones are dropped, not decoded
+    assert len(consumed) <= main.get_config('batch')['max_pending'] + 1
+    assert 'Traceback' not in capsys.readouterr().err
@@ -0,0 +1,111 @@
+"""
+Tests for reduced decoding within the IMAGE_CONFIG size caps
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from scanline import encode_code128, render_modules
+
+TEXT = 'M00968463036'
+
+
+@pytest.mark.parametrize('size, reduction', [
+    ((2000, 2000), 1),
+    ((3999, 3000), 1),
+    ((4000, 3000), 2),
+    ((3000, 4000), 2),
+    ((7999, 1000), 2),
+    ((8000, 6000), 4),
+    ((16000, 12000), 8),
+    ((40000, 30000), 8),
+    (None, 1),
+])
+def test_largest_reduction_that_stays_within_the_caps(make_detector, size, reduction):
+    detector = make_detector(max_width=2000, max_height=2000)
+
+    assert detector._choose_reduction(size) == reduction
+
+
+def test_reduction_can_be_turned_off(make_detector):
+    detector = make_detector(reduced_decode=False)
+
+    assert detector._choose_reduction((16000, 12000)) == 1
+
+
+def test_reduced_decode_is_area_resized_to_the_caps(tmp_path, make_detector):
+    path = str(tmp_path / 'scan.jpg')
+    cv2.imwrite(path, np.full((3000, 5000), 200, dtype=np.uint8))
+    detector = make_detector(max_width=2000, max_height=2000)
+
+    image, scale = detector._decode_image(path)
+
+    assert detector.metrics['last_decode']['reduction'] == 2
+    assert image.shape == (1200, 2000) and image.ndim == 2
+    assert scale == pytest.approx(2.5)
+
+
+def test_small_crops_are_reread_at_full_resolution(tmp_path, make_detector):
+    page = np.random.default_rng(0).integers(0, 255, (3000, 4000), dtype=np.uint8)
+    path = str(tmp_path / 'scan.png')
+    cv2.imwrite(path, page)
+    detector = make_detector(max_width=2000, max_height=2000, min_crop_side=200)
+    image, scale = detector._decode_image(path)
+    detector._local.source = {'path': path, 'image': image, 'scale': scale}
+    try:
+        small = detector._crop_roi(image, (100, 150, 50, 40))
+        large = detector._crop_roi(image, (100, 150, 300, 250))
+    finally:
+        detector._local.source = None
+
+    np.testing.assert_array_equal(small, page[300:380, 200:300])
+    assert large.shape == (250, 300)
+    # Without a reduced source there is nothing to re-read
+    assert detector._crop_roi(image, (100, 150, 50, 40)).shape == (40, 50)
+
+
+@pytest.mark.parametrize('image_config, reread', [
+    ({'max_pixels': 10_000_000, 'oversize_policy': 'downscale'}, False),
+    ({'max_pixels': 10_000_000, 'oversize_policy': 'tile'}, True),
+    ({'max_pixels': 10_000_000, 'max_decode_mb': 4}, False),
+    ({}, True),
+])
+def test_full_resolution_rereads_keep_to_the_budget(tmp_path, make_detector, image_config, reread):
+    """Crop and label re-reads follow the same budget as the full-resolution pass"""
+    page = np.random.default_rng(0).integers(0, 255, (3000, 4000), dtype=np.uint8)
+    path = str(tmp_path / 'scan.jpg')
+    cv2.imwrite(path, page)
+    # 12 MP JPEG: over the pixel budget above, ~11 MB to decode natively
+    # but only ~3 MB at the 1/2 reduction
+    detector = make_detector(max_width=2000, max_height=2000, **{'max_pixels': None, **image_config})
+    image, scale = detector._decode_image(path)
+    detector._local.source = {'path': path, 'image': image, 'scale': scale}
+    try:
+        crop = detector._crop_roi(image, (100, 150, 50, 40))
+        passed, msg = detector.detect_barcode_full_resolution()
+    finally:
+        detector._local.source = None
+    label, = detector._label_crops(path, image, scale, [(100, 150, 500, 400)])
+
+    assert crop.shape == ((80, 100) if reread else (40, 50))
+    assert label.shape == ((800, 1000) if reread else (400, 500))
+    assert msg.startswith('Full-resolution pass skipped') != reread
+
+
+def test_geometry_is_reported_in_original_pixels(tmp_path, make_detector):
+    page = np.full((3000, 4400), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128(TEXT), module_px=4, height=220, quiet_modules=0)
+    page[1200:1420, 1000:1000 + bars.shape[1]] = bars
+    path = str(tmp_path / 'scan.png')
+    cv2.imwrite(path, page)
+    detector = make_detector(max_width=2000, max_height=2000)
+
+    result = detector.extract_barcodes(path)
+
+    assert detector.metrics['last_decode']['reduction'] == 2
+    barcode, = result['barcodes']
+    x, y, w, h = barcode['rect']
+    assert barcode['data'] == TEXT
+    assert abs(x - 1000) <= 12 and 1200 - 12 <= y and y + h <= 1420 + 12
+    assert abs(w - bars.shape[1]) <= 24
@@ -0,0 +1,70 @@
+"""
+Tests for the single-line fast EasyOCR mode
+"""
+
+import numpy as np
+
+from text_extraction import best_text_line
+
+BOX = ([0, 0], [10, 0], [10, 10], [0, 10])
+IMAGE = np.full((200, 600), 255, dtype=np.uint8)
+
+
+def test_best_line_favours_confident_barcode_length_reads():
+    results = [
+        (BOX, 'SHIP TO', 0.99),
+        (BOX, 'M0096 8463036', 0.8),
+        (BOX, 'M00968463036', 0.6),
+        (BOX, 'ABC', 1.0),
+    ]
+
+    assert best_text_line(results) == ('M00968463036', 0.8)
+    # Length stops counting at a typical waybill number
+    assert best_text_line([(BOX, '1234567890123456789', 0.7), (BOX, '123456789012', 0.75)]) \
+        == ('123456789012', 0.75)
+
+
+def test_no_line_qualifies():
+    assert best_text_line([(BOX, 'SHIP', 0.99), (BOX, '12 3', 0.9)]) is None
+    assert best_text_line([]) is None
+    assert best_text_line([(BOX, 'SHIPTO', 0.9)], min_length=8) is None
+
+
+def test_fast_mode_reads_one_restricted_line(make_detector, fake_reader):
+    detector = make_detector()
+    reader = fake_reader(detector, lambda image: [(BOX, 'SHIP TO', 0.99), (BOX, 'M00968463036', 0.9)])
+
+    results = detector._backend('easyocr').decode(IMAGE)
+
+    assert results == [{'data': 'M00968463036', 'type': 'TEXT', 'method': 'easyocr', 'confidence': 0.9}]
+    fast = detector.easyocr_config['fast_mode']
+    (_, kwargs), = reader.calls
+    assert kwargs == {
+        'allowlist': detector.easyocr_config['allowlist'],
+        'decoder': fast['decoder'],
+        'paragraph': False,
+        'canvas_size': fast['canvas_size'],
+        'mag_ratio': fast['mag_ratio'],
+        'text_threshold': fast['text_threshold'],
+        'low_text': fast['low_text'],
+    }
+
+
+def test_fast_mode_without_a_line_returns_nothing(make_detector, fake_reader):
+    detector = make_detector()
+    fake_reader(detector, lambda image: [(BOX, 'SHIP', 0.99)])
+
+    assert detector._backend('easyocr').decode(IMAGE) == []
+
+
+def test_full_read_when_fast_mode_is_off(make_detector, fake_reader):
+    detector = make_detector()
+    backend = detector._backend('easyocr')
+    backend.config = dict(backend.config, fast_mode=dict(backend.config['fast_mode'], enabled=False))
+    reader = fake_reader(detector, lambda image: [(BOX, 'M0096', 0.9), (BOX, '8463036', 0.8)])
+
+    results = backend.decode(IMAGE)
+
+    assert results == [{'data': 'M00968463036', 'type': 'TEXT', 'method': 'easyocr'}]
+    # Library defaults: whole page, every character
+    assert reader.calls == [(IMAGE.shape, {})]
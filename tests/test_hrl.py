@@ -0,0 +1,103 @@
+"""
+Tests for OCR of the human-readable line next to a located barcode
+"""
+
+import numpy as np
+
+from scanline import encode_code128, encode_ean13, render_modules
+from text_extraction import human_readable_strips
+
+BOX = [([0, 0], [10, 0], [10, 10], [0, 10])]
+
+
+def _read(text, confidence=0.9):
+    return [(BOX[0], text, confidence)]
+
+
+def test_strips_sit_below_then_above_horizontal_bars():
+    strips = human_readable_strips((1000, 1000), (100, 200, 300, 100), strip_ratio=0.45, margin=0.1)
+
+    assert strips == [(70, 300, 360, 45), (70, 155, 360, 45)]
+
+
+def test_strips_sit_right_then_left_of_vertical_bars():
+    strips = human_readable_strips((1000, 1000), (400, 100, 80, 300), strip_ratio=0.45, margin=0.1)
+
+    assert strips == [(480, 70, 36, 360), (364, 70, 36, 360)]
+
+
+def test_strips_are_clipped_to_the_image_and_polygons_are_accepted():
+    polygon = [(100, 0), (399, 0), (399, 99), (100, 99)]
+
+    # No room above the bars; the strip below is cut at the bottom edge
+    assert human_readable_strips((130, 1000), polygon) == [(70, 100, 360, 30)]
+    assert human_readable_strips((1000, 1000), polygon) == human_readable_strips((1000, 1000), (100, 0, 300, 100))
+
+
+def test_the_next_strip_is_read_when_the_first_is_empty(make_detector, fake_reader):
+    detector = make_detector()
+    reads = iter([[], _read('M00968463036')])
+    reader = fake_reader(detector, lambda image: next(reads))
+    image = np.full((1000, 1000), 255, dtype=np.uint8)
+
+    results, msg = detector.detect_barcode_hrl(image, (100, 200, 300, 100))
+
+    assert msg == 'Success (human-readable line)'
+    assert results[0]['data'] == 'M00968463036' and results[0]['rect'] == (70, 155, 360, 45)
+    assert [shape for shape, _ in reader.calls] == [(45, 360), (45, 360)]
+    # Restricted charset, no page-wide paragraph merging
+    assert reader.calls[0][1]['allowlist'] == detector.easyocr_config['allowlist']
+    assert reader.calls[0][1]['paragraph'] is False
+
+
+def test_text_beside_vertical_bars_is_turned_upright(make_detector, fake_reader):
+    detector = make_detector()
+    reader = fake_reader(detector, lambda image: _read('M00968463036'))
+
+    detector.detect_barcode_hrl(np.full((1000, 1000), 255, dtype=np.uint8), (400, 100, 80, 300))
+
+    assert reader.calls[0][0] == (36, 360)
+
+
+def _two_codes():
+    """Two Code128 symbols no decoder in the test cascade is allowed to read"""
+    page = np.full((800, 1200), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128('M00968463036'), module_px=2, height=110, quiet_modules=0)
+    page[150:260, 150:150 + bars.shape[1]] = bars
+    page[500:610, 650:650 + bars.shape[1]] = bars
+    return page
+
+
+def test_morphology_falls_back_to_the_printed_line(make_detector, fake_reader):
+    """Undecodable bars: each candidate's line is read until one validates"""
+    detector = make_detector(methods=['morphology'], quality=False)
+    reads = iter([_read('SHIPTOPARK', 0.95)])
+    reader = fake_reader(detector, lambda image: next(reads, _read('M00968463036')))
+
+    results, msg = detector.detect_barcode_morphology(image=_two_codes())
+
+    assert results[0]['data'] == 'M00968463036' and results[0]['method'] == 'morphology'
+    assert msg == 'Success (human-readable line)'
+    assert len(reader.calls) == 2
+
+
+def test_unvalidated_line_is_kept_when_nothing_better_is_read(make_detector, fake_reader):
+    detector = make_detector(methods=['morphology'], quality=False)
+    fake_reader(detector, lambda image: _read('SHIPTOPARK', 0.95))
+
+    results, _ = detector.detect_barcode_morphology(image=_two_codes())
+
+    assert results[0]['data'] == 'SHIPTOPARK'
+
+
+def test_decoded_bars_skip_the_ocr(make_detector, fake_reader):
+    page = np.full((800, 1200), 255, dtype=np.uint8)
+    bars = render_modules(encode_ean13('590123412345'), module_px=2, height=120, quiet_modules=0)
+    page[300:420, 250:250 + bars.shape[1]] = bars
+    detector = make_detector(profile='any', methods=['opencv_barcode', 'morphology'], quality=False)
+    reader = fake_reader(detector, lambda image: _read('SHIPTOPARK'))
+
+    results, _ = detector.detect_barcode_morphology(image=page)
+
+    assert results[0]['data'] == '5901234123457' and results[0]['type'] == 'EAN13'
+    assert reader.calls == []
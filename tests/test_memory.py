@@ -0,0 +1,86 @@
+"""
+Tests for idle unloading, the RSS budget and the memory metrics
+"""
+
+import threading
+import time
+
+import numpy as np
+
+import ocr_engine
+
+MB = 1024 * 1024
+
+
+def _loaded(make_detector, **memory_config):
+    """Detector holding a stand-in model, a cached image and both worker pools"""
+    detector = make_detector()
+    detector.memory_config = dict(detector.memory_config, **{'idle_timeout': None, **memory_config})
+    detector.reader = object()
+    detector._image_cache['key'] = (np.zeros((4, 4), dtype=np.uint8), 1.0)
+    detector._get_rotation_pool()
+    detector._get_race_pool()
+    return detector
+
+
+def test_idle_detector_is_unloaded(make_detector):
+    detector = _loaded(make_detector, idle_timeout=60)
+    detector._check_idle()
+    assert detector.reader is not None
+
+    detector._last_used = time.monotonic() - 61
+    detector._check_idle()
+
+    metrics = detector.get_memory_metrics()
+    assert not metrics['model_loaded'] and metrics['cached_images'] == 0
+    assert metrics['model_unloads'] == 1 and metrics['last_unload_reason'] == 'idle'
+    assert [event['event'] for event in metrics['events']] == ['unload']
+    # Pools are recreated on next use
+    assert detector._get_rotation_pool().submit(lambda: 42).result() == 42
+
+
+def test_unload_waits_for_running_detections(make_detector):
+    """A detection starting after the idle check keeps its model and pools"""
+    detector = _loaded(make_detector, idle_timeout=0)
+    release = threading.Event()
+    entered = threading.Event()
+
+    def detection():
+        entered.set()
+        release.wait(5)
+        return {'success': True}
+
+    thread = threading.Thread(target=detector._tracked_call, args=(detection,))
+    thread.start()
+    entered.wait(5)
+    detector.unload(reason='idle')
+    pool = detector._rotation_pool
+    detector.unload()
+    # A manual unload drops the model but leaves the pools to the running call
+    assert detector._rotation_pool is pool
+    assert pool.submit(lambda: 42).result() == 42
+    release.set()
+    thread.join()
+
+    assert detector.get_memory_metrics()['model_unloads'] == 1
+
+
+def test_rss_budget_evicts_caches_before_the_model(make_detector, monkeypatch):
+    detector = _loaded(make_detector, rss_budget_mb=500)
+    rss = iter([600 * MB, 600 * MB, 400 * MB, 400 * MB])
+    monkeypatch.setattr(ocr_engine, 'get_rss_bytes', lambda: next(rss))
+
+    detector._enforce_memory_budget()
+
+    metrics = detector.get_memory_metrics()
+    assert metrics['cache_evictions'] == 1 and metrics['cached_images'] == 0
+    assert metrics['model_loaded'] and metrics['model_unloads'] == 0
+
+    detector._image_cache['key'] = (np.zeros((4, 4), dtype=np.uint8), 1.0)
+    monkeypatch.setattr(ocr_engine, 'get_rss_bytes', lambda: 600 * MB)
+    detector._enforce_memory_budget()
+
+    metrics = detector.get_memory_metrics()
+    assert metrics['cache_evictions'] == 2 and not metrics['model_loaded']
+    assert metrics['last_unload_reason'] == 'rss_budget'
+    assert [event['event'] for event in metrics['events']] == ['evict_caches', 'evict_caches', 'unload']
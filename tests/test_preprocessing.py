@@ -0,0 +1,61 @@
+"""
+Tests for the preprocessing variants, their ranking and the scratch buffers
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from preprocessing import ENHANCEMENT_VARIANTS, VariantLadder, release_scratch_buffers, thread_scratch
+
+
+def test_variants_keep_grayscale_uint8():
+    crop = np.random.default_rng(0).integers(90, 160, (80, 240), dtype=np.uint8)
+    for name, variant in ENHANCEMENT_VARIANTS.items():
+        enhanced = variant(crop)
+        assert enhanced.dtype == np.uint8 and enhanced.ndim == 2, name
+
+
+def test_ladder_keeps_starting_order_during_warmup():
+    ladder = VariantLadder(['clahe', 'unsharp', 'upscale'], warmup=10)
+    ladder.record('upscale', True, 1.0)
+
+    assert ladder.order() == ['clahe', 'unsharp', 'upscale']
+
+
+def test_ladder_ranks_by_success_per_millisecond():
+    ladder = VariantLadder(['clahe', 'unsharp', 'adaptive_threshold'], warmup=5)
+    for _ in range(10):
+        ladder.record('clahe', False, 2.0)
+        ladder.record('unsharp', True, 4.0)
+        ladder.record('adaptive_threshold', True, 1.0)
+
+    assert ladder.order() == ['adaptive_threshold', 'unsharp', 'clahe']
+
+
+def test_unknown_variant_is_rejected():
+    with pytest.raises(ValueError, match='sharpen'):
+        VariantLadder(['clahe', 'sharpen'])
+
+
+def test_released_buffers_are_reallocated():
+    scratch = thread_scratch()
+    first = scratch.get('test', (64, 64), np.uint8)
+
+    assert release_scratch_buffers() >= first.nbytes
+    assert scratch.nbytes() == 0
+    assert scratch.get('test', (64, 64), np.uint8) is not first
+
+
+@pytest.mark.parametrize('release', [True, False])
+def test_scratch_is_released_after_each_detection(tmp_path, make_detector, release):
+    path = str(tmp_path / 'label.png')
+    page = np.full((600, 800), 255, dtype=np.uint8)
+    cv2.putText(page, 'SHIP TO PARK ROAD', (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    cv2.imwrite(path, page)
+    detector = make_detector()
+    detector.memory_config = dict(detector.memory_config, release_scratch=release)
+
+    detector.extract_barcode(path)
+
+    assert (thread_scratch().nbytes() == 0) == release
@@ -0,0 +1,93 @@
+"""
+Tests for the image quality gate in front of the cascade
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from config import get_config
+from quality import assess_quality, downscaled_gray, measure_quality
+from scanline import encode_code128, render_modules
+
+CONFIG = get_config('quality')
+
+
+def _label(text='MRX12345678901', lines=6):
+    page = np.full((800, 1200), 255, dtype=np.uint8)
+    for line in range(lines):
+        cv2.putText(page, 'SHIP TO PARK ROAD SURAT 395007', (40, 70 + line * 55),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    if text:
+        bars = render_modules(encode_code128(text), module_px=2, height=110, quiet_modules=0)
+        page[540:650, 120:120 + bars.shape[1]] = bars
+    return page
+
+
+def test_label_with_barcode_passes():
+    verdict, _, stats = assess_quality(_label(), CONFIG)
+
+    assert verdict == 'ok'
+    assert stats['barcode_energy'] > 0
+
+
+def test_blank_and_blurred_frames_are_rejected():
+    noise = np.random.default_rng(0).normal(0, 5, (800, 1200))
+    blank = np.clip(235 + noise, 0, 255).astype(np.uint8)
+    blurred = cv2.GaussianBlur(_label(), (0, 0), 6)
+
+    verdict, reason, _ = assess_quality(blank, CONFIG)
+    assert verdict == 'reject' and reason.startswith('blank or badly exposed')
+    verdict, reason, _ = assess_quality(blurred, CONFIG)
+    assert verdict == 'reject' and reason.startswith('too blurred')
+
+
+def _page(height, width, module_px=3, bar_height=150, text=True):
+    """A small Code128 on a large scanned page, optionally with address text"""
+    page = np.full((height, width), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128('M00968463036'), module_px=module_px, height=bar_height,
+                          quiet_modules=0)
+    page[height // 2:height // 2 + bar_height, width // 3:width // 3 + bars.shape[1]] = bars
+    if text:
+        for line in range(6):
+            cv2.putText(page, 'SHIP TO 221B BAKER STREET LONDON', (200, 300 + line * 90),
+                        cv2.FONT_HERSHEY_SIMPLEX, 2.5, 0, 5)
+    return page
+
+
+def test_missing_barcode_texture_is_not_a_reject():
+    """Texture only tells what the downscaled copy shows; the cascade still runs"""
+    assert assess_quality(_label(text=None), CONFIG)[:2] == ('ok', None)
+    # Nothing but a small code on an empty page: narrow histogram, strong edges
+    assert assess_quality(_page(3000, 4000, text=False), CONFIG)[0] == 'ok'
+
+
+def test_reject_on_the_downscaled_copy_is_confirmed_at_full_resolution():
+    page = _page(1800, 4000, module_px=1, bar_height=60, text=False)
+
+    # The bars are lost in the 512-px copy, which alone looks blurred
+    assert measure_quality(downscaled_gray(page, CONFIG['max_side']))['sharpness'] < CONFIG['min_sharpness']
+    assert assess_quality(page, CONFIG)[0] == 'ok'
+
+
+@pytest.mark.parametrize('height, width', [(3000, 4000), (3508, 2480)])
+def test_small_code_on_a_large_page_is_decoded(tmp_path, make_detector, height, width):
+    path = str(tmp_path / 'page.png')
+    cv2.imwrite(path, _page(height, width))
+    detector = make_detector()
+
+    result = detector.extract_barcode(path)
+
+    assert result['success'] and result['barcode_content'] == 'M00968463036'
+
+
+def test_rejected_image_skips_cascade(tmp_path, monkeypatch, make_detector):
+    path = str(tmp_path / 'blank.png')
+    cv2.imwrite(path, np.full((600, 800), 240, dtype=np.uint8))
+    detector = make_detector()
+    monkeypatch.setattr(detector, '_run_stage', lambda *args: (_ for _ in ()).throw(AssertionError))
+
+    result = detector.extract_barcode(path)
+
+    assert not result['success']
+    assert result['message'].startswith('Image rejected by quality gate: blank')
@@ -0,0 +1,94 @@
+"""
+Tests for racing OCR against the symbol decoders
+"""
+
+import threading
+import time
+
+import numpy as np
+
+IMAGE = np.zeros((10, 10), dtype=np.uint8)
+
+
+def _detector(make_detector, monkeypatch, hits, delays):
+    """Detector whose stages decode for the methods in hits, after a delay"""
+    detector = make_detector(quality=False)
+    calls = []
+    lock = threading.Lock()
+
+    def run_stage(method, image, cancel=None):
+        with lock:
+            calls.append(method)
+        deadline = time.monotonic() + delays.get(method, 0.0)
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                return None, "Cancelled"
+            time.sleep(0.005)
+        if method in hits:
+            return [{'data': method, 'type': 'CODE128'}], "Success"
+        return None, f"Nothing from {method}"
+
+    monkeypatch.setattr(detector, '_run_stage', run_stage)
+    return detector, calls
+
+
+def test_ocr_wins_while_symbol_stages_are_slow(make_detector, monkeypatch):
+    detector, calls = _detector(make_detector, monkeypatch, hits={'easyocr'}, delays={'morphology': 2.0})
+
+    started = time.monotonic()
+    result = detector._run_cascade(IMAGE, race=True)
+
+    assert result['success'] and result['method'] == 'easyocr'
+    assert result['race']['winner'] == 'text'
+    assert time.monotonic() - started < 1.0
+    # OCR only starts once pyzbar has failed
+    assert calls.index('easyocr') > calls.index('pyzbar')
+
+
+def test_symbol_success_cancels_ocr(make_detector, monkeypatch):
+    detector, calls = _detector(make_detector, monkeypatch, hits={'opencv_qr', 'easyocr'},
+                                delays={'easyocr': 2.0})
+
+    result = detector._run_cascade(IMAGE, race=True)
+    detector._get_race_pool().submit(lambda: None).result()
+    time.sleep(0.05)
+
+    assert result['method'] == 'opencv_qr' and result['race']['winner'] == 'symbol'
+    assert 'tesseract' not in calls
+
+
+def test_race_and_serial_agree_when_nothing_decodes(make_detector, monkeypatch):
+    detector, _ = _detector(make_detector, monkeypatch, hits=set(), delays={})
+
+    serial = detector._run_cascade(IMAGE)
+    raced = detector._run_cascade(IMAGE, race=True)
+
+    assert not serial['success'] and not raced['success']
+    assert set(raced['race']['cpu_ms']) == {'symbol', 'text'}
+    assert 'race' not in serial
+
+
+def _burn(seconds):
+    """Spin for this much thread CPU time"""
+    started = time.thread_time()
+    while time.thread_time() - started < seconds:
+        pass
+
+
+def test_path_cpu_includes_its_rotation_tasks(make_detector, monkeypatch):
+    """CPU a path spends on the rotation pool is charged to that path"""
+    detector = make_detector(quality=False)
+
+    def run_stage(method, image, cancel=None):
+        if method == 'easyocr':
+            # Four angles of 50 ms each, all on the rotation pool
+            return detector._try_rotations(image, lambda img: (_burn(0.05), (None, 'none'))[1],
+                                           angles=[0, 90, 180, 270], parallel=True)
+        return None, f"Nothing from {method}"
+
+    monkeypatch.setattr(detector, '_run_stage', run_stage)
+
+    raced = detector._run_cascade(IMAGE, race=True)
+
+    assert raced['race']['cpu_ms']['text'] >= 180
+    assert raced['race']['cpu_ms']['symbol'] < 100
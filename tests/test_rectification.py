@@ -0,0 +1,63 @@
+"""
+Tests for perspective rectification of located barcode regions
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from rectification import map_symbol, order_corners, rectify_region
+from scanline import decode_scanlines, encode_code128, render_modules
+
+TEXT = 'MRX12345678901'
+
+
+def _label():
+    page = np.full((600, 900), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128(TEXT), module_px=2, height=110, quiet_modules=0)
+    page[250:360, 200:200 + bars.shape[1]] = bars
+    return page, (200, 250, bars.shape[1], 110)
+
+
+def _warp(page, corners):
+    """Project the page so its corners land on the given points"""
+    height, width = page.shape
+    source = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(source, np.float32(corners))
+    return cv2.warpPerspective(page, matrix, (width + 300, height + 300), borderValue=255), matrix
+
+
+def test_corners_start_on_a_long_side():
+    quad = order_corners([(50, 10), (10, 30), (90, 190), (130, 170)])
+
+    assert quad[0].tolist() == [50, 10]
+    assert np.linalg.norm(quad[1] - quad[0]) > np.linalg.norm(quad[3] - quad[0])
+
+
+def test_warped_strip_decodes_and_maps_back():
+    page, (x, y, w, h) = _label()
+    skewed, matrix = _warp(page, [(120, 40), (900, 150), (860, 700), (60, 560)])
+    box = np.float32([[x, y], [x + w, y], [x + w, y + h], [x, y + h]]).reshape(-1, 1, 2)
+    quad = order_corners(cv2.perspectiveTransform(box, matrix))
+
+    strip, to_frame = rectify_region(skewed, quad, padding=0.1)
+    symbols = decode_scanlines(strip)
+
+    assert symbols and symbols[0]['data'] == TEXT
+    # The strip's origin is the padded first corner
+    corner = map_symbol({'polygon': [(0, 0)]}, to_frame)['polygon'][0]
+    expected = quad.mean(axis=0) + (quad[0] - quad.mean(axis=0)) * 1.2
+    assert np.hypot(*(np.array(corner) - expected)) <= 1
+
+
+@pytest.mark.parametrize('angle', [30, 55])
+def test_cascade_reads_rotated_codes_without_frame_rotations(monkeypatch, make_detector, angle):
+    page, _ = _label()
+    matrix = cv2.getRotationMatrix2D((450, 300), angle, 1.0)
+    rotated = cv2.warpAffine(page, matrix, (900, 600), borderValue=255)
+    detector = make_detector()
+    monkeypatch.setattr(detector, '_rotate_image', lambda *args: pytest.fail('frame rotated'))
+
+    result = detector._run_cascade(rotated)
+
+    assert result['barcode_content'] == TEXT
@@ -0,0 +1,102 @@
+"""
+Tests for the rotation sweep, serial and parallel
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+ANGLES = [0, -15, 15, -30, 30, -45, 45]
+
+
+def _sweep_fn(detector, hits, delays):
+    """Detector fn decoding at the angles in hits, slower at some angles"""
+    angle_of = {}
+    lock = threading.Lock()
+    calls = []
+
+    def rotate(image, angle):
+        rotated = image.copy()
+        angle_of[id(rotated)] = angle
+        return rotated
+
+    def detect(rotated):
+        angle = angle_of.get(id(rotated), 0)
+        with lock:
+            calls.append(angle)
+        time.sleep(delays.get(angle, 0.0))
+        if angle in hits:
+            return [{'data': f'angle {angle}', 'type': 'CODE128'}], "Success"
+        return None, f"Nothing at {angle}"
+
+    detector._rotate_image = rotate
+    return detect, calls
+
+
+def test_parallel_sweep_matches_serial_order(make_detector):
+    """A later angle finishing first does not win over an earlier one"""
+    detector = make_detector()
+    image = np.zeros((10, 10), dtype=np.uint8)
+    outcomes = {}
+    for parallel in (False, True):
+        detect, _ = _sweep_fn(detector, hits={15, -30}, delays={15: 0.2})
+        outcomes[parallel] = detector._try_rotations(image, detect, ANGLES, parallel=parallel)
+
+    assert outcomes[True] == outcomes[False]
+    assert outcomes[True][0][0]['data'] == 'angle 15'
+    assert outcomes[True][1] == "Success (angle 15°)"
+
+
+def test_parallel_sweep_cancels_remaining_angles(make_detector):
+    detector = make_detector()
+    detector.rotation_config = dict(detector.rotation_config, workers=1)
+    detect, calls = _sweep_fn(detector, hits={0}, delays={0: 0.05})
+
+    result, _ = detector._try_rotations(np.zeros((10, 10), dtype=np.uint8), detect, ANGLES, parallel=True)
+    detector._get_rotation_pool().submit(lambda: None).result()
+
+    assert result[0]['data'] == 'angle 0'
+    # The single worker may already have picked up the next angle
+    assert calls[0] == 0 and len(calls) <= 2
+
+
+def test_default_cascade_sweeps_tesseract_in_parallel(make_detector, monkeypatch):
+    """With the shipped config the tesseract stage's angles run on the rotation pool"""
+    detector = make_detector()
+    backend = detector.backends['tesseract']
+    threads = []
+    lock = threading.Lock()
+
+    def decode(image):
+        with lock:
+            threads.append(threading.current_thread().name)
+        return []
+
+    monkeypatch.setattr(backend, 'available', lambda: True)
+    monkeypatch.setattr(backend, 'decode', decode)
+    monkeypatch.setattr(detector, 'detect_barcode_full_resolution', lambda: (None, "skipped"))
+
+    result, _ = detector._run_stage('tesseract', np.zeros((40, 40), dtype=np.uint8))
+
+    assert result is None
+    assert len(threads) == len(detector.rotation_config['angles'])
+    assert all(name.startswith('rotations') for name in threads)
+
+
+def test_default_cascade_sweeps_easyocr_serially(make_detector, monkeypatch):
+    detector = make_detector()
+    backend = detector.backends['easyocr']
+    threads = []
+
+    def detect_with_backend(method, image):
+        threads.append(threading.current_thread().name)
+        return None, "Nothing found"
+
+    monkeypatch.setattr(backend, 'enabled', lambda: True)
+    monkeypatch.setattr(detector, 'detect_with_backend', detect_with_backend)
+
+    detector._run_stage('easyocr', np.zeros((40, 40), dtype=np.uint8))
+
+    assert threads and all(name == threading.current_thread().name for name in threads)
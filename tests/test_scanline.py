@@ -0,0 +1,83 @@
+"""
+Tests for the NumPy scanline decoder
+Renders Code128/EAN-13 symbols from module widths and decodes them back
+"""
+
+import cv2
+import numpy as np
+
+from scanline import decode_scanlines, encode_code128, encode_ean13, render_modules
+
+
+def _on_label(symbol, width=900, height=500):
+    """Paste a rendered symbol onto a white label with some noise"""
+    label = np.full((height, width), 255, dtype=np.uint8)
+    sh, sw = symbol.shape
+    y, x = (height - sh) // 2, (width - sw) // 2
+    label[y:y+sh, x:x+sw] = symbol
+    noise = np.random.default_rng(0).normal(0, 5, label.shape)
+    return np.clip(label + noise, 0, 255).astype(np.uint8), (x, y, sw, sh)
+
+
+def test_code128_round_trip():
+    """Set B and set C Code128 decode with a region in label coordinates"""
+    for data in ['MRX12345678901', '123456789012345678']:
+        image, region = _on_label(render_modules(encode_code128(data), module_px=2))
+
+        results = decode_scanlines(image, region)
+
+        assert [r['data'] for r in results] == [data]
+        assert results[0]['type'] == 'CODE128'
+        assert results[0]['method'] == 'scanline'
+
+
+def test_ean13_round_trip_whole_frame():
+    """EAN-13 decodes without a region, and the check digit is appended"""
+    image, _ = _on_label(render_modules(encode_ean13('590123412345'), module_px=3))
+
+    results = decode_scanlines(image)
+
+    assert [(r['data'], r['type']) for r in results] == [('5901234123457', 'EAN13')]
+
+
+def test_upside_down_and_vertical():
+    """Reversed and vertical symbols decode to the same text"""
+    image, _ = _on_label(render_modules(encode_code128('R1234567890'), module_px=2))
+
+    assert [r['data'] for r in decode_scanlines(cv2.rotate(image, cv2.ROTATE_180))] == ['R1234567890']
+    assert [r['data'] for r in decode_scanlines(cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE))] == ['R1234567890']
+
+
+def test_bad_checksum_is_not_reported():
+    """A corrupted symbol character fails the mod-103 check instead of misreading"""
+    widths = encode_code128('MRX12345678901')
+    # Swap a bar and a space inside the first data character
+    widths[7], widths[8] = widths[8], widths[7]
+    image, region = _on_label(render_modules(widths, module_px=2))
+
+    assert decode_scanlines(image, region) == []
+
+
+def test_symbology_filter():
+    """Restricting symbologies skips codes of other types"""
+    image, region = _on_label(render_modules(encode_ean13('590123412345'), module_px=3))
+
+    assert decode_scanlines(image, region, symbologies=['CODE128']) == []
+
+
+def test_rect_covers_the_bar_height():
+    """The box grows from the agreeing scanlines to the bars' full height"""
+    symbol = render_modules(encode_code128('MRX12345678901'), module_px=2, height=100)
+    image, (x, y, w, h) = _on_label(symbol)
+
+    (result,) = decode_scanlines(image)
+    rx, ry, rw, rh = result['rect']
+
+    assert (ry, rh) == (y, h)
+    assert x <= rx and rx + rw <= x + w
+    assert result['polygon'][0] == (rx, ry)
+
+    rotated = cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    (result,) = decode_scanlines(rotated)
+    rx, ry, rw, rh = result['rect']
+    assert rw == h
@@ -0,0 +1,71 @@
+"""
+Tests for multi-label sheet segmentation and per-label decoding
+"""
+
+import cv2
+import numpy as np
+
+from scanline import encode_code128, render_modules
+from segmentation import find_label_regions
+
+CODES = ['M00968463036', 'M00968463037', 'R1282989610FPL', 'M00968463039']
+
+
+def _sheet():
+    """A 2x2 sheet of bordered labels, one Code128 each, and their boxes"""
+    page = np.full((1400, 1800), 255, dtype=np.uint8)
+    boxes = []
+    for index, code in enumerate(CODES):
+        x, y = 60 + (index % 2) * 880, 60 + (index // 2) * 680
+        cv2.rectangle(page, (x, y), (x + 800, y + 600), 0, 4)
+        bars = render_modules(encode_code128(code), module_px=2, height=120, quiet_modules=0)
+        page[y + 240:y + 360, x + 100:x + 100 + bars.shape[1]] = bars
+        cv2.putText(page, 'SHIP TO', (x + 40, y + 80), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+        boxes.append((x, y, 800, 600))
+    return page, boxes
+
+
+def test_labels_are_found_in_reading_order():
+    page, boxes = _sheet()
+
+    regions = find_label_regions(page)
+
+    assert len(regions) == 4
+    for (x, y, w, h), (bx, by, bw, bh) in zip(regions, boxes):
+        assert abs(x - bx) <= 8 and abs(y - by) <= 8
+        assert abs(w - bw) <= 16 and abs(h - bh) <= 16
+
+
+def test_plain_page_is_not_a_sheet():
+    page = np.full((1400, 1800), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128(CODES[0]), module_px=2, height=120, quiet_modules=0)
+    page[600:720, 400:400 + bars.shape[1]] = bars
+
+    assert find_label_regions(page) == []
+
+
+def test_every_label_is_decoded(tmp_path, make_detector):
+    page, boxes = _sheet()
+    path = str(tmp_path / 'sheet.png')
+    cv2.imwrite(path, page)
+    detector = make_detector()
+
+    result = detector.extract_labels(path)
+
+    assert result['success'] and result['message'] == 'Decoded 4 of 4 labels'
+    assert [label['barcode_content'] for label in result['labels']] == CODES
+    assert [label['label_index'] for label in result['labels']] == [0, 1, 2, 3]
+    for label, (bx, by, _, _) in zip(result['labels'], boxes):
+        assert abs(label['bbox'][0] - bx) <= 8 and abs(label['bbox'][1] - by) <= 8
+
+
+def test_plain_page_is_one_label(tmp_path, make_detector, monkeypatch):
+    path = str(tmp_path / 'page.png')
+    cv2.imwrite(path, np.full((1400, 1800), 255, dtype=np.uint8))
+    detector = make_detector()
+    monkeypatch.setattr(detector, '_run_cascade', lambda image: {'success': False, 'message': 'No barcode'})
+
+    result = detector.extract_labels(path)
+
+    assert not result['success'] and result['message'] == 'Decoded 0 of 1 labels'
+    assert result['labels'][0]['bbox'] == (0, 0, 1800, 1400)
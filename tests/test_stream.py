@@ -0,0 +1,129 @@
+"""
+Tests for video stream scanning (frame sampling, blur gate, repeat filter)
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from config import get_config
+from scanline import encode_code128, render_modules
+from stream import RoiTracker, _decode_tracks, open_capture, sample_frames, scan_stream
+
+TEXT = 'M00968463036'
+
+
+def _write_video(path, frames, fps=30):
+    height, width = frames[0].shape
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height), False)
+    if not writer.isOpened():
+        pytest.skip('no MJPG video writer in this OpenCV build')
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def _frame(code=True, blur=0):
+    frame = np.full((480, 640), 255, dtype=np.uint8)
+    cv2.putText(frame, 'SHIP TO PARK ROAD', (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+    if code:
+        bars = render_modules(encode_code128(TEXT), module_px=2, height=110, quiet_modules=0)
+        frame[200:310, 120:120 + bars.shape[1]] = bars
+    if blur:
+        frame = cv2.GaussianBlur(frame, (0, 0), blur)
+    return frame
+
+
+def test_frames_are_sampled_at_the_target_rate(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    _write_video(path, [_frame(code=False)] * 30, fps=30)
+    capture, live = open_capture(path)
+    stats = {}
+
+    indexes = [index for index, _, _ in sample_frames(capture, 5, stats=stats)]
+    capture.release()
+
+    assert not live
+    assert indexes == [0, 6, 12, 18, 24]
+    assert stats['skipped'] == 25
+
+
+def test_repeated_reads_are_reported_once(tmp_path, make_detector):
+    path = str(tmp_path / 'clip.avi')
+    # 1 s of the code, 0.5 s motion blur, 3 s without it, then the code again
+    frames = [_frame()] * 10 + [_frame(blur=8)] * 5 + [_frame(code=False)] * 30 + [_frame()] * 10
+    _write_video(path, frames, fps=10)
+    config = dict(get_config('stream'), target_fps=10, repeat_seconds=2.0)
+
+    events = list(scan_stream(make_detector(), path, config))
+
+    assert events[0]['event'] == 'start' and events[-1]['event'] == 'summary'
+    sightings = [event for event in events if event['event'] == 'barcode']
+    assert [(event['data'], event['frame']) for event in sightings] == [(TEXT, 0), (TEXT, 45)]
+    summary = events[-1]
+    assert summary['sampled'] == 55 and summary['blurred'] >= 5
+
+
+def test_moving_code_is_tracked_without_full_frame_search(tmp_path, make_detector):
+    path = str(tmp_path / 'clip.avi')
+    bars = render_modules(encode_code128(TEXT), module_px=2, height=110, quiet_modules=0)
+    frames = []
+    for step in range(12):
+        frame = np.full((480, 640), 255, dtype=np.uint8)
+        x, y = 40 + step * 12, 150 + step * 6
+        frame[y:y + 110, x:x + bars.shape[1]] = bars
+        frames.append(frame)
+    _write_video(path, frames, fps=10)
+    tracking = dict(get_config('stream')['tracking'], full_frame_every=0)
+    config = dict(get_config('stream'), target_fps=10, frame_events=True, tracking=tracking)
+
+    events = list(scan_stream(make_detector(), path, config))
+
+    modes = [event['mode'] for event in events if event['event'] == 'frame']
+    assert modes == ['full'] + ['tracked'] * 11
+    assert len([event for event in events if event['event'] == 'barcode']) == 1
+    summary = events[-1]
+    assert summary['track_losses'] == 0
+    assert summary['latency']['tracked']['frames'] == 11 and summary['latency']['full']['frames'] == 1
+
+
+def test_text_only_frames_make_no_ocr_calls(tmp_path, make_detector, fake_reader):
+    # Without the quality gate nothing but the ocr switch keeps OCR out
+    detector = make_detector(quality=False)
+    reader = fake_reader(detector, lambda image: [(([0, 0], [10, 0], [10, 10], [0, 10]), TEXT, 0.9)])
+
+    assert detector.extract_barcodes_from_frame(_frame(code=False))['barcodes'] == []
+    path = str(tmp_path / 'clip.avi')
+    _write_video(path, [_frame(code=False)] * 5, fps=10)
+    events = list(scan_stream(detector, path, dict(get_config('stream'), target_fps=10)))
+
+    assert reader.calls == []
+    assert [event['event'] for event in events] == ['start', 'summary']
+
+
+def test_opted_in_ocr_reads_are_text_events(tmp_path, make_detector, fake_reader):
+    detector = make_detector(quality=False)
+    reader = fake_reader(detector, lambda image: [(([0, 0], [10, 0], [10, 10], [0, 10]), TEXT, 0.9)])
+    path = str(tmp_path / 'clip.avi')
+    _write_video(path, [_frame(code=False)] * 3, fps=10)
+
+    events = list(scan_stream(detector, path, dict(get_config('stream'), target_fps=10, ocr=True)))
+
+    assert reader.calls
+    sightings = [event for event in events if event['event'] not in ('start', 'summary')]
+    assert [(event['event'], event['data']) for event in sightings] == [('text', TEXT)]
+
+
+def test_tracks_over_one_code_report_it_once(make_detector):
+    frame = _frame()
+    gray = frame.copy()
+    detector = make_detector()
+    barcodes = detector.extract_barcodes_from_frame(frame)['barcodes']
+    tracker = RoiTracker()
+    # Two tracks over the same code; each window also holds the other's read
+    tracker.reset(barcodes * 2, gray)
+
+    found = _decode_tracks(detector, frame, gray, tracker, decode_margin=0.5)
+
+    assert len(tracker.tracks) == 2
+    assert [barcode['data'] for barcode in found] == [TEXT]
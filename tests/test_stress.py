@@ -0,0 +1,113 @@
+"""
+Stress tests for oversized inputs
+Feeds images far above the IMAGE_CONFIG pixel budget through the detector
+and checks they are downscaled or rejected cleanly instead of exhausting memory
+"""
+
+import threading
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from ocr_engine import ImageBudgetError
+
+
+def _write_blank(path, width, height):
+    """Write a blank grayscale image (compresses to almost nothing on disk)"""
+    cv2.imwrite(str(path), np.full((height, width), 255, dtype=np.uint8))
+    return str(path)
+
+
+def test_oversized_image_is_downscaled(tmp_path, make_detector):
+    """A 100+ MP image decodes within the size caps"""
+    path = _write_blank(tmp_path / 'huge.png', 12000, 9000)
+    detector = make_detector(oversize_policy='downscale', max_decode_mb=256)
+
+    image, scale = detector._decode_image(path)
+
+    assert max(image.shape[:2]) <= detector.image_config['max_width']
+    assert image.ndim == 2
+    assert scale >= 6
+
+
+def test_oversized_image_is_rejected(tmp_path, make_detector):
+    """With the reject policy the image never reaches the decoder"""
+    path = _write_blank(tmp_path / 'huge.png', 12000, 9000)
+    detector = make_detector(oversize_policy='reject')
+
+    result = detector.extract_barcode(path)
+
+    assert not result['success']
+    assert 'pixel budget' in result['message']
+    assert 'last_decode' not in detector.metrics
+
+
+def test_decode_memory_budget(tmp_path, make_detector):
+    """Images whose decode would exceed max_decode_mb are rejected from the header"""
+    path = _write_blank(tmp_path / 'wide.png', 8000, 8000)
+    detector = make_detector(max_decode_mb=16)
+
+    result = detector.extract_barcode(path)
+
+    assert not result['success']
+    assert 'memory budget' in result['message']
+
+
+def test_batch_survives_oversized_inputs(tmp_path, make_detector):
+    """Oversized files in a batch do not stop the rest and peak memory is reported per image"""
+    paths = [
+        _write_blank(tmp_path / 'small.png', 640, 480),
+        _write_blank(tmp_path / 'huge.png', 12000, 9000),
+        _write_blank(tmp_path / 'small2.png', 800, 600),
+    ]
+    detector = make_detector(report_peak_memory=True)
+
+    peaks = [detector.extract_barcode(path)['python_peak_mb'] for path in paths]
+
+    # Rotations run on the capped frame, so peak stays far below the full decode
+    assert peaks[1] < 12000 * 9000 / (1024 * 1024)
+    # Each figure is the image's own: the huge one does not carry over
+    assert peaks[2] < peaks[1] / 2
+    assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_detections_share_a_peak(make_detector):
+    detector = make_detector(report_peak_memory=True)
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(_):
+        entered.set()
+        release.wait(5)
+        return {}
+
+    first = []
+    thread = threading.Thread(target=lambda: first.append(detector._tracked_call(slow, None)))
+    thread.start()
+    entered.wait(5)
+    second = detector._tracked_call(lambda _: {}, None)
+    release.set()
+    thread.join()
+
+    assert second['python_peak_shared'] and first[0]['python_peak_shared']
+    assert 'python_peak_shared' not in detector._tracked_call(lambda _: {}, None)
+
+
+@pytest.mark.parametrize('policy', ['downscale', 'tile', 'reject'])
+def test_pil_bomb_limit_defers_to_the_oversize_policy(tmp_path, make_detector, monkeypatch, policy):
+    """Images past PIL's decompression-bomb limit follow oversize_policy"""
+    path = _write_blank(tmp_path / 'huge.jpg', 3000, 2000)
+    # 6 MP is over twice this limit, so a plain Image.open raises
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1_000_000)
+    detector = make_detector(max_pixels=2_000_000, oversize_policy=policy,
+                             max_width=1000, max_height=1000)
+
+    if policy == 'reject':
+        with pytest.raises(ImageBudgetError, match='pixel budget'):
+            detector._decode_image(path)
+    else:
+        image, scale = detector._decode_image(path)
+        assert image.shape == (666, 1000) and scale == pytest.approx(3.0)
+    assert Image.MAX_IMAGE_PIXELS == 1_000_000
@@ -0,0 +1,115 @@
+"""
+Tests for tile geometry, mapping tile hits back to the frame and merging them
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from scanline import encode_ean13, render_modules
+from tiling import decode_tiles, merge_symbols, offset_symbol, split_tiles
+
+
+@pytest.mark.parametrize('width, height', [(1024, 700), (1025, 1024), (4000, 3000), (5000, 1100)])
+def test_tiles_cover_the_frame_with_the_overlap(width, height):
+    tiles = split_tiles(width, height, tile_size=1024, overlap=256)
+
+    covered = np.zeros((height, width), dtype=bool)
+    for x, y, w, h in tiles:
+        assert w <= 1024 and h <= 1024 and x + w <= width and y + h <= height
+        covered[y:y + h, x:x + w] = True
+    assert covered.all()
+    xs = sorted({x for x, _, _, _ in tiles})
+    # Neighbouring tiles overlap by at least the requested amount; the
+    # last one is flush with the edge
+    assert all(xs[i] + 1024 - xs[i + 1] >= 256 for i in range(len(xs) - 1))
+    assert max(x + w for x, _, w, _ in tiles) == width
+
+
+def test_small_frame_is_one_tile():
+    assert split_tiles(800, 600, tile_size=1024, overlap=256) == [(0, 0, 800, 600)]
+
+
+@pytest.mark.parametrize('start', range(0, 4000 - 256, 37))
+def test_codes_up_to_the_overlap_fall_inside_a_tile(start):
+    tiles = split_tiles(4000, 100, tile_size=1024, overlap=256)
+
+    assert any(x <= start and start + 256 <= x + w for x, _, w, _ in tiles)
+
+
+def test_offset_symbol_maps_tile_hits_to_the_frame():
+    hit = {'data': 'X', 'rect': (10, 20, 30, 40), 'polygon': [(10, 20), (40, 20), (40, 60), (10, 60)]}
+
+    mapped = offset_symbol(hit, 100, 200, scale=2.0)
+
+    assert mapped['rect'] == (55, 110, 15, 20)
+    assert mapped['polygon'] == [(55, 110), (70, 110), (70, 130), (55, 130)]
+    assert hit['rect'] == (10, 20, 30, 40)
+    assert offset_symbol({'data': 'X'}, 5, 5) == {'data': 'X'}
+
+
+def test_merge_keeps_distinct_codes_and_drops_overlap_repeats():
+    hit = {'data': 'A', 'type': 'CODE128', 'rect': (100, 100, 50, 20)}
+    repeat = dict(hit, rect=(102, 101, 48, 20))
+    other_type = dict(hit, type='EAN13')
+    same_code_elsewhere = dict(hit, rect=(400, 100, 50, 20))
+    without_geometry = {'data': 'A', 'type': 'CODE128'}
+
+    merged = merge_symbols([hit, repeat, other_type, same_code_elsewhere, without_geometry])
+
+    assert merged == [hit, other_type, same_code_elsewhere]
+
+
+def test_seam_straddling_code_is_decoded_once():
+    """A code across a seam, within the overlap, is read from one tile only once"""
+    frame = np.full((600, 3000), 255, dtype=np.uint8)
+    # Tiles start at 0, 768, 1536, 1976: a code at 700-900 crosses a seam
+    frame[250:350, 700:900] = 0
+    seen = []
+    lock = threading.Lock()
+
+    def decode(tile):
+        # Stands in for a decoder: reads the dark block only when it is complete
+        cols = np.flatnonzero((tile == 0).any(axis=0))
+        with lock:
+            seen.append(tile.shape)
+        if len(cols) != 200 or cols[0] == 0 or cols[-1] == tile.shape[1] - 1:
+            return []
+        rows = np.flatnonzero((tile == 0).any(axis=1))
+        return [{'data': 'CODE', 'type': 'CODE128',
+                 'rect': (int(cols[0]), int(rows[0]), 200, len(rows))}]
+
+    found = decode_tiles(frame, decode, tile_size=1024, overlap=256, workers=4)
+
+    assert found == [{'data': 'CODE', 'type': 'CODE128', 'rect': (700, 250, 200, 100)}]
+    assert len(seen) == 4
+
+
+def test_tile_pool_is_reused():
+    """Tile threads outlive a call and are shared with the next one"""
+    threads = set()
+
+    def decode(tile):
+        threads.add(threading.current_thread())
+        return []
+
+    frame = np.zeros((100, 4000), dtype=np.uint8)
+    for _ in range(3):
+        decode_tiles(frame, decode, tile_size=1024, overlap=256, workers=2)
+
+    assert len(threads) <= 2 and all(thread.is_alive() for thread in threads)
+
+
+def test_wide_code_in_a_capped_frame_is_decoded_whole(make_detector):
+    """A code wider than the tile overlap in the middle of a capped frame"""
+    frame = np.full((1500, 2000), 255, dtype=np.uint8)
+    bars = render_modules(encode_ean13('590123412345'), module_px=6, height=300, quiet_modules=0)
+    x = 1000 - bars.shape[1] // 2
+    frame[600:900, x:x + bars.shape[1]] = bars
+    detector = make_detector(profile='any')
+
+    results, _ = detector.detect_with_backend('opencv_barcode', image=frame)
+
+    assert [result['data'] for result in results] == ['5901234123457']
+    assert bars.shape[1] > detector.tiling_config['overlap']
@@ -0,0 +1,61 @@
+"""
+Tests for image discovery (iter_image_files / get_image_files)
+"""
+
+import os
+from pathlib import Path
+
+import utils
+from utils import get_image_files, iter_image_files
+
+
+def _tree(root):
+    for name in ('b.JPG', 'a.png', 'notes.txt', 'scans/c.Jpeg', 'scans/thumbs/d.jpg',
+                 'scans/old/e.tiff', 'z.jpg.part'):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'x')
+    return root
+
+
+def _relative(root, paths):
+    return [os.path.relpath(path, root).replace(os.sep, '/') for path in paths]
+
+
+def test_recursive_case_insensitive_and_sorted(tmp_path):
+    root = _tree(tmp_path)
+
+    found = _relative(root, iter_image_files(root, sort=True))
+
+    assert found == ['a.png', 'b.JPG', 'scans/c.Jpeg', 'scans/old/e.tiff', 'scans/thumbs/d.jpg']
+    assert _relative(root, iter_image_files(root, recursive=False, sort=True)) == ['a.png', 'b.JPG']
+
+
+def test_include_and_exclude_patterns(tmp_path):
+    root = _tree(tmp_path)
+
+    found = iter_image_files(root, include=['*.jpg', '*.jpeg'], exclude=['thumbs'], sort=True)
+
+    assert _relative(root, found) == ['b.JPG', 'scans/c.Jpeg']
+    assert _relative(root, iter_image_files(root, exclude=['scans/*'], sort=True)) == ['a.png', 'b.JPG']
+
+
+def test_first_file_is_yielded_before_subdirectories_are_read(tmp_path, monkeypatch):
+    root = _tree(tmp_path)
+    scanned = []
+    scandir = os.scandir
+    monkeypatch.setattr(utils.os, 'scandir', lambda path: scanned.append(path) or scandir(path))
+
+    first = next(iter_image_files(root, sort=True))
+
+    assert os.path.basename(first) == 'a.png' and len(scanned) == 1
+
+
+def test_get_image_files_keeps_its_list_of_paths(tmp_path):
+    root = _tree(tmp_path)
+
+    files = get_image_files(str(root))
+
+    assert files == sorted([root / 'a.png', root / 'b.JPG'])
+    assert all(isinstance(path, Path) for path in files)
+    assert get_image_files(str(root / 'missing')) == []
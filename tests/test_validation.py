@@ -0,0 +1,56 @@
+"""
+Tests for checksum and format validation of decoded candidates
+"""
+
+import numpy as np
+
+from config import get_config
+from text_extraction import score_candidate, validate_barcode_format
+
+PATTERNS = get_config('validation')['patterns']
+
+
+def test_symbology_checksums_and_waybill_patterns():
+    assert validate_barcode_format('4006381333931', 'EAN13') == (True, 1.0)
+    assert validate_barcode_format('4006381333932', 'EAN13')[0] is False
+    assert validate_barcode_format('MRX12345678901', 'CODE128')[0]
+
+    assert validate_barcode_format('M00968463036', patterns=PATTERNS)[0]
+    assert validate_barcode_format('R1282989610FPL', patterns=PATTERNS)[0]
+    assert validate_barcode_format('SHIPTOPARKROAD', patterns=PATTERNS)[0] is False
+    # Legacy behaviour without patterns: digits only, 8-128 long
+    assert validate_barcode_format('12345678') == (True, 1.0)
+    assert validate_barcode_format('12AB5678') == (False, 0.5)
+
+
+def test_ocr_confidence_scales_text_scores():
+    read = {'data': '234095357601330', 'type': 'TEXT', 'confidence': 0.9}
+
+    assert score_candidate(read, PATTERNS, min_text_confidence=0.3) == (True, 0.9)
+    assert score_candidate(dict(read, confidence=0.2), PATTERNS, min_text_confidence=0.3)[0] is False
+    assert score_candidate(dict(read, data='ADDRESS'), PATTERNS) == (False, 0.45)
+
+
+def test_unvalidated_text_does_not_end_the_cascade(monkeypatch, make_detector):
+    detector = make_detector(quality=False)
+    stages = {
+        'morphology': [{'data': 'SHIPTOPARK', 'method': 'easyocr_hrl', 'confidence': 0.95}],
+        'tesseract': [{'data': 'M00968463036', 'type': 'TEXT', 'confidence': 0.8}],
+    }
+    ran = []
+
+    def run_stage(method, image, cancel=None):
+        ran.append(method)
+        return stages.get(method), f"{method} done"
+
+    monkeypatch.setattr(detector, '_run_stage', run_stage)
+    image = np.zeros((10, 10), dtype=np.uint8)
+
+    result = detector._run_cascade(image)
+    assert ran[-1] == 'tesseract'
+    assert (result['barcode_content'], result['validated']) == ('M00968463036', True)
+
+    # Nothing validates: the best read is reported once every stage has run
+    del stages['tesseract']
+    result = detector._run_cascade(image)
+    assert (result['barcode_content'], result['validated']) == ('SHIPTOPARK', False)
@@ -0,0 +1,200 @@
+"""
+Tests for directory watch mode: settling, ledger and bounded worker pool
+"""
+
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from scanline import encode_code128, render_modules
+from utils import BoundedExecutor
+from watch import DirectoryWatcher, Inotify, Ledger
+
+
+def _collect(watcher, stop, found):
+    for path, _ in watcher.watch(stop):
+        found.append(os.path.basename(path))
+
+
+def test_bounded_executor_blocks_when_full():
+    release = threading.Event()
+    executor = BoundedExecutor(max_workers=1, max_pending=2)
+    executor.submit(release.wait)
+    executor.submit(release.wait)
+    submitted = threading.Event()
+    threading.Thread(target=lambda: (executor.submit(lambda: None), submitted.set()), daemon=True).start()
+
+    assert not submitted.wait(0.2)
+    release.set()
+    assert submitted.wait(2)
+    executor.shutdown()
+
+
+@pytest.mark.parametrize('use_inotify', [False, True])
+def test_files_are_yielded_once_after_settling(tmp_path, use_inotify):
+    if use_inotify:
+        try:
+            Inotify(str(tmp_path)).close()
+        except OSError:
+            pytest.skip('inotify not available')
+    (tmp_path / 'done.png').write_bytes(b'old')
+    ledger = Ledger(str(tmp_path / '.barcode_ledger'))
+    ledger.record(str(tmp_path / 'done.png'), os.stat(tmp_path / 'done.png'))
+    (tmp_path / 'notes.txt').write_bytes(b'not an image')
+    watcher = DirectoryWatcher(str(tmp_path), settle_seconds=0.3, poll_interval=0.05,
+                               use_inotify=use_inotify, skip=ledger.contains)
+    stop, found = threading.Event(), []
+    thread = threading.Thread(target=_collect, args=(watcher, stop, found))
+    thread.start()
+
+    # A file written in pieces is only picked up once it stops growing
+    with open(tmp_path / 'scan.JPG', 'wb') as f:
+        for _ in range(4):
+            f.write(b'x' * 1000)
+            f.flush()
+            time.sleep(0.15)
+            assert found == []
+    time.sleep(0.8)
+    stop.set()
+    thread.join()
+    ledger.close()
+
+    assert watcher.mode == ('inotify' if use_inotify else 'polling')
+    assert found == ['scan.JPG']
+
+
+def test_watch_writes_results_and_skips_ledgered_files(tmp_path, monkeypatch, no_easyocr):
+    import main
+    monkeypatch.setitem(main.get_config('watch'), 'settle_seconds', 0.1)
+    monkeypatch.setitem(main.get_config('watch'), 'poll_interval', 0.05)
+    page = np.full((400, 700), 255, dtype=np.uint8)
+    bars = render_modules(encode_code128('M00968463036'), module_px=2, height=110, quiet_modules=0)
+    page[140:250, 100:100 + bars.shape[1]] = bars
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    cv2.imwrite(str(inbox / 'a.png'), page)
+    output = str(tmp_path / 'results.jsonl')
+
+    def run_until(count):
+        stop = threading.Event()
+        thread = threading.Thread(target=main.run_watch, args=(str(inbox), output), kwargs={'stop': stop})
+        thread.start()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if os.path.exists(output) and len(open(output).readlines()) >= count:
+                break
+            time.sleep(0.05)
+        time.sleep(0.3)
+        stop.set()
+        thread.join()
+        return [json.loads(line) for line in open(output)]
+
+    first = run_until(1)
+    cv2.imwrite(str(inbox / 'b.png'), page)
+    second = run_until(2)
+
+    assert [(os.path.basename(r['path']), r['barcode_content']) for r in first] == [('a.png', 'M00968463036')]
+    # After a restart only the new file is processed
+    assert [os.path.basename(r['path']) for r in second] == ['a.png', 'b.png']
+
+
+def test_removed_files_are_forgotten(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    ledger_path = str(tmp_path / 'ledger')
+    ledger = Ledger(ledger_path)
+    watcher = DirectoryWatcher(str(inbox), settle_seconds=0.1, poll_interval=0.05, use_inotify=False,
+                               skip=ledger.contains, forget=ledger.forget)
+    stop = threading.Event()
+    stream = watcher.watch(stop)
+    for name in ['a.png', 'b.png']:
+        (inbox / name).write_bytes(b'x' * 100)
+    for _ in range(2):
+        path, stat = next(stream)
+        ledger.record(path, stat)
+
+    # A drop folder: processed files are moved out
+    os.remove(inbox / 'a.png')
+    (inbox / 'c.png').write_bytes(b'x' * 100)
+    path, stat = next(stream)
+    ledger.record(path, stat)
+    stop.set()
+    stream.close()
+    ledger.close()
+
+    assert os.path.basename(path) == 'c.png'
+    assert sorted(os.path.basename(p) for p in watcher._yielded) == ['b.png', 'c.png']
+    assert sorted(os.path.basename(p) for p in ledger._done) == ['b.png', 'c.png']
+    # On restart only the files still there are loaded from the ledger
+    os.remove(inbox / 'b.png')
+    reloaded = Ledger(ledger_path)
+    reloaded.close()
+    assert [os.path.basename(p) for p in reloaded._done] == ['c.png']
+
+
+def test_watch_survives_the_directory_vanishing(tmp_path, caplog):
+    """A share that is briefly unmounted does not end the watch"""
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    watcher = DirectoryWatcher(str(inbox), settle_seconds=0.1, poll_interval=0.05, use_inotify=False)
+    stop, found = threading.Event(), []
+    thread = threading.Thread(target=_collect, args=(watcher, stop, found))
+    thread.start()
+
+    time.sleep(0.1)
+    inbox.rename(tmp_path / 'away')
+    time.sleep(0.3)
+    (tmp_path / 'away').rename(inbox)
+    (inbox / 'scan.png').write_bytes(b'x' * 100)
+    deadline = time.monotonic() + 5
+    while not found and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop.set()
+    thread.join()
+
+    assert found == ['scan.png']
+    assert any('retrying' in record.getMessage() for record in caplog.records)
+
+
+def test_ledger_is_compacted_once_mostly_dead(tmp_path):
+    inbox = tmp_path / 'inbox'
+    inbox.mkdir()
+    ledger_path = tmp_path / 'ledger'
+    ledger = Ledger(str(ledger_path))
+    for index in range(6):
+        path = inbox / f'{index}.png'
+        path.write_bytes(b'x' * 100)
+        ledger.record(str(path), os.stat(path))
+    # A newer version of 0.png makes its first line dead
+    (inbox / '0.png').write_bytes(b'x' * 200)
+    ledger.record(str(inbox / '0.png'), os.stat(inbox / '0.png'))
+    for index in range(1, 4):
+        os.remove(inbox / f'{index}.png')
+        ledger.forget(str(inbox / f'{index}.png'))
+
+    # 4 dead lines against 3 live ones: rewritten with the live ones only
+    lines = ledger_path.read_text().splitlines()
+    assert sorted(line.rsplit('/', 1)[1] for line in lines) == ['0.png', '4.png', '5.png']
+    ledger.record(str(inbox / '4.png'), os.stat(inbox / '4.png'))
+    ledger.close()
+    assert len(ledger_path.read_text().splitlines()) == 4
+    reloaded = Ledger(str(ledger_path))
+    reloaded.close()
+    assert reloaded.contains(str(inbox / '0.png'), os.stat(inbox / '0.png'))
+
+
+def test_empty_listing_does_not_forget_files(tmp_path):
+    """An unmounted share looks like an empty mount point"""
+    forgotten = []
+    watcher = DirectoryWatcher(str(tmp_path), forget=forgotten.append)
+    watcher._seen = {str(tmp_path / 'a.png')}
+    watcher._yielded = {str(tmp_path / 'a.png'): (100, 1)}
+
+    watcher._scan({}, time.monotonic())
+
+    assert forgotten == [] and watcher._yielded
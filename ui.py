@@ -294,7 +294,8 @@ class BarcodeDetectorUI:
     def _detect_in_thread(self):
         """Run barcode detection in background thread"""
         try:
-            result = self.detector.extract_barcode(self.current_image_path)
+            # Interactive: race OCR against the decoders for the fastest answer
+            result = self.detector.extract_barcode(self.current_image_path, race=True)
             
             # Update UI in main thread
             self.root.after(0, self._update_results, result)